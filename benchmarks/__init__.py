@@ -0,0 +1,7 @@
+"""
+Benchmarks for the notification hot paths
+
+Run the suite from the repository root with ``python -m benchmarks``. See
+``python -m benchmarks --help`` for options to store results as JSON and compare them
+against a baseline.
+"""
@@ -0,0 +1,138 @@
+"""
+Runs the benchmark suite
+
+Results can be written as JSON and compared against a stored baseline. The process
+exits with a non-zero status if any benchmark regressed by more than the given
+threshold, so that it can be used as a gate in CI. Benchmarks which appear to have
+regressed are run again before failing, and the threshold is widened for benchmarks
+whose rounds vary a lot, to tell regressions from noise. Baselines depend on the
+machine and must be recorded with ``--save-baseline`` on the machine that runs the
+comparison.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from . import bench_api, bench_callbacks, bench_common, bench_dbus  # noqa: F401
+from .harness import (
+    compare,
+    fastest,
+    format_time,
+    from_json,
+    run_benchmarks,
+    to_json,
+)
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Runs the benchmark suite"
+    )
+    parser.add_argument(
+        "-k", "--filter", default="*", help="Glob pattern to select benchmarks."
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, help="Path to write results as JSON."
+    )
+    parser.add_argument(
+        "-b",
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="Baseline to compare against (default: %(default)s).",
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Maximum allowed slowdown relative to the baseline, as a fraction "
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "-c",
+        "--confirm",
+        type=int,
+        default=2,
+        help="Number of times to run benchmarks again which appear to have regressed, "
+        "keeping the fastest run (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as new baseline instead of comparing.",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.filter)
+    data = to_json(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(data, indent=2) + "\n")
+
+    if args.save_baseline:
+        if args.baseline.exists() and args.filter != "*":
+            # Only replace the selected benchmarks in an existing baseline.
+            stored = json.loads(args.baseline.read_text())
+            stored["results"].update(data["results"])
+            data = stored
+        args.baseline.write_text(json.dumps(data, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline found at {args.baseline}")
+        return 0
+
+    baseline = from_json(json.loads(args.baseline.read_text()))
+
+    for _ in range(args.confirm):
+        suspects = [
+            comparison.name
+            for comparison in compare(results, baseline)
+            if comparison.is_regression(args.threshold)
+        ]
+        if not suspects:
+            break
+
+        print(f"\nRunning {len(suspects)} benchmark(s) again to confirm regressions")
+        for name in suspects:
+            rerun = run_benchmarks(name)
+            if name in rerun:
+                results[name] = fastest(results[name], rerun[name])
+
+    regressions = 0
+
+    print()
+    print(
+        f"{'benchmark':<45} {'baseline':>10} {'current':>10} {'change':>8} "
+        f"{'noise':>7}"
+    )
+
+    for comparison in compare(results, baseline):
+        regressed = comparison.is_regression(args.threshold)
+        regressions += regressed
+        print(
+            f"{comparison.name:<45} {format_time(comparison.baseline):>10} "
+            f"{format_time(comparison.current):>10} "
+            f"{comparison.ratio - 1:>+8.1%} {comparison.allowed:>7.0%}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+
+    if regressions:
+        print(
+            f"\n{regressions} benchmark(s) regressed by more than {args.threshold:.0%}"
+        )
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
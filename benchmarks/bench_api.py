@@ -0,0 +1,85 @@
+"""Benchmarks for the overhead of the platform independent API"""
+
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+from time import perf_counter
+
+from desktop_notifier import DesktopNotifierSync, Notification
+from desktop_notifier.backends.dummy import DummyNotificationCenter
+
+from .harness import benchmark, run_async
+
+
+@benchmark("cache.clear_all", number=100000)
+def clear_all(number: int) -> float:
+    backend = DummyNotificationCenter("Benchmark")
+
+    for _ in range(number):
+        notification = Notification(title="Julius Caesar", message="Et tu, Brute?")
+        backend._notification_cache[notification.identifier] = notification
+
+    async def run() -> float:
+        t0 = perf_counter()
+        await backend.clear_all()
+        return perf_counter() - t0
+
+    return run_async(run())
+
+
+@benchmark("sync.send", number=2000)
+def sync_send(number: int) -> float:
+    notifier = DesktopNotifierSync("Benchmark")
+    notifier._async_api._backend = DummyNotificationCenter("Benchmark")
+    notifier._async_api._did_request_authorisation = True
+
+    notifications = [
+        Notification(title="Julius Caesar", message="Et tu, Brute?")
+        for _ in range(number)
+    ]
+
+    t0 = perf_counter()
+    for notification in notifications:
+        notifier.send_notification(notification)
+    return perf_counter() - t0
+
+
+@benchmark("sync.send_background", number=2000)
+def sync_send_background(number: int) -> float:
+    notifier = DesktopNotifierSync("Benchmark", background=True)
+    notifier._async_api._backend = DummyNotificationCenter("Benchmark")
+    notifier._async_api._did_request_authorisation = True
+
+    notifications = [
+        Notification(title="Julius Caesar", message="Et tu, Brute?")
+        for _ in range(number)
+    ]
+
+    t0 = perf_counter()
+    for notification in notifications:
+        notifier.send_notification(notification)
+    elapsed = perf_counter() - t0
+
+    notifier.close()
+    return elapsed
+
+
+@benchmark("import.desktop_notifier", number=1, repeat=10)
+def import_time(number: int) -> float:
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import desktop_notifier"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    # Lines are formatted as "import time: self [us] | cumulative | imported package".
+    match = re.search(
+        r"^import time:\s+\d+ \|\s+(\d+) \| desktop_notifier$", output, re.M
+    )
+    if not match:
+        raise RuntimeError("Could not parse import time")
+
+    return int(match.group(1)) * 1e-6
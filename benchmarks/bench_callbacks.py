@@ -0,0 +1,74 @@
+"""Benchmarks for dispatching interactions to callbacks"""
+
+from __future__ import annotations
+
+import platform
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from desktop_notifier import CallbackDispatcher, Notification
+
+from .harness import SkipBenchmark, benchmark
+
+if TYPE_CHECKING:
+    from desktop_notifier.backends.dbus import DBusDesktopNotifier
+
+
+def populated_backend(number: int) -> DBusDesktopNotifier:
+    if platform.system() != "Linux":
+        raise SkipBenchmark("requires the Linux backend")
+
+    from desktop_notifier.backends.dbus import DBusDesktopNotifier
+
+    backend = DBusDesktopNotifier("Benchmark")
+
+    for nid in range(1, number + 1):
+        notification = Notification(
+            title="Julius Caesar",
+            message="Et tu, Brute?",
+            on_clicked=lambda: None,
+            on_dismissed=lambda: None,
+        )
+        backend._notification_cache[notification.identifier] = notification
+        backend._platform_to_interface_notification_identifier[nid] = (
+            notification.identifier
+        )
+
+    return backend
+
+
+@benchmark("callbacks.on_action", number=10000)
+def on_action(number: int) -> float:
+    backend = populated_backend(number)
+
+    t0 = perf_counter()
+    for nid in range(1, number + 1):
+        backend._on_action(nid, "default")
+    return perf_counter() - t0
+
+
+@benchmark("callbacks.on_action_thread_pool", number=10000)
+def on_action_thread_pool(number: int) -> float:
+    """Time spent in the signal handler when callbacks run in a thread pool"""
+    backend = populated_backend(number)
+    backend.dispatcher = CallbackDispatcher.thread_pool(max_workers=4)
+
+    t0 = perf_counter()
+    for nid in range(1, number + 1):
+        backend._on_action(nid, "default")
+    elapsed = perf_counter() - t0
+
+    backend.dispatcher.close()
+    return elapsed
+
+
+@benchmark("callbacks.on_closed", number=10000)
+def on_closed(number: int) -> float:
+    from desktop_notifier.backends.dbus import NOTIFICATION_CLOSED_DISMISSED
+
+    backend = populated_backend(number)
+
+    t0 = perf_counter()
+    for nid in range(1, number + 1):
+        backend._on_closed(nid, NOTIFICATION_CLOSED_DISMISSED)
+    return perf_counter() - t0
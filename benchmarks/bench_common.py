@@ -0,0 +1,55 @@
+"""Benchmarks for constructing notifications and their resources"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from time import perf_counter
+
+from desktop_notifier import Button, Icon, Notification
+
+from .harness import benchmark
+
+
+@benchmark("construct.notification", number=10000)
+def construct_notification(number: int) -> float:
+    t0 = perf_counter()
+    for _ in range(number):
+        Notification(title="Julius Caesar", message="Et tu, Brute?")
+    return perf_counter() - t0
+
+
+@benchmark("construct.notification_with_buttons", number=10000)
+def construct_notification_with_buttons(number: int) -> float:
+    t0 = perf_counter()
+    for _ in range(number):
+        Notification(
+            title="Julius Caesar",
+            message="Et tu, Brute?",
+            buttons=(Button(title="Reply"), Button(title="Mark as read")),
+        )
+    return perf_counter() - t0
+
+
+@benchmark("construct.button", number=10000)
+def construct_button(number: int) -> float:
+    t0 = perf_counter()
+    for _ in range(number):
+        Button(title="Mark as read")
+    return perf_counter() - t0
+
+
+@benchmark("construct.icon_path", number=10000)
+def construct_icon_path(number: int) -> float:
+    path = Path("/usr/share/icons/hicolor/48x48/apps/python.png")
+    t0 = perf_counter()
+    for _ in range(number):
+        Icon(path=path)
+    return perf_counter() - t0
+
+
+@benchmark("construct.icon_name", number=10000)
+def construct_icon_name(number: int) -> float:
+    t0 = perf_counter()
+    for _ in range(number):
+        Icon(name="call-start")
+    return perf_counter() - t0
@@ -0,0 +1,210 @@
+"""
+Benchmarks for the Linux backend against a stand-in notification server
+
+The server runs on a private bus which is started on first use and shared between
+benchmarks. Every round uses a new event loop and therefore a new bus connection, which
+is established before timing starts.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import platform
+from time import perf_counter
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+from desktop_notifier import Notification
+
+from .harness import SkipBenchmark, benchmark, run_async
+
+if TYPE_CHECKING:
+    from desktop_notifier.backends.dbus import DBusDesktopNotifier
+    from tests.backends.dbus_server import NotificationServer
+
+_server: NotificationServer | None = None
+
+
+def notification_server(latency: float = 0.0) -> NotificationServer:
+    """Returns the shared stand-in server, starting it if required"""
+    global _server
+
+    if platform.system() != "Linux":
+        raise SkipBenchmark("requires the Linux backend")
+
+    from tests.backends.dbus_server import NotificationServer, dbus_daemon_available
+
+    if not dbus_daemon_available():
+        raise SkipBenchmark("requires dbus-daemon")
+
+    if not _server:
+        _server = NotificationServer()
+        _server.start()
+        atexit.register(_server.stop)
+        os.environ["DBUS_SESSION_BUS_ADDRESS"] = _server.address
+
+    _server.interface.latency = latency
+    _server.interface.notifications.clear()
+
+    return _server
+
+
+def make_notifications(number: int) -> list[Notification]:
+    return [
+        Notification(title="Julius Caesar", message=f"Et tu, Brute? ({i})")
+        for i in range(number)
+    ]
+
+
+def time_with_backend(
+    number: int,
+    latency: float,
+    run: Callable[[DBusDesktopNotifier, list[Notification]], Awaitable[None]],
+    interactive: bool = True,
+) -> float:
+    notification_server(latency)
+
+    from desktop_notifier.backends.dbus import DBusDesktopNotifier
+
+    async def main() -> float:
+        backend = DBusDesktopNotifier("Benchmark")
+        backend.interactive = interactive
+        # Connect before timing.
+        await backend.send(Notification(title="Warm-up", message=""))
+
+        notifications = make_notifications(number)
+        try:
+            t0 = perf_counter()
+            await run(backend, notifications)
+            return perf_counter() - t0
+        finally:
+            backend._release_connection()
+
+    return run_async(main())
+
+
+async def send_sequential(
+    backend: DBusDesktopNotifier, notifications: list[Notification]
+) -> None:
+    for notification in notifications:
+        await backend.send(notification)
+
+
+async def send_pipelined(
+    backend: DBusDesktopNotifier, notifications: list[Notification]
+) -> None:
+    await backend.send_many(notifications, max_in_flight=64)
+
+
+@benchmark("dbus.send_proxy", number=500)
+def send_proxy(number: int) -> float:
+    return time_with_backend(number, 0.0, send_sequential)
+
+
+@benchmark("dbus.send_many_pipelined", number=500)
+def send_many_pipelined(number: int) -> float:
+    return time_with_backend(number, 0.0, send_pipelined)
+
+
+@benchmark("dbus.send_no_reply", number=500)
+def send_no_reply(number: int) -> float:
+    return time_with_backend(number, 0.0, send_sequential, interactive=False)
+
+
+@benchmark("dbus.send_proxy_1ms_latency", number=100)
+def send_proxy_latency(number: int) -> float:
+    return time_with_backend(number, 0.001, send_sequential)
+
+
+@benchmark("dbus.send_many_pipelined_1ms_latency", number=100)
+def send_many_pipelined_latency(number: int) -> float:
+    return time_with_backend(number, 0.001, send_pipelined)
+
+
+@benchmark("dbus.clear_all", number=500)
+def clear_all(number: int) -> float:
+    elapsed = 0.0
+
+    async def run(
+        backend: DBusDesktopNotifier, notifications: list[Notification]
+    ) -> None:
+        await backend.send_many(notifications, max_in_flight=64)
+        t0 = perf_counter()
+        await backend.clear_all()
+        # Only time clearing, not sending.
+        nonlocal elapsed
+        elapsed = perf_counter() - t0
+
+    time_with_backend(number, 0.0, run)
+    return elapsed
+
+
+@benchmark("dbus.cold_send", number=20)
+def cold_send(number: int) -> float:
+    notification_server(0.001)
+
+    from desktop_notifier.backends.dbus import DBusDesktopNotifier
+
+    async def main() -> float:
+        elapsed = 0.0
+
+        for notification in make_notifications(number):
+            backend = DBusDesktopNotifier("Benchmark")
+            t0 = perf_counter()
+            await backend.send(notification)
+            elapsed += perf_counter() - t0
+            backend._release_connection()
+
+        return elapsed
+
+    return run_async(main())
+
+
+@benchmark("dbus.signal_storm", number=100_000)
+def signal_storm(number: int) -> float:
+    notification_server()
+
+    from dbus_fast import Message, MessageType
+
+    from desktop_notifier.backends.dbus import DBusDesktopNotifier
+
+    async def main() -> float:
+        backend = DBusDesktopNotifier("Benchmark")
+        await backend.send(Notification(title="Warm-up", message=""))
+        assert backend._connection
+
+        bus = backend._connection.bus
+        reply = await bus.call(
+            Message(
+                destination="org.freedesktop.DBus",
+                path="/org/freedesktop/DBus",
+                interface="org.freedesktop.DBus",
+                member="GetNameOwner",
+                signature="s",
+                body=["org.freedesktop.Notifications"],
+            )
+        )
+        # NotificationClosed signals for the notifications of other clients, as
+        # broadcast by the server on a busy desktop.
+        messages = [
+            Message(
+                message_type=MessageType.SIGNAL,
+                sender=reply.body[0],
+                path="/org/freedesktop/Notifications",
+                interface="org.freedesktop.Notifications",
+                member="NotificationClosed",
+                signature="uu",
+                body=[100_000 + i, 2],
+            )
+            for i in range(number)
+        ]
+
+        try:
+            t0 = perf_counter()
+            for message in messages:
+                bus._process_message(message)
+            return perf_counter() - t0
+        finally:
+            backend._release_connection()
+
+    return run_async(main())
@@ -0,0 +1,215 @@
+"""
+A minimal benchmark harness
+
+Benchmarks are registered with the :func:`benchmark` decorator. Each benchmark function
+receives the number of operations to perform per round and returns the time in seconds
+that these operations took. Setup which should not be timed happens inside the
+benchmark function itself.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import platform
+import statistics
+import sys
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Coroutine
+
+__all__ = [
+    "Benchmark",
+    "Result",
+    "Comparison",
+    "SkipBenchmark",
+    "benchmark",
+    "run_async",
+    "run_benchmarks",
+    "compare",
+    "fastest",
+    "BENCHMARKS",
+    "NOISE_FACTOR",
+]
+
+
+BenchmarkFunc = Callable[[int], float]
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark which cannot run in the current environment"""
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A registered benchmark"""
+
+    name: str
+    func: BenchmarkFunc
+    number: int
+    repeat: int
+
+
+@dataclass(frozen=True)
+class Result:
+    """Timings of a benchmark, in seconds per operation"""
+
+    name: str
+    number: int
+    repeat: int
+    median: float
+    mean: float
+    min: float
+    stdev: float
+
+    @property
+    def spread(self) -> float:
+        """The standard deviation of the rounds relative to their median"""
+        return self.stdev / self.median if self.median > 0 else 0.0
+
+
+# Slowdowns within this many relative standard deviations of the rounds are treated as
+# noise, regardless of the threshold.
+NOISE_FACTOR = 2.0
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """Comparison of a result against its baseline"""
+
+    name: str
+    baseline: float
+    current: float
+    spread: float = 0.0
+    """The larger relative standard deviation of the baseline and current rounds"""
+
+    @property
+    def ratio(self) -> float:
+        """The current time relative to the baseline"""
+        return self.current / self.baseline
+
+    @property
+    def allowed(self) -> float:
+        """The slowdown which is tolerated as noise for a threshold of zero"""
+        return NOISE_FACTOR * self.spread
+
+    def is_regression(self, threshold: float) -> bool:
+        """
+        Whether the result is slower than the baseline by more than threshold, or by
+        more than the noise of the rounds if that is larger
+        """
+        return self.ratio > 1 + max(threshold, self.allowed)
+
+
+BENCHMARKS: list[Benchmark] = []
+
+
+def benchmark(
+    name: str, number: int = 1000, repeat: int = 5
+) -> Callable[[BenchmarkFunc], BenchmarkFunc]:
+    """
+    Registers a benchmark
+
+    :param name: Unique name of the benchmark, used as key in results.
+    :param number: Number of operations per round.
+    :param repeat: Number of rounds.
+    """
+
+    def decorator(func: BenchmarkFunc) -> BenchmarkFunc:
+        BENCHMARKS.append(Benchmark(name, func, number, repeat))
+        return func
+
+    return decorator
+
+
+def run_async(coro: Coroutine[Any, Any, float]) -> float:
+    """Runs a coroutine which returns a timing on a fresh event loop"""
+    return asyncio.run(coro)
+
+
+def run_benchmarks(
+    pattern: str = "*", log: Callable[[str], Any] = print
+) -> dict[str, Result]:
+    """
+    Runs all registered benchmarks with names matching pattern
+
+    :param pattern: A glob pattern to select benchmarks by name.
+    :param log: Function to call with progress messages.
+    :returns: Results by benchmark name.
+    """
+    results: dict[str, Result] = {}
+
+    for bench in BENCHMARKS:
+        if not fnmatch.fnmatch(bench.name, pattern):
+            continue
+
+        try:
+            timings = [bench.func(bench.number) / bench.number]
+            for _ in range(bench.repeat - 1):
+                timings.append(bench.func(bench.number) / bench.number)
+        except SkipBenchmark as exc:
+            log(f"{bench.name}: skipped ({exc})")
+            continue
+
+        result = Result(
+            name=bench.name,
+            number=bench.number,
+            repeat=bench.repeat,
+            median=statistics.median(timings),
+            mean=statistics.mean(timings),
+            min=min(timings),
+            stdev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        )
+        results[bench.name] = result
+        log(f"{bench.name}: {format_time(result.median)} per op")
+
+    return results
+
+
+def compare(
+    results: dict[str, Result], baseline: dict[str, Result]
+) -> list[Comparison]:
+    """
+    Compares results against the baseline where both exist
+
+    The fastest round is used for comparisons since it is least affected by noise from
+    other processes. The spread of the rounds widens the threshold for benchmarks which
+    are noisy on the machine.
+    """
+    return [
+        Comparison(
+            name,
+            baseline[name].min,
+            result.min,
+            max(baseline[name].spread, result.spread),
+        )
+        for name, result in results.items()
+        if name in baseline
+    ]
+
+
+def fastest(*results: Result) -> Result:
+    """Returns the result with the fastest round of several runs of a benchmark"""
+    return min(results, key=lambda result: result.min)
+
+
+def format_time(seconds: float) -> str:
+    """Formats a duration with a suitable unit"""
+    for unit, factor in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= factor:
+            return f"{seconds / factor:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def to_json(results: dict[str, Result]) -> dict[str, Any]:
+    """Serializes results together with information about the environment"""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "results": {name: asdict(result) for name, result in results.items()},
+    }
+
+
+def from_json(data: dict[str, Any]) -> dict[str, Result]:
+    """Deserializes results written by :func:`to_json`"""
+    return {name: Result(**result) for name, result in data["results"].items()}
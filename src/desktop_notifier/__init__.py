@@ -2,20 +2,50 @@
 """
 Desktop notifications for Windows, Linux, macOS, iOS and iPadOS.
 """
-from .main import (
-    DEFAULT_ICON,
-    DEFAULT_SOUND,
-    Attachment,
-    Button,
-    Capability,
-    DesktopNotifier,
-    Icon,
-    Notification,
-    ReplyField,
-    Sound,
-    Urgency,
-)
-from .sync import DesktopNotifierSync
+from __future__ import annotations
+
+from importlib import import_module
+
+# Avoid importing typing at runtime, it is not needed to use the package.
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from .breaker import BreakerInfo, BreakerState
+    from .cache import CacheInfo
+    from .coalescing import ThreadCoalescer
+    from .common import (
+        DEFAULT_ICON,
+        DEFAULT_SOUND,
+        Attachment,
+        Button,
+        Capability,
+        Icon,
+        Notification,
+        ReplyField,
+        SendResult,
+        Sound,
+        Urgency,
+    )
+    from .dedup import Deduplicator
+    from .dispatch import CallbackDispatcher, DispatchInfo
+    from .events import (
+        ButtonPressed,
+        Cleared,
+        Clicked,
+        Dismissed,
+        EventOverflow,
+        EventStream,
+        Evicted,
+        Expired,
+        NotificationEvent,
+        Replied,
+    )
+    from .main import DesktopNotifier
+    from .outbox import Outbox, OutboxInfo
+    from .scheduler import DispatchScheduler, OverflowPolicy, SchedulerInfo
+    from .sync import DesktopNotifierSync
 
 __version__ = "6.0.0"
 __author__ = "Sam Schott"
@@ -34,7 +64,85 @@ __all__ = [
     "Attachment",
     "DesktopNotifier",
     "DesktopNotifierSync",
+    "SendResult",
+    "CacheInfo",
+    "BreakerInfo",
+    "BreakerState",
+    "DispatchScheduler",
+    "OverflowPolicy",
+    "SchedulerInfo",
+    "ThreadCoalescer",
+    "Deduplicator",
+    "CallbackDispatcher",
+    "DispatchInfo",
+    "NotificationEvent",
+    "Clicked",
+    "Dismissed",
+    "ButtonPressed",
+    "Replied",
+    "Expired",
+    "Cleared",
+    "Evicted",
+    "EventOverflow",
+    "EventStream",
+    "Outbox",
+    "OutboxInfo",
     "Capability",
     "DEFAULT_SOUND",
     "DEFAULT_ICON",
 ]
+
+# Public names by the module which defines them. Modules are only imported when one of
+# their names is first accessed to keep importing the package fast, see PEP 562.
+_lazy_imports = {
+    "Notification": ".common",
+    "Button": ".common",
+    "ReplyField": ".common",
+    "Urgency": ".common",
+    "Icon": ".common",
+    "Sound": ".common",
+    "Attachment": ".common",
+    "SendResult": ".common",
+    "Capability": ".common",
+    "DEFAULT_SOUND": ".common",
+    "DEFAULT_ICON": ".common",
+    "CacheInfo": ".cache",
+    "BreakerInfo": ".breaker",
+    "BreakerState": ".breaker",
+    "DispatchScheduler": ".scheduler",
+    "OverflowPolicy": ".scheduler",
+    "SchedulerInfo": ".scheduler",
+    "ThreadCoalescer": ".coalescing",
+    "Deduplicator": ".dedup",
+    "CallbackDispatcher": ".dispatch",
+    "DispatchInfo": ".dispatch",
+    "NotificationEvent": ".events",
+    "Clicked": ".events",
+    "Dismissed": ".events",
+    "ButtonPressed": ".events",
+    "Replied": ".events",
+    "Expired": ".events",
+    "Cleared": ".events",
+    "Evicted": ".events",
+    "EventOverflow": ".events",
+    "EventStream": ".events",
+    "Outbox": ".outbox",
+    "OutboxInfo": ".outbox",
+    "DesktopNotifier": ".main",
+    "DesktopNotifierSync": ".sync",
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name = _lazy_imports[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -4,11 +4,31 @@ This module defines the abstract implementation class that backends must inherit
 """
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
+import time
+import weakref
 from abc import ABC, abstractmethod
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterator, Sequence
 
+from ..breaker import BreakerInfo, BreakerState, CircuitBreaker, CircuitOpenError
+from ..cache import NotificationCache
 from ..common import Capability, Notification
+from ..dispatch import CallbackDispatcher
+from ..events import (
+    ButtonPressed,
+    Cleared,
+    Clicked,
+    Dismissed,
+    EventStream,
+    Evicted,
+    NotificationEvent,
+    Replied,
+)
+
+if TYPE_CHECKING:
+    from ..outbox import Outbox
 
 __all__ = [
     "DesktopNotifierBackend",
@@ -26,12 +46,43 @@ class DesktopNotifierBackend(ABC):
 
     def __init__(self, app_name: str) -> None:
         self.app_name = app_name
-        self._notification_cache: dict[str, Notification] = dict()
+        self._notification_cache = NotificationCache(
+            on_evict=self._on_notification_evicted
+        )
+        self._breaker = CircuitBreaker()
+
+        # Whether interactions with notifications are handled. If not, notifications
+        # are not cached for callbacks and backends may skip listening for them.
+        self.interactive = True
+
+        # Incremented when the notification server changes, for instance because it
+        # was restarted, to invalidate information which callers cached about it.
+        self._server_generation = 0
+
+        self._outbox: Outbox | None = None
+        self._outbox_task: asyncio.Future[None] | None = None
+
+        # Number of calls to the platform in flight, and futures to resolve when the
+        # last one completed.
+        self._in_flight = 0
+        self._idle_waiters: list[asyncio.Future[None]] = []
+
+        # Runs callbacks for interactions with notifications.
+        self.dispatcher = CallbackDispatcher()
+
+        # Subscribers to events for interactions. Streams which are no longer
+        # referenced by their consumer are dropped when the next event is published.
+        self._event_streams: list[weakref.ref[EventStream]] = []
+
+        # Futures to resolve with the next event for a notification, see
+        # :meth:`expect_outcome`.
+        self._outcome_waiters: dict[str, list[asyncio.Future[NotificationEvent]]] = {}
 
         self.on_clicked: Callable[[str], Any] | None = None
         self.on_dismissed: Callable[[str], Any] | None = None
         self.on_button_pressed: Callable[[str, str], Any] | None = None
         self.on_replied: Callable[[str, str], Any] | None = None
+        self.on_evicted: Callable[[str], Any] | None = None
 
     @abstractmethod
     async def request_authorisation(self) -> bool:
@@ -49,23 +100,345 @@ class DesktopNotifierBackend(ABC):
         """
         ...
 
-    async def send(self, notification: Notification) -> None:
+    @property
+    def outbox(self) -> Outbox | None:
         """
-        Sends a desktop notification.
+        Outbox to store notifications in which cannot be delivered because the
+        notification server is unavailable
+        """
+        return self._outbox
+
+    @outbox.setter
+    def outbox(self, outbox: Outbox | None) -> None:
+        """Setter: outbox"""
+        if outbox is not None:
+            outbox.on_drop = self._on_outbox_drop
+        self._outbox = outbox
+
+    async def send(self, notification: Notification) -> bool:
+        """
+        Sends a desktop notification. If an :attr:`outbox` is set, notifications which
+        cannot be delivered because the notification server is unavailable are stored
+        in it and delivered in order once the server is available again.
 
         :param notification: Notification to send.
+        :returns: Whether the notification was sent or stored in the outbox.
         """
+        if self.outbox is not None and (len(self.outbox) > 0 or self._outbox_task):
+            # Keep the order of notifications which are waiting in the outbox.
+            self._put_in_outbox(notification)
+            return True
+
+        error = await self._call_guarded(self._send, notification)
+
+        if error is None:
+            logger.debug("Notification sent: %s", notification)
+            self._cache_notification(notification)
+            return True
+
+        if self.outbox is not None and self._should_retry(error):
+            self._put_in_outbox(notification)
+            return True
+
+        self.fail_outcome(notification.identifier, error)
+        return False
+
+    async def drain_outbox(self) -> None:
+        """
+        Delivers all notifications in the :attr:`outbox`. This waits until the
+        notification server is available.
+        """
+        if self.outbox is None or (len(self.outbox) == 0 and not self._outbox_task):
+            return
+
+        if not self._outbox_task:
+            self._outbox_task = asyncio.ensure_future(self._drain_outbox())
+
+        await asyncio.shield(self._outbox_task)
+
+    def _put_in_outbox(self, notification: Notification) -> None:
+        assert self.outbox is not None
+        logger.debug("Notification added to outbox: %s", notification)
+        self.outbox.put(notification)
+
+        if not self._outbox_task:
+            self._outbox_task = asyncio.ensure_future(self._drain_outbox())
+
+    async def _drain_outbox(self) -> None:
+        assert self.outbox is not None
+
         try:
-            await self._send(notification)
-        except Exception:
-            # Notifications can fail for many reasons:
-            # The dbus service may not be available, we might be in a headless session,
-            # etc. Since notifications are not critical to an application, we only emit
-            # a warning.
-            logger.warning("Notification failed", exc_info=True)
+            while notification := self.outbox.peek():
+                retry_in = self._breaker.info().retry_in
+                if retry_in > 0:
+                    await asyncio.sleep(retry_in)
+                    continue
+
+                error = await self._call_guarded(self._send, notification)
+
+                if error is None:
+                    logger.debug("Notification sent from outbox: %s", notification)
+                    self.outbox.remove(notification.identifier)
+                    self._cache_notification(notification)
+                elif self._should_retry(error):
+                    # Another call may be probing the server, or the breaker did not
+                    # open yet.
+                    await asyncio.sleep(self._breaker.base_delay)
+                else:
+                    # The server rejected the notification itself. Retrying would only
+                    # hold up the notifications behind it.
+                    logger.warning(
+                        "Notification dropped from outbox, it cannot be delivered: %s",
+                        notification,
+                    )
+                    self.outbox.remove(notification.identifier, delivered=False)
+                    self.fail_outcome(notification.identifier, error)
+        finally:
+            self._outbox_task = None
+
+    def _on_outbox_drop(self, identifier: str, expired: bool) -> None:
+        reason = "expired" if expired else "dropped, the outbox is full"
+        error = RuntimeError(f"Notification {reason}: {identifier}")
+        self.fail_outcome(identifier, error)
+
+    def _should_retry(self, error: Exception) -> bool:
+        return isinstance(error, CircuitOpenError) or self._is_unavailable_error(error)
+
+    async def send_many(
+        self, notifications: Sequence[Notification], max_in_flight: int
+    ) -> list[Exception | None]:
+        """
+        Sends multiple desktop notifications with a bounded number of concurrent
+        requests. This is a wrapper method which mostly performs housekeeping of the
+        notification cache and calls :meth:`_send_many` to actually send the
+        notifications.
+
+        :param notifications: Notifications to send.
+        :param max_in_flight: Maximum number of notifications which may be in flight
+            at the same time.
+        :returns: For each notification, in input order, the exception raised when
+            sending it or ``None`` if it was sent successfully or stored in the
+            :attr:`outbox`. While the notification server is unavailable and no outbox
+            is set, this is a :class:`CircuitOpenError` for each notification.
+        """
+        if not notifications:
+            return []
+
+        if self.outbox is not None and (len(self.outbox) > 0 or self._outbox_task):
+            # Keep the order of notifications which are waiting in the outbox.
+            for notification in notifications:
+                self._put_in_outbox(notification)
+            return [None] * len(notifications)
+
+        if not self._breaker.allow():
+            logger.debug("Notification server unavailable, batch not sent")
+            rejected: list[Exception | None] = [CircuitOpenError()] * len(notifications)
+            return self._put_unavailable_in_outbox(notifications, rejected)
+
+        # Populate the cache before sending so that interactions which are reported
+        # while the rest of the batch is still in flight find their notification.
+        for notification in notifications:
+            self._cache_notification(notification)
+
+        try:
+            with self._track_in_flight():
+                errors = await self._send_many(notifications, max_in_flight)
+        except BaseException:
+            self._breaker.release()
+            raise
+
+        unavailable: list[Exception] = []
+
+        for notification, error in zip(notifications, errors):
+            if error is None:
+                logger.debug("Notification sent: %s", notification)
+            else:
+                if self._is_unavailable_error(error):
+                    unavailable.append(error)
+                else:
+                    logger.warning("Notification failed", exc_info=error)
+                self._clear_notification_from_cache(notification.identifier)
+
+        # Only count the batch as a failure if none of it reached the server.
+        if unavailable and len(unavailable) == len(notifications):
+            self._record_unavailable(unavailable[0])
         else:
-            logger.debug("Notification sent: %s", notification)
+            if unavailable:
+                logger.warning("Notification failed", exc_info=unavailable[0])
+            self._record_available()
+
+        return self._put_unavailable_in_outbox(notifications, errors)
+
+    def _put_unavailable_in_outbox(
+        self, notifications: Sequence[Notification], errors: list[Exception | None]
+    ) -> list[Exception | None]:
+        """
+        Stores notifications of a batch which failed because the notification server
+        is unavailable in the outbox, if set, and returns their errors as ``None``
+        """
+        if self.outbox is None:
+            return errors
+
+        results: list[Exception | None] = []
+
+        for notification, error in zip(notifications, errors):
+            if error is not None and self._should_retry(error):
+                self._put_in_outbox(notification)
+                error = None
+            results.append(error)
+
+        return results
+
+    async def replace(self, notification: Notification) -> None:
+        """
+        Replaces a notification which was previously sent with the same identifier,
+        updating it in place where supported by the platform. This is a wrapper method
+        which mostly performs housekeeping of the notification cache and calls
+        :meth:`_replace` to actually replace the notification.
+
+        :param notification: Notification to send in place of the notification with
+            the same identifier.
+        """
+        if await self._call_guarded(self._replace, notification) is None:
+            logger.debug("Notification replaced: %s", notification)
+            self._cache_notification(notification)
+
+    async def flush(self) -> None:
+        """
+        Waits until calls to the platform which are in flight have completed and the
+        :attr:`outbox` has been delivered. This waits until the notification server is
+        available if the outbox is not empty.
+        """
+        await self.drain_outbox()
+        await self._wait_idle()
+
+    async def close(self) -> None:
+        """
+        Releases the resources of the backend after waiting for calls to the platform
+        which are in flight. Delivery of the :attr:`outbox` is stopped and the outbox is
+        closed, its notifications are kept for the next run. This is a wrapper method
+        which calls :meth:`_close` to release platform resources.
+
+        The backend connects to the platform again when it is used after closing.
+        """
+        if self._outbox_task:
+            self._outbox_task.cancel()
+            await asyncio.wait({self._outbox_task})
+
+        await self._wait_idle()
+
+        # Interactions are no longer handled after closing.
+        for identifier in list(self._outcome_waiters):
+            notification = self._notification_cache.get(identifier)
+            self._publish(Evicted, identifier, notification)
+
+        if self.outbox is not None:
+            self.outbox.close()
+            self.outbox = None
+
+        await self._close()
+
+    @contextlib.contextmanager
+    def _track_in_flight(self) -> Iterator[None]:
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                for waiter in self._idle_waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+                self._idle_waiters.clear()
+
+    async def _wait_idle(self) -> None:
+        """Waits until no calls to the platform are in flight"""
+        if self._in_flight > 0:
+            waiter = asyncio.get_running_loop().create_future()
+            self._idle_waiters.append(waiter)
+            await waiter
+
+    def breaker_info(self) -> BreakerInfo:
+        """
+        Returns the state of the circuit breaker which stops sending notifications
+        while the notification server is unavailable.
+        """
+        return self._breaker.info()
+
+    async def _call_guarded(
+        self,
+        method: Callable[[Notification], Awaitable[None]],
+        notification: Notification,
+    ) -> Exception | None:
+        """
+        Calls the given method to deliver a notification unless the circuit breaker is
+        open, and logs failures instead of raising them. Returns the exception if the
+        notification was not delivered, or ``None`` if it was.
+        """
+        if not self._breaker.allow():
+            logger.debug("Notification server unavailable, not sent: %s", notification)
+            return CircuitOpenError()
+
+        try:
+            with self._track_in_flight():
+                await method(notification)
+        except Exception as exc:
+            if self._is_unavailable_error(exc):
+                self._record_unavailable(exc)
+            else:
+                # Notifications can fail for many reasons. Since notifications are not
+                # critical to an application, we only emit a warning.
+                self._record_available()
+                logger.warning("Notification failed", exc_info=True)
+            return exc
+        except BaseException:
+            self._breaker.release()
+            raise
+
+        self._record_available()
+        return None
+
+    def _record_available(self) -> None:
+        if self._breaker.state is not BreakerState.Closed:
+            logger.info("Notification server available again")
+        self._breaker.record_success()
+
+    def _record_unavailable(self, exc: BaseException) -> None:
+        # Log a full warning for every failure until the breaker opens. After that,
+        # failures only happen once per backoff delay for the probe.
+        was_closed = self._breaker.state is BreakerState.Closed
+        self._breaker.record_failure()
+
+        if was_closed:
+            logger.warning("Notification failed", exc_info=exc)
+
+        if self._breaker.state is BreakerState.Open:
+            logger.warning(
+                "Notification server unavailable, retrying in %.0f s",
+                self._breaker.delay,
+            )
+
+    def _is_unavailable_error(self, exc: BaseException) -> bool:
+        """
+        Returns whether an exception raised when sending a notification means that the
+        notification server is unavailable, as opposed to a problem with the
+        notification itself. Only the former opens the circuit breaker. By default,
+        failures to connect or lost connections count as unavailable. Backends should
+        extend this for errors which the platform reports when there is no server.
+        """
+        # ConnectionError is a subclass of OSError.
+        return isinstance(exc, (OSError, EOFError))
+
+    def _cache_notification(self, notification: Notification) -> None:
+        """
+        Keeps track of a sent notification to handle interactions with it, unless the
+        backend is not :attr:`interactive`.
+        """
+        if self.interactive:
             self._notification_cache[notification.identifier] = notification
+            # Interactions may be reported from other threads, coroutine callbacks are
+            # run in the loop which sent the notification.
+            self.dispatcher.loop = asyncio.get_running_loop()
 
     def _clear_notification_from_cache(self, identifier: str) -> Notification | None:
         """
@@ -74,6 +447,26 @@ class DesktopNotifierBackend(ABC):
         """
         return self._notification_cache.pop(identifier, None)
 
+    def _on_notification_evicted(
+        self, identifier: str, notification: Notification
+    ) -> None:
+        """
+        Called when a notification is evicted from our cache because of its size or age
+        limits. Backends should extend this to release any platform state which they
+        keep for the notification.
+        """
+        logger.debug("Notification evicted from cache: %s", notification)
+        if self.on_evicted:
+            self.on_evicted(identifier)
+        self._publish(Evicted, identifier, notification)
+
+    async def _close(self) -> None:
+        """
+        Method to release platform resources, such as connections to the notification
+        server. Subclasses should override this if they hold any. The default
+        implementation does nothing.
+        """
+
     @abstractmethod
     async def _send(self, notification: Notification) -> None:
         """
@@ -89,9 +482,62 @@ class DesktopNotifierBackend(ABC):
         """
         ...
 
+    async def _replace(self, notification: Notification) -> None:
+        """
+        Method to replace a notification which was previously sent with the same
+        identifier. Subclasses should override this if the platform can update a
+        notification in place. The default implementation clears the previous
+        notification and sends the new one.
+
+        Implementations must raise an exception when the notification could not be
+        delivered.
+
+        :param notification: Notification to send.
+        """
+        try:
+            await self._clear(notification.identifier)
+        except Exception:
+            logger.debug("Could not clear notification before replacing it")
+
+        await self._send(notification)
+
+    async def _send_many(
+        self, notifications: Sequence[Notification], max_in_flight: int
+    ) -> list[Exception | None]:
+        """
+        Method to send multiple notifications via the platform. Subclasses may override
+        this to use a native batch API. The default implementation calls :meth:`_send`
+        from at most ``max_in_flight`` concurrent workers.
+
+        Implementations must not raise an exception when individual notifications
+        could not be delivered but return it at the notification's position instead.
+
+        :param notifications: Notifications to send.
+        :param max_in_flight: Maximum number of notifications which may be in flight
+            at the same time.
+        :returns: For each notification, in input order, the exception raised when
+            sending it or ``None`` if it was sent successfully.
+        """
+        errors: list[Exception | None] = [None] * len(notifications)
+        pending = iter(enumerate(notifications))
+
+        async def worker() -> None:
+            # Workers share the iterator, each picks the next notification as soon as
+            # its previous send completes.
+            for index, notification in pending:
+                try:
+                    await self._send(notification)
+                except Exception as exc:
+                    errors[index] = exc
+
+        n_workers = min(max_in_flight, len(notifications))
+        await asyncio.gather(*(worker() for _ in range(n_workers)))
+
+        return errors
+
     async def get_current_notifications(self) -> list[str]:
         """Returns identifiers of all currently displayed notifications for this app."""
-        return list(self._notification_cache.keys())
+        return self._notification_cache.keys()
 
     async def clear(self, identifier: str) -> None:
         """
@@ -103,7 +549,8 @@ class DesktopNotifierBackend(ABC):
         :param identifier: Notification identifier.
         """
         await self._clear(identifier)
-        self._clear_notification_from_cache(identifier)
+        notification = self._clear_notification_from_cache(identifier)
+        self._publish(Cleared, identifier, notification)
 
     @abstractmethod
     async def _clear(self, identifier: str) -> None:
@@ -124,6 +571,12 @@ class DesktopNotifierBackend(ABC):
         """
 
         await self._clear_all()
+
+        if self._event_streams or self._outcome_waiters:
+            for identifier in self._notification_cache.keys():
+                notification = self._notification_cache.get(identifier)
+                self._publish(Cleared, identifier, notification)
+
         self._notification_cache.clear()
 
     @abstractmethod
@@ -146,17 +599,21 @@ class DesktopNotifierBackend(ABC):
         self, identifier: str, notification: Notification | None = None
     ) -> None:
         if notification and notification.on_clicked:
-            notification.on_clicked()
+            self.dispatcher.dispatch(identifier, notification.on_clicked)
         elif self.on_clicked:
-            self.on_clicked(identifier)
+            self.dispatcher.dispatch(identifier, self.on_clicked, identifier)
+
+        self._publish(Clicked, identifier, notification)
 
     def handle_dismissed(
         self, identifier: str, notification: Notification | None = None
     ) -> None:
         if notification and notification.on_dismissed:
-            notification.on_dismissed()
+            self.dispatcher.dispatch(identifier, notification.on_dismissed)
         elif self.on_dismissed:
-            self.on_dismissed(identifier)
+            self.dispatcher.dispatch(identifier, self.on_dismissed, identifier)
+
+        self._publish(Dismissed, identifier, notification)
 
     def handle_replied(
         self, identifier: str, reply_text: str, notification: Notification | None = None
@@ -166,9 +623,15 @@ class DesktopNotifierBackend(ABC):
             and notification.reply_field
             and notification.reply_field.on_replied
         ):
-            notification.reply_field.on_replied(reply_text)
+            self.dispatcher.dispatch(
+                identifier, notification.reply_field.on_replied, reply_text
+            )
         elif self.on_replied:
-            self.on_replied(identifier, reply_text)
+            self.dispatcher.dispatch(
+                identifier, self.on_replied, identifier, reply_text
+            )
+
+        self._publish(Replied, identifier, notification, reply_text)
 
     def handle_button(
         self,
@@ -182,6 +645,120 @@ class DesktopNotifierBackend(ABC):
             button = None
 
         if button and button.on_pressed:
-            button.on_pressed()
+            self.dispatcher.dispatch(identifier, button.on_pressed)
         elif self.on_button_pressed:
-            self.on_button_pressed(identifier, button_identifier)
+            self.dispatcher.dispatch(
+                identifier, self.on_button_pressed, identifier, button_identifier
+            )
+
+        self._publish(ButtonPressed, identifier, notification, button_identifier)
+
+    def subscribe(self, stream: EventStream) -> None:
+        """
+        Delivers events for interactions with notifications to a stream until it is
+        closed.
+
+        :param stream: The stream to deliver events to.
+        """
+        self._event_streams.append(weakref.ref(stream))
+
+    def expect_outcome(self, identifier: str) -> asyncio.Future[NotificationEvent]:
+        """
+        Returns a future which is resolved with the next event for a notification, such
+        as an interaction or the notification being cleared. Call
+        :meth:`forget_outcome` if the future is no longer awaited.
+
+        :param identifier: Identifier of the notification.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._outcome_waiters.setdefault(identifier, []).append(future)
+        return future
+
+    def forget_outcome(
+        self, identifier: str, future: asyncio.Future[NotificationEvent]
+    ) -> None:
+        """
+        Stops resolving a future returned by :meth:`expect_outcome`.
+
+        :param identifier: Identifier of the notification.
+        :param future: The future to forget.
+        """
+        waiters = self._outcome_waiters.get(identifier)
+
+        if waiters and future in waiters:
+            waiters.remove(future)
+            if not waiters:
+                del self._outcome_waiters[identifier]
+
+    def fail_outcome(self, identifier: str, error: Exception) -> None:
+        """
+        Raises an error from the futures returned by :meth:`expect_outcome` for a
+        notification which could not be sent.
+
+        :param identifier: Identifier of the notification.
+        :param error: The error to raise.
+        """
+        for waiter in self._outcome_waiters.pop(identifier, []):
+            if not waiter.done():
+                waiter.set_exception(error)
+
+    def publish_event(self, event: NotificationEvent) -> None:
+        """
+        Delivers an event to all subscribed streams and resolves the futures which
+        expect an outcome for its notification. This may be called from any thread.
+
+        :param event: The event to deliver.
+        """
+        waiters = self._outcome_waiters.pop(event.identifier, None)
+
+        if waiters:
+            loop = waiters[0].get_loop()
+            try:
+                running_loop: asyncio.AbstractEventLoop | None = (
+                    asyncio.get_running_loop()
+                )
+            except RuntimeError:
+                running_loop = None
+
+            if running_loop is loop:
+                _resolve_waiters(waiters, event)
+            elif not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve_waiters, waiters, event)
+
+        live = []
+
+        for ref in self._event_streams:
+            stream = ref()
+            if stream is not None and not stream.closed:
+                live.append(ref)
+                stream.put(event)
+
+        self._event_streams = live
+
+    def _publish(
+        self,
+        event_type: type[NotificationEvent],
+        identifier: str,
+        notification: Notification | None,
+        *args: Any,
+    ) -> None:
+        """Publishes an event for a notification if anyone is listening"""
+        if self._event_streams or self._outcome_waiters:
+            thread = notification.thread if notification else None
+            self.publish_event(event_type(identifier, thread, time.time(), *args))
+
+    def close_event_streams(self) -> None:
+        """Closes all subscribed streams"""
+        for ref in self._event_streams:
+            stream = ref()
+            if stream is not None:
+                stream.close()
+        self._event_streams.clear()
+
+
+def _resolve_waiters(
+    waiters: list[asyncio.Future[NotificationEvent]], event: NotificationEvent
+) -> None:
+    for waiter in waiters:
+        if not waiter.done():
+            waiter.set_result(event)
@@ -7,16 +7,27 @@ interaction with a notification requires a running asyncio event loop.
 """
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import json
 import logging
-from typing import TypeVar
+import os
+import weakref
+from functools import partial
+from pathlib import Path
+from typing import Any, Iterable, Sequence, TypeVar
 
 from bidict import bidict
 from dbus_fast.aio.message_bus import MessageBus
 from dbus_fast.aio.proxy_object import ProxyInterface
+from dbus_fast.constants import MessageFlag, MessageType
 from dbus_fast.errors import DBusError
+from dbus_fast.introspection import Node
+from dbus_fast.message import Message
 from dbus_fast.signature import Variant
 
 from ..common import Capability, Notification, Urgency
+from ..events import Cleared, Expired
 from .base import DesktopNotifierBackend
 
 __all__ = ["DBusDesktopNotifier"]
@@ -30,12 +41,412 @@ NOTIFICATION_CLOSED_DISMISSED = 2
 NOTIFICATION_CLOSED_PROGRAMMATICALLY = 3
 NOTIFICATION_CLOSED_UNDEFINED = 4
 
+# Introspection data of the org.freedesktop.Notifications interface as defined by
+# version 1.2 of the specification. This is used until the notification server has been
+# introspected to avoid an additional round trip before the first notification.
+NOTIFICATIONS_INTROSPECTION = """
+<node>
+  <interface name="org.freedesktop.Notifications">
+    <method name="Notify">
+      <arg name="app_name" type="s" direction="in"/>
+      <arg name="replaces_id" type="u" direction="in"/>
+      <arg name="app_icon" type="s" direction="in"/>
+      <arg name="summary" type="s" direction="in"/>
+      <arg name="body" type="s" direction="in"/>
+      <arg name="actions" type="as" direction="in"/>
+      <arg name="hints" type="a{sv}" direction="in"/>
+      <arg name="expire_timeout" type="i" direction="in"/>
+      <arg name="id" type="u" direction="out"/>
+    </method>
+    <method name="CloseNotification">
+      <arg name="id" type="u" direction="in"/>
+    </method>
+    <method name="GetCapabilities">
+      <arg name="capabilities" type="as" direction="out"/>
+    </method>
+    <method name="GetServerInformation">
+      <arg name="name" type="s" direction="out"/>
+      <arg name="vendor" type="s" direction="out"/>
+      <arg name="version" type="s" direction="out"/>
+      <arg name="spec_version" type="s" direction="out"/>
+    </method>
+    <signal name="NotificationClosed">
+      <arg name="id" type="u"/>
+      <arg name="reason" type="u"/>
+    </signal>
+    <signal name="ActionInvoked">
+      <arg name="id" type="u"/>
+      <arg name="action_key" type="s"/>
+    </signal>
+  </interface>
+</node>
+"""
+
+# Errors returned by the notification server if our introspection data is out of date.
+INTROSPECTION_MISMATCH_ERRORS = {
+    "org.freedesktop.DBus.Error.InvalidArgs",
+    "org.freedesktop.DBus.Error.UnknownMethod",
+}
+
+# Maximum number of Notify messages without reply which are sent before waiting for
+# the notification server to catch up, so that they do not overrun the socket buffer.
+MAX_UNACKNOWLEDGED_MESSAGES = 64
+
+# Errors returned by the message bus if there is no notification server.
+SERVER_UNAVAILABLE_ERRORS = {
+    "org.freedesktop.DBus.Error.ServiceUnknown",
+    "org.freedesktop.DBus.Error.NameHasNoOwner",
+    "org.freedesktop.DBus.Error.NoReply",
+    "org.freedesktop.DBus.Error.Disconnected",
+    "org.freedesktop.DBus.Error.Spawn.ServiceNotFound",
+}
+
+# Errors returned by the message bus if the notification server disconnected while a
+# call was in flight, for instance because it crashed.
+CONNECTION_LOST_ERRORS = {
+    "org.freedesktop.DBus.Error.NoReply",
+    "org.freedesktop.DBus.Error.Disconnected",
+}
+
+# Match rule for changes of the owner of the notification server name.
+NAME_OWNER_CHANGED_MATCH_RULE = (
+    "type='signal',sender='org.freedesktop.DBus',interface='org.freedesktop.DBus',"
+    "member='NameOwnerChanged',arg0='org.freedesktop.Notifications'"
+)
+
+# Match rules for the signals of the notification server. The bus daemon resolves the
+# well-known name to the unique name of its current owner, so that signals of other
+# connections are never delivered and the rules stay valid when the server restarts.
+NOTIFICATION_SIGNAL_MATCH_RULES = tuple(
+    "type='signal',sender='org.freedesktop.Notifications',"
+    "path='/org/freedesktop/Notifications',interface='org.freedesktop.Notifications',"
+    f"member='{member}'"
+    for member in ("NotificationClosed", "ActionInvoked")
+)
+
+
+class DBusConnection:
+    """
+    A connection to the notification server which is shared by all backends that run
+    in the same event loop
+
+    Backends acquire the connection for the running event loop with :meth:`acquire`
+    and release it when they are garbage collected. The session bus is connected on
+    first use and disconnected when the last backend released the connection. Signals
+    of the notification server are subscribed once and routed to the backend which
+    sent the notification by its platform ID.
+    """
+
+    _connections: weakref.WeakKeyDictionary[
+        asyncio.AbstractEventLoop, DBusConnection
+    ] = weakref.WeakKeyDictionary()
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.interface: ProxyInterface | None = None
+        self.introspected = False
+        self.routes: dict[int, weakref.ref[DBusDesktopNotifier]] = {}
+        """Backends by the platform ID of the notifications which they sent"""
+
+        self._loop = weakref.ref(loop)
+        self._refcount = 0
+        self._backends: weakref.WeakSet[DBusDesktopNotifier] = weakref.WeakSet()
+        # Signals are only subscribed once an interactive backend uses the connection.
+        self._subscribed = False
+        self._init_task: asyncio.Future[ProxyInterface] | None = None
+        self._closing_bus: MessageBus | None = None
+        self._introspect_task: asyncio.Future[ProxyInterface] | None = None
+        self._server_key: str | None = None
+        # Number of messages without reply sent since the server last caught up.
+        self._unacknowledged = 0
+
+    @classmethod
+    def acquire(cls, backend: DBusDesktopNotifier) -> DBusConnection:
+        """
+        Returns the connection for the running event loop and registers the backend
+        with it.
+
+        :param backend: The backend which uses the connection.
+        """
+        loop = asyncio.get_running_loop()
+        connection = cls._connections.get(loop)
+
+        if connection is None:
+            connection = cls(loop)
+            cls._connections[loop] = connection
+
+        connection._refcount += 1
+        connection._backends.add(backend)
+
+        if backend.interactive and not connection._subscribed:
+            connection._subscribed = True
+            if connection.interface:
+                add_match_rules(connection.bus, NOTIFICATION_SIGNAL_MATCH_RULES)
+
+        return connection
+
+    def release(self) -> None:
+        """
+        Releases a reference to the connection which was returned by :meth:`acquire`.
+        The session bus is disconnected when the last reference is released.
+        """
+        self._refcount -= 1
+
+        if self._refcount > 0:
+            # Drop the routes of garbage collected backends.
+            self.routes = {nid: ref for nid, ref in self.routes.items() if ref()}
+            return
+
+        self.routes.clear()
+
+        loop = self._loop()
+        if loop is not None and self._connections.get(loop) is self:
+            del self._connections[loop]
+
+        if self.interface:
+            self.bus.disconnect()
+            self._closing_bus = self.bus
+            self.interface = None
+
+    async def wait_closed(self) -> None:
+        """
+        Waits until the session bus is disconnected if the last reference to the
+        connection was released
+        """
+        bus, self._closing_bus = self._closing_bus, None
+
+        if bus:
+            with contextlib.suppress(Exception):
+                await bus.wait_for_disconnect()  # type:ignore[no-untyped-call]
+
+    async def acknowledge(self, count: int) -> None:
+        """
+        Counts messages without reply which were sent to the notification server, and
+        waits for the server to answer a ping once more than
+        :data:`MAX_UNACKNOWLEDGED_MESSAGES` are outstanding. The server answers after
+        all messages which it received before, so that a burst cannot overrun the
+        socket buffer.
+
+        :param count: Number of messages which were sent.
+        """
+        self._unacknowledged += count
+
+        if self._unacknowledged >= MAX_UNACKNOWLEDGED_MESSAGES:
+            self._unacknowledged = 0
+            with contextlib.suppress(Exception):
+                await self.bus.call(ping_message())
+
+    def is_current(self) -> bool:
+        """Whether the connection belongs to the running event loop"""
+        return self._loop() is asyncio.get_running_loop()
+
+    async def get_interface(self) -> ProxyInterface:
+        """
+        Returns the proxy interface of the notification server, connecting to the
+        session bus on first use or after the connection was lost. Concurrent callers
+        share a single connection attempt instead of each opening their own connection.
+        """
+        if self.interface:
+            if self.bus.connected:
+                return self.interface
+            self._on_disconnected(self.bus)
+
+        if not self._init_task:
+            self._init_task = asyncio.ensure_future(self._init_dbus())
+
+        task = self._init_task
+
+        try:
+            # Shield the shared task so that a cancelled caller does not cancel the
+            # connection attempt for everyone else.
+            return await asyncio.shield(task)
+        finally:
+            # Allow the next caller to retry if the connection attempt failed.
+            if task.done() and self._init_task is task:
+                if task.cancelled() or task.exception():
+                    self._init_task = None
+
+    async def _init_dbus(self) -> ProxyInterface:
+        self.bus = await MessageBus().connect()
+        self._watch_server(self.bus)
+
+        # Start with the introspection data of the server which we last talked to, or
+        # with the interface as defined by the specification. This is validated lazily
+        # and replaced with the result of a live introspection on mismatch.
+        cached = load_cached_introspection()
+
+        if cached:
+            self._server_key, introspection = cached
+        else:
+            introspection = Node.parse(NOTIFICATIONS_INTROSPECTION)
+
+        return self._load_interface(introspection)
+
+    def _watch_server(self, bus: MessageBus) -> None:
+        """
+        Watches for restarts of the notification server and subscribes to its signals
+        if any backend is interactive.
+        """
+        bus.add_message_handler(self._on_bus_message)
+
+        rules = [NAME_OWNER_CHANGED_MATCH_RULE]
+        if self._subscribed:
+            rules += NOTIFICATION_SIGNAL_MATCH_RULES
+
+        add_match_rules(bus, rules)
+
+    def _on_bus_message(self, msg: Message) -> None:
+        if msg.message_type is not MessageType.SIGNAL:
+            return
+
+        member = msg.member
+
+        if member == "NotificationClosed" or member == "ActionInvoked":
+            # Check that this is a signal of the notification server before touching
+            # the routes. Another signal with the same member name and ID must not
+            # remove the route of the notification.
+            if (
+                msg.path != "/org/freedesktop/Notifications"
+                or msg.interface != "org.freedesktop.Notifications"
+                or msg.signature != ("us" if member == "ActionInvoked" else "uu")
+            ):
+                return
+
+            # Signals are broadcast for the notifications of all clients of the server.
+            # Discard those which we did not send with a single lookup.
+            ref = self.routes.pop(msg.body[0], None)
+            backend = ref() if ref else None
+
+            if backend is None:
+                return
+
+            if member == "ActionInvoked":
+                backend._on_action(*msg.body)
+            else:
+                backend._on_closed(*msg.body)
+
+        elif (
+            member == "NameOwnerChanged"
+            and msg.sender == "org.freedesktop.DBus"
+            and msg.body[0] == "org.freedesktop.Notifications"
+        ):
+            _, old_owner, new_owner = msg.body
+            self._on_server_changed(old_owner, new_owner)
+
+    def _on_server_changed(self, old_owner: str, new_owner: str) -> None:
+        """
+        Called when the notification server name changes its owner. The proxy keeps
+        routing calls and signals by name, but the new server may have a different
+        interface and does not show the notifications of the previous one.
+        """
+        logger.debug("Notification server changed from %r to %r", old_owner, new_owner)
+
+        self.introspected = False
+
+        if old_owner:
+            self.routes.clear()
+
+        for backend in list(self._backends):
+            backend._on_server_changed(forget=bool(old_owner))
+
+    def _on_disconnected(self, bus: MessageBus) -> None:
+        """
+        Called when the connection to the session bus was found to be lost. The next
+        call connects again and subscribes to signals on the new connection.
+        """
+        logger.warning("Lost connection to the session bus")
+
+        bus.remove_message_handler(self._on_bus_message)
+        self.interface = None
+        self.introspected = False
+        self.routes.clear()
+        self._init_task = None
+        self._introspect_task = None
+
+        for backend in list(self._backends):
+            backend._on_server_changed(forget=True)
+
+    def _load_interface(self, introspection: Node) -> ProxyInterface:
+        self.proxy_object = self.bus.get_proxy_object(
+            "org.freedesktop.Notifications",
+            "/org/freedesktop/Notifications",
+            introspection,
+        )
+        self.interface = self.proxy_object.get_interface(
+            "org.freedesktop.Notifications"
+        )
+        return self.interface
+
+    async def introspect(self) -> ProxyInterface:
+        """
+        Introspects the notification server and caches the result on disk, keyed by
+        the server's name and version. Concurrent callers share a single request.
+        """
+        if not self._introspect_task:
+            self._introspect_task = asyncio.ensure_future(self._introspect_server())
+
+        task = self._introspect_task
+
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done() and self._introspect_task is task:
+                self._introspect_task = None
+
+    async def _introspect_server(self) -> ProxyInterface:
+        await self.get_interface()
+
+        introspection, server_key = await asyncio.gather(
+            self.bus.introspect(
+                "org.freedesktop.Notifications", "/org/freedesktop/Notifications"
+            ),
+            self._get_server_key(),
+        )
+
+        self.introspected = True
+        self._server_key = server_key
+        save_cached_introspection(server_key, introspection)
+
+        return self._load_interface(introspection)
+
+    async def validate_interface(self) -> ProxyInterface:
+        """
+        Returns the proxy interface, replacing it with a live introspection of the
+        notification server if it was not created for the running server.
+        """
+        interface = await self.get_interface()
+
+        if self.introspected:
+            return interface
+
+        if await self._get_server_key() == self._server_key:
+            self.introspected = True
+            return interface
+
+        return await self.introspect()
+
+    async def _get_server_key(self) -> str:
+        reply = await self.bus.call(
+            Message(
+                destination="org.freedesktop.Notifications",
+                path="/org/freedesktop/Notifications",
+                interface="org.freedesktop.Notifications",
+                member="GetServerInformation",
+            )
+        )
+
+        if reply.message_type == MessageType.ERROR:
+            raise DBusError(reply.error_name or "", reply.body[0], reply=reply)
+
+        name, _, version, _ = reply.body
+        return f"{name} {version}"
+
 
 class DBusDesktopNotifier(DesktopNotifierBackend):
     """DBus notification backend for Linux
 
-    This implements the org.freedesktop.Notifications standard. The DBUS connection is
-    created in a thread with a running asyncio loop to handle clicked notifications.
+    This implements the org.freedesktop.Notifications standard. All backends in the
+    same event loop share a single :class:`DBusConnection` to the session bus, which
+    requires a running asyncio event loop to handle clicked notifications.
 
     :param app_name: The name of the app.
     """
@@ -50,7 +461,8 @@ class DBusDesktopNotifier(DesktopNotifierBackend):
 
     def __init__(self, app_name: str) -> None:
         super().__init__(app_name)
-        self.interface: ProxyInterface | None = None
+        self._connection: DBusConnection | None = None
+        self._finalizer: weakref.finalize[[], DBusDesktopNotifier] | None = None
         self._platform_to_interface_notification_identifier: bidict[int, str] = bidict()
 
     async def request_authorisation(self) -> bool:
@@ -67,28 +479,95 @@ class DBusDesktopNotifier(DesktopNotifierBackend):
         """
         return True
 
-    async def _init_dbus(self) -> ProxyInterface:
-        self.bus = await MessageBus().connect()
-        introspection = await self.bus.introspect(
-            "org.freedesktop.Notifications", "/org/freedesktop/Notifications"
-        )
-        self.proxy_object = self.bus.get_proxy_object(
-            "org.freedesktop.Notifications",
-            "/org/freedesktop/Notifications",
-            introspection,
-        )
-        self.interface = self.proxy_object.get_interface(
-            "org.freedesktop.Notifications"
-        )
+    def _get_connection(self) -> DBusConnection:
+        """
+        Returns the shared connection for the running event loop, acquiring it on first
+        use. The connection is released when the backend is garbage collected.
+        """
+        connection = self._connection
 
-        # Some older interfaces may not support notification actions.
-        if hasattr(self.interface, "on_notification_closed"):
-            self.interface.on_notification_closed(self._on_closed)
+        if connection is None or not connection.is_current():
+            self._release_connection()
+            connection = DBusConnection.acquire(self)
+            self._connection = connection
+            self._finalizer = weakref.finalize(self, connection.release)
 
-        if hasattr(self.interface, "on_action_invoked"):
-            self.interface.on_action_invoked(self._on_action)
+        return connection
 
-        return self.interface
+    def _release_connection(self) -> None:
+        """Releases the shared connection, if acquired"""
+        if self._finalizer:
+            self._forget_notifications()
+            self._finalizer()
+            self._finalizer = None
+            self._connection = None
+
+    async def _close(self) -> None:
+        """
+        Releases the shared connection and waits until the session bus is disconnected
+        if this was the last backend using it.
+        """
+        connection = self._connection
+        self._release_connection()
+
+        if connection:
+            await connection.wait_closed()
+
+    def _on_server_changed(self, forget: bool) -> None:
+        """
+        Called by the connection when the notification server changed or the
+        connection to the session bus was lost.
+
+        :param forget: Whether to forget the notifications sent to the previous server.
+        """
+        self._server_generation += 1
+
+        if forget:
+            for identifier, notification in self._forget_notifications().items():
+                self._publish(Cleared, identifier, notification)
+
+    def _forget_notifications(self) -> dict[str, Notification | None]:
+        """
+        Forgets the platform IDs of notifications sent to a previous notification
+        server. They are no longer shown and the IDs may be reused by the new server.
+
+        :returns: The forgotten notifications by identifier, if they were cached.
+        """
+        forgotten = {}
+
+        for (
+            nid,
+            identifier,
+        ) in self._platform_to_interface_notification_identifier.items():
+            forgotten[identifier] = self._clear_notification_from_cache(identifier)
+            if self._connection:
+                self._connection.routes.pop(nid, None)
+
+        self._platform_to_interface_notification_identifier.clear()
+        return forgotten
+
+    def _set_platform_id(
+        self, connection: DBusConnection, platform_id: int, identifier: str
+    ) -> None:
+        # The server may assign a new platform ID if a replaced notification was
+        # already closed.
+        previous_id = self._platform_to_interface_notification_identifier.inverse.pop(
+            identifier, None
+        )
+        if previous_id is not None:
+            connection.routes.pop(previous_id, None)
+
+        self._platform_to_interface_notification_identifier[platform_id] = identifier
+        connection.routes[platform_id] = weakref.ref(self)
+
+    def _is_unavailable_error(self, exc: BaseException) -> bool:
+        # Errors returned by the notification server itself mean that it is available,
+        # as do errors in the notification, such as a value which does not fit the
+        # signature. Failures to connect to the bus or errors from the bus which report
+        # that there is no notification server mean that it is not.
+        if isinstance(exc, DBusError):
+            return exc.type in SERVER_UNAVAILABLE_ERRORS
+        return super()._is_unavailable_error(exc)
 
     async def _send(self, notification: Notification) -> None:
         """
@@ -96,9 +575,298 @@ class DBusDesktopNotifier(DesktopNotifierBackend):
 
         :param notification: Notification to send.
         """
-        if not self.interface:
-            self.interface = await self._init_dbus()
+        await self._notify(notification)
+
+    async def _replace(self, notification: Notification) -> None:
+        """
+        Asynchronously replaces a notification in place by passing its platform ID as
+        ``replaces_id`` to the Notify call.
+
+        :param notification: Notification to send.
+        """
+        await self._notify(notification, replace=True)
+
+    async def _notify(self, notification: Notification, replace: bool = False) -> None:
+        try:
+            await self._notify_once(notification, replace)
+        except Exception as exc:
+            if not is_connection_lost(exc):
+                raise
+
+            # The notification server or the session bus went away while the call was
+            # in flight. Either way, the notification is not shown, and it is safe to
+            # send it again once to the new server.
+            logger.debug("Connection lost while sending notification, retrying")
+            await self._notify_once(notification, replace)
+
+    async def _notify_once(self, notification: Notification, replace: bool) -> None:
+        # Look up the platform ID only now, it is forgotten if the server changed.
+        replaces_id = 0
+
+        if replace:
+            replaces_id = (
+                self._platform_to_interface_notification_identifier.inverse.get(
+                    notification.identifier, 0
+                )
+            )
+
+        connection = self._get_connection()
+
+        if not self.interactive:
+            await self._notify_no_reply(connection, notification)
+            return
+
+        interface = await connection.get_interface()
+
+        # The current notification spec defines hints as a Dbus dictionary type 'a{sv}',
+        # represented in Python as dict[str, Variant]. However, some older notification
+        # servers expect 'a{ss}' (Python dict[str, str]). We therefore check the
+        # expected argument type at runtime and cast arguments accordingly.
+        # See https://github.com/samschott/desktop-notifier/issues/143.
+        hints_signature = get_hints_signature(interface)
+
+        if hints_signature == "":
+            logger.warning("Notification server not supported")
+            return
+
+        try:
+            # dbus_next proxy APIs are generated at runtime. Silence the type checker
+            # but raise an AttributeError if required.
+            platform_id = await interface.call_notify(  # type:ignore[attr-defined]
+                *self._notify_args(notification, hints_signature, replaces_id)
+            )
+        except DBusError as exc:
+            if exc.type not in INTROSPECTION_MISMATCH_ERRORS:
+                raise
+
+            # Our introspection data may not match the notification server. Retry with
+            # the actual interface, unless we already used it.
+            if interface is connection.interface:
+                if connection.introspected:
+                    raise
+                logger.debug("Notify call failed, introspecting notification server")
+                interface = await connection.introspect()
+            else:
+                interface = await connection.get_interface()
+
+            hints_signature = get_hints_signature(interface)
+
+            if hints_signature == "":
+                logger.warning("Notification server not supported")
+                return
+
+            platform_id = await interface.call_notify(  # type:ignore[attr-defined]
+                *self._notify_args(notification, hints_signature, replaces_id)
+            )
+
+        self._set_platform_id(connection, platform_id, notification.identifier)
+
+    async def _notify_no_reply(
+        self, connection: DBusConnection, notification: Notification
+    ) -> None:
+        """
+        Sends a notification without waiting for a reply from the notification server.
+        This is used when the backend is not interactive. Without the platform ID from
+        the reply, the notification cannot be replaced or cleared later.
+        """
+        # Without a reply, a signature mismatch would go unnoticed. Validate the
+        # interface up front instead.
+        interface = await connection.validate_interface()
+        hints_signature = get_hints_signature(interface)
+
+        if hints_signature == "":
+            logger.warning("Notification server not supported")
+            return
+
+        await connection.bus.send(
+            self._notify_message(
+                notification, hints_signature, MessageFlag.NO_REPLY_EXPECTED
+            )
+        )
+        await connection.acknowledge(1)
+
+    async def _send_many(
+        self, notifications: Sequence[Notification], max_in_flight: int
+    ) -> list[Exception | None]:
+        """
+        Sends multiple notifications over a pipelined connection.
+
+        Instead of awaiting a reply through the proxy interface for every notification,
+        Notify messages are written to the bus directly with up to ``max_in_flight``
+        requests outstanding at a time. Replies are matched to their notification by
+        message serial as they arrive, and every reply frees a slot for the next
+        message. This reduces the cost per notification to roughly the time spent on
+        marshalling.
+
+        :param notifications: Notifications to send.
+        :param max_in_flight: Maximum number of Notify calls awaiting a reply.
+        :returns: For each notification, in input order, the exception raised when
+            sending it or ``None`` if it was sent successfully.
+        """
+        # Raw messages are not retried on a signature mismatch, validate the interface
+        # up front instead.
+        connection = self._get_connection()
+        interface = await connection.validate_interface()
+
+        errors: list[Exception | None] = [None] * len(notifications)
+
+        hints_signature = get_hints_signature(interface)
+
+        if hints_signature == "":
+            logger.warning("Notification server not supported")
+            return errors
+
+        if len(notifications) == 0:
+            return errors
+
+        bus = connection.bus
+
+        if not self.interactive:
+            # Without replies, nothing tells us how far the server got, and a large
+            # burst overruns the socket buffer, which makes the bus fail writes and
+            # disconnect. Write at most max_in_flight messages at a time and let the
+            # server catch up in between.
+            chunk_size = min(max_in_flight, MAX_UNACKNOWLEDGED_MESSAGES)
+
+            for start in range(0, len(notifications), chunk_size):
+                writes: list[tuple[int, asyncio.Future[None]]] = []
+
+                for index in range(start, min(start + chunk_size, len(errors))):
+                    try:
+                        msg = self._notify_message(
+                            notifications[index],
+                            hints_signature,
+                            MessageFlag.NO_REPLY_EXPECTED,
+                        )
+                        writes.append((index, bus.send(msg)))
+                    except Exception as exc:
+                        errors[index] = exc
+
+                for index, write in writes:
+                    try:
+                        await write
+                    except Exception as exc:
+                        errors[index] = exc
+
+                await connection.acknowledge(len(writes))
+
+            return errors
+
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+
+        pending = iter(enumerate(notifications))
+        in_flight: dict[int, tuple[int, Notification]] = {}
+        unsettled = len(notifications)
+
+        def write_next() -> None:
+            nonlocal unsettled
+
+            # Skip over any notifications that cannot be marshalled.
+            for index, notification in pending:
+                try:
+                    msg = self._notify_message(notification, hints_signature)
+                    write = bus.send(msg)
+                except Exception as exc:
+                    errors[index] = exc
+                    unsettled -= 1
+                    continue
+
+                in_flight[msg.serial] = (index, notification)
+                write.add_done_callback(partial(on_written, msg.serial))
+                return
+
+            if unsettled == 0 and not finished.done():
+                finished.set_result(None)
+
+        def settle(serial: int, error: Exception | None) -> None:
+            nonlocal unsettled
+
+            index, notification = in_flight.pop(serial)
+            errors[index] = error
+            unsettled -= 1
+            write_next()
 
+        def on_written(serial: int, write: asyncio.Future[None]) -> None:
+            if serial in in_flight and not write.cancelled() and write.exception():
+                settle(serial, write.exception())  # type:ignore[arg-type]
+
+        def on_message(msg: Message) -> bool:
+            if msg.message_type not in (MessageType.METHOD_RETURN, MessageType.ERROR):
+                return False
+            if msg.reply_serial not in in_flight:
+                return False
+
+            index, notification = in_flight[msg.reply_serial]
+
+            if msg.message_type is MessageType.ERROR:
+                text = msg.body[0] if msg.body else ""
+                error = DBusError(msg.error_name or "", text, reply=msg)
+                settle(msg.reply_serial, error)
+            else:
+                self._set_platform_id(connection, msg.body[0], notification.identifier)
+                settle(msg.reply_serial, None)
+
+            return True
+
+        bus.add_message_handler(on_message)
+
+        try:
+            for _ in range(min(max_in_flight, len(notifications))):
+                write_next()
+
+            # Unlike awaiting it, asyncio.wait does not cancel the future of the bus
+            # when it returns, which would break later batches on the connection.
+            await asyncio.wait(
+                {finished, disconnect_future(bus)}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            bus.remove_message_handler(on_message)
+
+        if not finished.done():
+            # The connection was lost before all replies arrived.
+            connection_error = ConnectionError("Lost connection to the session bus")
+            for index, _ in list(in_flight.values()):
+                errors[index] = connection_error
+            for index, _ in pending:
+                errors[index] = connection_error
+
+        return errors
+
+    def _notify_message(
+        self,
+        notification: Notification,
+        hints_signature: str,
+        flags: MessageFlag = MessageFlag.NONE,
+    ) -> Message:
+        """
+        Returns a Notify message to write to the bus directly, bypassing the proxy
+        interface.
+
+        :param notification: Notification to send.
+        :param hints_signature: The dbus type signature of the hints argument.
+        :param flags: Flags of the message.
+        """
+        return Message(
+            destination="org.freedesktop.Notifications",
+            path="/org/freedesktop/Notifications",
+            interface="org.freedesktop.Notifications",
+            member="Notify",
+            signature=f"susssas{hints_signature}i",
+            body=self._notify_args(notification, hints_signature),
+            flags=flags,
+        )
+
+    def _notify_args(
+        self, notification: Notification, hints_signature: str, replaces_id: int = 0
+    ) -> list[Any]:
+        """
+        Returns the arguments of a Notify call for the given notification.
+
+        :param notification: Notification to send.
+        :param hints_signature: The dbus type signature of the hints argument.
+        :param replaces_id: Platform ID of a notification to replace, 0 for none.
+        """
         # The "default" action is typically invoked when clicking on the
         # notification body itself, see
         # https://specifications.freedesktop.org/notification-spec. There are some
@@ -122,16 +890,8 @@ class DBusDesktopNotifier(DesktopNotifierBackend):
         if notification.attachment:
             hints_v["image-path"] = Variant("s", notification.attachment.as_uri())
 
-        # The current notification spec defines hints as a Dbus dictionary type 'a{sv}',
-        # represented in Python as dict[str, Variant]. However, some older notification
-        # servers expect 'a{ss}' (Python dict[str, str]). We therefore check the
-        # expected argument type at runtime and cast arguments accordingly.
-        # See https://github.com/samschott/desktop-notifier/issues/143.
-        hints_signature = get_hints_signature(self.interface)
-
-        if hints_signature == "":
-            logger.warning("Notification server not supported")
-            return
+        if notification.progress is not None:
+            hints_v["value"] = Variant("i", notification.progress)
 
         hints: dict[str, str] | dict[str, Variant]
 
@@ -151,29 +911,28 @@ class DBusDesktopNotifier(DesktopNotifierBackend):
         else:
             icon = ""
 
-        # dbus_next proxy APIs are generated at runtime. Silence the type checker but
-        # raise an AttributeError if required.
-        platform_id = await self.interface.call_notify(  # type:ignore[attr-defined]
+        return [
             self.app_name,
-            0,
+            replaces_id,
             icon,
             notification.title,
             notification.message,
             actions,
             hints,
             timeout,
-        )
-        self._platform_to_interface_notification_identifier[platform_id] = (
-            notification.identifier
-        )
+        ]
 
     async def _clear(self, identifier: str) -> None:
         """
         Asynchronously removes a notification from the notification center
         """
-        if not self.interface:
+        connection = self._connection
+
+        if not connection or not connection.interface:
             return
 
+        interface = connection.interface
+
         platform_id = self._platform_to_interface_notification_identifier.inverse[
             identifier
         ]
@@ -181,7 +940,7 @@ class DBusDesktopNotifier(DesktopNotifierBackend):
         try:
             # dbus_next proxy APIs are generated at runtime. Silence the type checker
             # but raise an AttributeError if required.
-            await self.interface.call_close_notification(  # type:ignore[attr-defined]
+            await interface.call_close_notification(  # type:ignore[attr-defined]
                 platform_id
             )
         except DBusError:
@@ -194,12 +953,14 @@ class DBusDesktopNotifier(DesktopNotifierBackend):
         except KeyError:
             # Popping may have been handled already by _on_close callback.
             pass
+        else:
+            connection.routes.pop(platform_id, None)
 
     async def _clear_all(self) -> None:
         """
         Asynchronously clears all notifications from notification center
         """
-        if not self.interface:
+        if not self._connection or not self._connection.interface:
             return
 
         for identifier in list(
@@ -249,10 +1010,23 @@ class DBusDesktopNotifier(DesktopNotifierBackend):
 
         if reason == NOTIFICATION_CLOSED_DISMISSED:
             self.handle_dismissed(identifier, notification)
+        elif reason == NOTIFICATION_CLOSED_EXPIRED:
+            self._publish(Expired, identifier, notification)
+        else:
+            self._publish(Cleared, identifier, notification)
+
+    def _on_notification_evicted(
+        self, identifier: str, notification: Notification
+    ) -> None:
+        platform_id = self._platform_to_interface_notification_identifier.inverse.pop(
+            identifier, None
+        )
+        if platform_id is not None and self._connection:
+            self._connection.routes.pop(platform_id, None)
+        super()._on_notification_evicted(identifier, notification)
 
     async def get_capabilities(self) -> frozenset[Capability]:
-        if not self.interface:
-            self.interface = await self._init_dbus()
+        interface = await self._get_connection().validate_interface()
 
         capabilities = {
             Capability.APP_NAME,
@@ -260,15 +1034,16 @@ class DBusDesktopNotifier(DesktopNotifierBackend):
             Capability.TITLE,
             Capability.TIMEOUT,
             Capability.URGENCY,
+            Capability.PROGRESS,
         }
 
         # Capabilities supported by some notification servers.
         # See https://specifications.freedesktop.org/notification-spec/notification-spec-latest.html#protocol.
-        if hasattr(self.interface, "on_notification_closed"):
+        if hasattr(interface, "on_notification_closed"):
             capabilities.add(Capability.ON_CLICKED)
             capabilities.add(Capability.ON_DISMISSED)
 
-        cps = await self.interface.call_get_capabilities()  # type:ignore[attr-defined]
+        cps = await interface.call_get_capabilities()  # type:ignore[attr-defined]
 
         if "actions" in cps:
             capabilities.add(Capability.BUTTONS)
@@ -278,17 +1053,114 @@ class DBusDesktopNotifier(DesktopNotifierBackend):
             capabilities.add(Capability.SOUND)
             capabilities.add(Capability.SOUND_NAME)
 
-        hints_signature = get_hints_signature(self.interface)
+        hints_signature = get_hints_signature(interface)
         if hints_signature not in self.supported_hint_signatures:
             # Any hint-based capabilities are not supported because we got an unexpected
             # DBus interface.
             capabilities.discard(Capability.SOUND)
             capabilities.discard(Capability.SOUND_NAME)
             capabilities.discard(Capability.URGENCY)
+            capabilities.discard(Capability.PROGRESS)
 
         return frozenset(capabilities)
 
 
+def get_cache_path() -> Path:
+    """Returns the path of the cache file for notification server introspection data"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "desktop-notifier" / "introspection.json"
+
+
+def load_cached_introspection() -> tuple[str, Node] | None:
+    """
+    Returns the key and introspection data of the notification server which was
+    introspected last, or ``None`` if nothing is cached
+    """
+    try:
+        with open(get_cache_path()) as f:
+            cache = json.load(f)
+        server_key = cache["last"]
+        return server_key, Node.parse(cache["servers"][server_key])
+    except Exception as exc:
+        logger.debug("Could not load cached introspection data: %s", exc)
+        return None
+
+
+def save_cached_introspection(server_key: str, introspection: Node) -> None:
+    """Caches the introspection data of a notification server on disk"""
+    path = get_cache_path()
+
+    try:
+        with open(path) as f:
+            servers = json.load(f)["servers"]
+    except Exception:
+        servers = {}
+
+    servers[server_key] = introspection.tostring()
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that concurrent readers never see a
+        # partially written cache.
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"last": server_key, "servers": servers}, f)
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.debug("Could not cache introspection data: %s", exc)
+
+
+def add_match_rules(bus: MessageBus, rules: Iterable[str]) -> None:
+    """
+    Adds match rules for signals to receive. They are sent without waiting for a reply
+    to avoid a round trip before the first notification.
+    """
+    for rule in rules:
+        bus.send(
+            Message(
+                destination="org.freedesktop.DBus",
+                path="/org/freedesktop/DBus",
+                interface="org.freedesktop.DBus",
+                member="AddMatch",
+                signature="s",
+                body=[rule],
+                flags=MessageFlag.NO_REPLY_EXPECTED,
+            )
+        )
+
+
+def disconnect_future(bus: MessageBus) -> asyncio.Future[None]:
+    """
+    Returns the future which is resolved when the session bus is disconnected. This is
+    the future which :meth:`MessageBus.wait_for_disconnect` awaits. It is shared by all
+    callers and must not be cancelled.
+    """
+    return bus._disconnect_future  # type:ignore[no-any-return]
+
+
+def ping_message() -> Message:
+    """
+    Returns a Ping message to the notification server. The server answers it after all
+    messages which it received before from the same connection.
+    """
+    return Message(
+        destination="org.freedesktop.Notifications",
+        path="/org/freedesktop/Notifications",
+        interface="org.freedesktop.DBus.Peer",
+        member="Ping",
+    )
+
+
+def is_connection_lost(exc: Exception) -> bool:
+    """
+    Returns whether an exception means that the connection to the notification server
+    was lost while a call was in flight
+    """
+    if isinstance(exc, DBusError):
+        return exc.type in CONNECTION_LOST_ERRORS
+    return isinstance(exc, (EOFError, ConnectionError))
+
+
 def get_hints_signature(interface: ProxyInterface) -> str:
     """Returns the dbus type signature for the hints argument"""
     methods = interface.introspection.methods
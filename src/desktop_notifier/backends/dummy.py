@@ -4,15 +4,22 @@ Dummy backend for unsupported platforms
 """
 from __future__ import annotations
 
+from collections import Counter
+
 from ..common import Capability, Notification
 from .base import DesktopNotifierBackend
 
 
 class DummyNotificationCenter(DesktopNotifierBackend):
-    """A dummy backend for unsupported platforms"""
+    """A dummy backend for unsupported platforms
+
+    The backend counts calls which would reach the platform by method name, for
+    instance "send" or "replace", in :attr:`call_counts`. This can be used in tests.
+    """
 
     def __init__(self, app_name: str) -> None:
         super().__init__(app_name)
+        self.call_counts: Counter[str] = Counter()
 
     async def request_authorisation(self) -> bool:
         """
@@ -29,13 +36,16 @@ class DummyNotificationCenter(DesktopNotifierBackend):
         return True
 
     async def _send(self, notification: Notification) -> None:
-        pass
+        self.call_counts["send"] += 1
+
+    async def _replace(self, notification: Notification) -> None:
+        self.call_counts["replace"] += 1
 
     async def _clear(self, identifier: str) -> None:
-        pass
+        self.call_counts["clear"] += 1
 
     async def _clear_all(self) -> None:
-        pass
+        self.call_counts["clear_all"] += 1
 
     async def get_capabilities(self) -> frozenset[Capability]:
         return frozenset()
@@ -372,6 +372,15 @@ class CocoaNotificationCenter(DesktopNotifierBackend):
 
         return categories
 
+    async def _replace(self, notification: Notification) -> None:
+        """
+        Replaces a delivered notification in place. The notification center updates a
+        notification when a new request is added with the same identifier.
+
+        :param notification: Notification to send.
+        """
+        await self._send(notification)
+
     def _clear_notification_categories(self) -> None:
         """Clears all registered notification categories for this application."""
         empty_set = NSSet.alloc().init()
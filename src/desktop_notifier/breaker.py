@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+This module defines the circuit breaker that backends use to stop sending notifications
+while the notification server is unavailable.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from enum import Enum
+
+__all__ = ["BreakerState", "BreakerInfo", "CircuitBreaker", "CircuitOpenError"]
+
+
+class BreakerState(Enum):
+    """State of a circuit breaker"""
+
+    Closed = "closed"
+    """Notifications are sent normally"""
+
+    Open = "open"
+    """The notification server is unavailable, notifications fail without being sent"""
+
+    HalfOpen = "half-open"
+    """A single notification is sent to probe whether the server is available again"""
+
+
+@dataclass(frozen=True)
+class BreakerInfo:
+    """State and statistics of a circuit breaker"""
+
+    state: BreakerState
+    """Current state of the breaker"""
+
+    failures: int
+    """Number of consecutive failures because the server was unavailable"""
+
+    retry_in: float
+    """Time in seconds until the next probe may be sent, zero unless open"""
+
+    rejected: int
+    """Number of notifications which failed fast because the breaker was open"""
+
+    opened: int
+    """Number of times the breaker has opened"""
+
+
+class CircuitOpenError(Exception):
+    """Raised for notifications which are not sent because the breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker with exponential backoff
+
+    The breaker opens after ``failure_threshold`` consecutive failures. While open,
+    :meth:`allow` returns ``False`` so that callers can fail fast without contacting the
+    notification server. Once the backoff delay has passed, the breaker becomes
+    half-open and allows a single call as a probe. A successful probe closes the
+    breaker, a failed one opens it again with twice the previous delay, up to
+    ``max_delay``.
+
+    :param failure_threshold: Number of consecutive failures after which to open.
+    :param base_delay: Time in seconds to stay open after opening for the first time.
+    :param max_delay: Maximum time in seconds to stay open.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 300.0,
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if base_delay <= 0 or max_delay < base_delay:
+            raise ValueError("delays must be positive and base_delay <= max_delay")
+
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._state = BreakerState.Closed
+        self._failures = 0
+        self._delay = 0.0
+        self._retry_at = 0.0
+        self._probing = False
+
+        self.rejected_count = 0
+        self.opened_count = 0
+
+    @property
+    def state(self) -> BreakerState:
+        """The current state, see :class:`BreakerState`"""
+        if self._state is BreakerState.Open and time.monotonic() >= self._retry_at:
+            self._state = BreakerState.HalfOpen
+        return self._state
+
+    @property
+    def delay(self) -> float:
+        """Time in seconds for which the breaker stays open after the last failure"""
+        return self._delay
+
+    def info(self) -> BreakerInfo:
+        """Returns the state and statistics of the breaker"""
+        state = self.state
+        retry_in = 0.0
+
+        if state is BreakerState.Open:
+            retry_in = self._retry_at - time.monotonic()
+
+        return BreakerInfo(
+            state=state,
+            failures=self._failures,
+            retry_in=retry_in,
+            rejected=self.rejected_count,
+            opened=self.opened_count,
+        )
+
+    def allow(self) -> bool:
+        """
+        Returns whether a call may be made. When half-open, only the first caller is
+        allowed to probe until the probe has been recorded. Rejected calls are counted.
+        """
+        state = self.state
+
+        if state is BreakerState.Closed:
+            return True
+
+        if state is BreakerState.HalfOpen and not self._probing:
+            self._probing = True
+            return True
+
+        self.rejected_count += 1
+        return False
+
+    def record_success(self) -> None:
+        """Records a successful call and closes the breaker"""
+        self._state = BreakerState.Closed
+        self._failures = 0
+        self._delay = 0.0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Records a call which failed because the server was unavailable"""
+        self._failures += 1
+        self._probing = False
+
+        if self._state is BreakerState.HalfOpen:
+            self._open(min(self._delay * 2, self.max_delay))
+        elif self._failures >= self.failure_threshold:
+            self._open(self.base_delay)
+
+    def release(self) -> None:
+        """
+        Records a call which ended without a result, for instance because it was
+        cancelled, and allows another probe if the breaker is half-open
+        """
+        self._probing = False
+
+    def _open(self, delay: float) -> None:
+        self._state = BreakerState.Open
+        self._delay = delay
+        self._retry_at = time.monotonic() + delay
+        self.opened_count += 1
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+This module defines the cache of notifications that backends keep to dispatch user
+interactions to their callbacks.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+from .common import Notification
+
+__all__ = ["CacheInfo", "NotificationCache"]
+
+
+@dataclass(frozen=True)
+class CacheInfo:
+    """Statistics of a notification cache"""
+
+    size: int
+    """Number of notifications currently cached"""
+
+    max_size: int | None
+    """Maximum number of cached notifications, if limited"""
+
+    ttl: float | None
+    """Maximum time in seconds for which a notification is cached, if limited"""
+
+    evicted: int
+    """Number of notifications evicted because the cache was full"""
+
+    expired: int
+    """Number of notifications evicted because they exceeded the time to live"""
+
+
+class NotificationCache:
+    """
+    A cache of notifications by identifier with optional size and age limits
+
+    Entries are kept in the order in which they were stored. When the cache is full,
+    the oldest notification is evicted, first in, first out. Looking up a notification
+    does not change its position. Notifications which have been stored for longer than
+    the time to live are evicted lazily on the next access of the cache. Both
+    operations take constant time per evicted entry.
+
+    :param max_size: Maximum number of notifications to keep. ``None`` for no limit.
+    :param ttl: Maximum time in seconds to keep a notification. ``None`` for no limit.
+    :param on_evict: Called with the identifier and notification of every entry which
+        is evicted because of the size or age limits. Not called for entries which are
+        removed explicitly.
+    """
+
+    def __init__(
+        self,
+        max_size: int | None = None,
+        ttl: float | None = None,
+        on_evict: Callable[[str, Notification], Any] | None = None,
+    ) -> None:
+        self._entries: OrderedDict[str, tuple[Notification, float]] = OrderedDict()
+        self._max_size: int | None = None
+        self._ttl: float | None = None
+        self.on_evict = on_evict
+        self.evicted_count = 0
+        self.expired_count = 0
+        self.max_size = max_size
+        self.ttl = ttl
+
+    @property
+    def max_size(self) -> int | None:
+        """Maximum number of notifications to keep"""
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, value: int | None) -> None:
+        """Setter: max_size"""
+        if value is not None and value < 1:
+            raise ValueError("max_size must be at least 1")
+        self._max_size = value
+        self._evict_overflow()
+
+    @property
+    def ttl(self) -> float | None:
+        """Maximum time in seconds to keep a notification"""
+        return self._ttl
+
+    @ttl.setter
+    def ttl(self, value: float | None) -> None:
+        """Setter: ttl"""
+        if value is not None and value <= 0:
+            raise ValueError("ttl must be positive")
+        self._ttl = value
+        self._evict_expired()
+
+    def info(self) -> CacheInfo:
+        """Returns statistics of the cache"""
+        self._evict_expired()
+        return CacheInfo(
+            size=len(self._entries),
+            max_size=self._max_size,
+            ttl=self._ttl,
+            evicted=self.evicted_count,
+            expired=self.expired_count,
+        )
+
+    def __setitem__(self, identifier: str, notification: Notification) -> None:
+        self._entries[identifier] = (notification, time.monotonic())
+        self._entries.move_to_end(identifier)
+        self._evict_expired()
+        self._evict_overflow()
+
+    def __getitem__(self, identifier: str) -> Notification:
+        notification = self.get(identifier)
+        if notification is None:
+            raise KeyError(identifier)
+        return notification
+
+    def __contains__(self, identifier: object) -> bool:
+        return self.get(identifier) is not None  # type:ignore[arg-type]
+
+    def __len__(self) -> int:
+        self._evict_expired()
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def get(self, identifier: str) -> Notification | None:
+        """Returns the cached notification or ``None`` if it is not in the cache"""
+        self._evict_expired()
+        entry = self._entries.get(identifier)
+        return entry[0] if entry else None
+
+    def pop(self, identifier: str, default: Any = None) -> Notification | None:
+        """Removes and returns the cached notification"""
+        self._evict_expired()
+        entry = self._entries.pop(identifier, None)
+        return entry[0] if entry else default
+
+    def keys(self) -> list[str]:
+        """Returns identifiers of all cached notifications, oldest first"""
+        self._evict_expired()
+        return list(self._entries)
+
+    def clear(self) -> None:
+        """Removes all notifications from the cache"""
+        self._entries.clear()
+
+    def _evict_overflow(self) -> None:
+        if self._max_size is None:
+            return
+
+        while len(self._entries) > self._max_size:
+            identifier, (notification, _) = self._entries.popitem(last=False)
+            self.evicted_count += 1
+            self._notify_evicted(identifier, notification)
+
+    def _evict_expired(self) -> None:
+        if self._ttl is None or not self._entries:
+            return
+
+        # Entries are ordered by the time they were stored, we therefore only need to
+        # look at the front of the queue.
+        deadline = time.monotonic() - self._ttl
+
+        while self._entries:
+            identifier, (notification, stored) = next(iter(self._entries.items()))
+            if stored > deadline:
+                return
+            del self._entries[identifier]
+            self.expired_count += 1
+            self._notify_evicted(identifier, notification)
+
+    def _notify_evicted(self, identifier: str, notification: Notification) -> None:
+        if self.on_evict:
+            self.on_evict(identifier, notification)
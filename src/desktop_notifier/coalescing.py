@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+This module defines a coalescer which merges bursts of notifications from the same
+thread into a single digest notification.
+"""
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Sequence
+
+from .backends.base import DesktopNotifierBackend
+from .common import Notification
+
+__all__ = ["ThreadCoalescer", "default_summary"]
+
+logger = logging.getLogger(__name__)
+
+SummaryFunction = Callable[[str, int, Sequence[Notification]], tuple[str, str]]
+
+
+def default_summary(
+    thread: str, count: int, notifications: Sequence[Notification]
+) -> tuple[str, str]:
+    """
+    Returns the title and message of a digest, for instance "12 new notifications in
+    #ops" with the title and message of the latest notification.
+
+    :param thread: The thread of the notifications.
+    :param count: The number of notifications in the digest.
+    :param notifications: The most recent notifications in the digest, oldest first.
+    :returns: Title and message of the digest.
+    """
+    latest = notifications[-1]
+    message = f"{latest.title}: {latest.message}" if latest.message else latest.title
+    return f"{count} new notifications in {thread}", message
+
+
+@dataclass
+class _Digest:
+    identifier: str
+    """Identifier of the notification which shows the digest"""
+
+    thread: str
+
+    backend: DesktopNotifierBackend
+    """The backend which shows the digest"""
+
+    notifications: list[Notification]
+    """The most recent notifications in the digest"""
+
+    count: int = 1
+    """Total number of notifications in the digest"""
+
+    dirty: bool = False
+    """Whether notifications were added since the digest was last shown"""
+
+    task: asyncio.Task[None] | None = field(default=None, repr=False)
+
+
+class ThreadCoalescer:
+    """
+    Merges notifications with the same :attr:`desktop_notifier.base.Notification.thread`
+    into a digest notification
+
+    The first notification of a thread is shown right away. Further notifications of
+    the thread which arrive while the digest is open are merged into it, and the digest
+    is updated in place at most once per ``window``, which shows it again if it was
+    dismissed in the meantime. The digest is closed when no notification arrived for a
+    full window. Notifications without a thread are not coalesced. A coalescer may be
+    shared by several notifiers, each of them gets its own digests.
+
+    The digest keeps the buttons and reply field of the latest notification. Clicking
+    the digest calls the ``on_clicked`` callback of the latest notification and
+    dismissing it calls the ``on_dismissed`` callbacks of all merged notifications.
+
+    :param window: Time in seconds for which a digest stays open after the last
+        notification arrived, and the minimum interval between updates of the digest.
+    :param summarize: Function which returns the title and message of a digest from its
+        thread, the number of merged notifications and the most recent notifications.
+    :param max_notifications: Maximum number of notifications to keep per digest for
+        summaries and callbacks. Older ones are still counted.
+    """
+
+    def __init__(
+        self,
+        window: float = 5.0,
+        summarize: SummaryFunction = default_summary,
+        max_notifications: int = 100,
+    ) -> None:
+        if window <= 0:
+            raise ValueError("window must be positive")
+        if max_notifications < 1:
+            raise ValueError("max_notifications must be at least 1")
+
+        self.window = window
+        self.summarize = summarize
+        self.max_notifications = max_notifications
+        self.coalesced_count = 0
+        # Digests by backend and thread, a coalescer may be shared by notifiers.
+        self._digests: dict[tuple[DesktopNotifierBackend, str], _Digest] = {}
+
+    async def submit(
+        self,
+        notification: Notification,
+        backend: DesktopNotifierBackend,
+        send: Callable[[Notification], Awaitable[Any]],
+    ) -> str:
+        """
+        Sends the notification or merges it into the open digest of its thread.
+
+        :param notification: Notification with a thread.
+        :param backend: The backend which shows the digest.
+        :param send: Function to call to send the first notification of a digest.
+        :returns: Identifier of the notification which shows the digest.
+        """
+        assert notification.thread is not None
+        digest = self._digests.get((backend, notification.thread))
+
+        if not digest:
+            digest = _Digest(notification.identifier, notification.thread, backend, [])
+            self._digests[(backend, digest.thread)] = digest
+            digest.notifications.append(notification)
+            digest.task = asyncio.create_task(self._run(digest))
+            await send(notification)
+            return digest.identifier
+
+        digest.notifications.append(notification)
+        del digest.notifications[: -self.max_notifications]
+        digest.count += 1
+        digest.dirty = True
+        self.coalesced_count += 1
+
+        return digest.identifier
+
+    async def flush(self, backend: DesktopNotifierBackend) -> None:
+        """
+        Sends pending updates of the digests shown by the given backend right away
+        instead of at the end of their window.
+
+        :param backend: The backend which shows the digests.
+        """
+        for digest in list(self._digests.values()):
+            if digest.backend is backend and digest.dirty:
+                await self._update(digest)
+
+    async def close(self, backend: DesktopNotifierBackend) -> None:
+        """
+        Closes the digests shown by the given backend without sending pending updates.
+
+        :param backend: The backend which shows the digests.
+        """
+        keys = [key for key in self._digests if key[0] is backend]
+        tasks = []
+
+        for key in keys:
+            # Remove the digest here, a task which did not start yet is cancelled
+            # without running its cleanup.
+            digest = self._digests.pop(key)
+            if digest.task:
+                digest.task.cancel()
+                tasks.append(digest.task)
+
+        if tasks:
+            await asyncio.wait(tasks)
+
+    def _make_notification(self, digest: _Digest) -> Notification:
+        notifications = list(digest.notifications)
+        title, message = self.summarize(digest.thread, digest.count, notifications)
+        dispatcher = digest.backend.dispatcher
+
+        def dismiss_all() -> None:
+            # Dispatch each callback on its own so that coroutine callbacks are
+            # awaited and a failing callback does not skip the remaining ones.
+            for n in notifications:
+                if n.on_dismissed:
+                    dispatcher.dispatch(digest.identifier, n.on_dismissed)
+
+        # Leave on_dismissed unset otherwise so that the class-level handler is used.
+        has_on_dismissed = any(n.on_dismissed for n in notifications)
+        on_dismissed = dismiss_all if has_on_dismissed else None
+
+        return dataclasses.replace(
+            notifications[-1],
+            title=title,
+            message=message,
+            identifier=digest.identifier,
+            on_dismissed=on_dismissed,
+            _buttons_dict={},
+        )
+
+    async def _update(self, digest: _Digest) -> None:
+        digest.dirty = False
+        logger.debug("Updating digest of %s notifications", digest.count)
+
+        try:
+            await digest.backend.replace(self._make_notification(digest))
+        except asyncio.CancelledError:
+            # Send the update again at the end of the window.
+            digest.dirty = True
+            raise
+
+    async def _run(self, digest: _Digest) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.window)
+
+                if not digest.dirty:
+                    break
+
+                await self._update(digest)
+        finally:
+            key = (digest.backend, digest.thread)
+            if self._digests.get(key) is digest:
+                del self._digests[key]
@@ -5,13 +5,13 @@ This module defines base classes for desktop notifications.
 from __future__ import annotations
 
 import dataclasses
+import functools
 import logging
 import uuid
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from importlib.resources import as_file, files
 from pathlib import Path
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, Callable
 from urllib.parse import unquote, urlparse
 
 __all__ = [
@@ -26,15 +26,13 @@ __all__ = [
     "Urgency",
     "AuthorisationError",
     "Notification",
+    "SendResult",
     "DEFAULT_ICON",
     "DEFAULT_SOUND",
 ]
 
 
 logger = logging.getLogger(__name__)
-python_icon_path = as_file(
-    files("desktop_notifier.resources") / "python.png"
-).__enter__()
 
 
 def uuid_str() -> str:
@@ -130,8 +128,41 @@ class Sound(Resource):
     pass
 
 
-DEFAULT_ICON: Icon = Icon(path=python_icon_path)
-"""Python icon"""
+@functools.lru_cache(maxsize=None)
+def get_default_icon() -> Icon:
+    """
+    Returns the Python icon which is used by default
+
+    The icon is resolved on first use because this may require extracting it to a
+    temporary file, for instance when running from a zip archive.
+    """
+    from importlib.resources import as_file, files
+
+    path = as_file(files("desktop_notifier.resources") / "python.png").__enter__()
+    return Icon(path=path)
+
+
+class _DefaultIcon:
+    """Placeholder for :data:`DEFAULT_ICON` in signatures"""
+
+    def __repr__(self) -> str:
+        return "DEFAULT_ICON"
+
+
+DEFAULT_ICON_PLACEHOLDER: Any = _DefaultIcon()
+"""Default argument which is replaced by :data:`DEFAULT_ICON` when it is used"""
+
+if TYPE_CHECKING:
+    DEFAULT_ICON: Icon = get_default_icon()
+    """Python icon"""
+
+
+def __getattr__(name: str) -> Any:
+    # Resolve DEFAULT_ICON lazily, see PEP 562.
+    if name == "DEFAULT_ICON":
+        return get_default_icon()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 DEFAULT_SOUND: Sound = Sound(name="default")
 """Default system notification sound"""
@@ -195,7 +226,8 @@ class Notification:
 
     Callbacks for interactions will be executed on the Python process that scheduled the
     notification and only as long as the DesktopNotifier instance that scheduled the
-    notification still exists.
+    notification still exists. Callbacks may be coroutine functions, which are run as
+    tasks in the event loop of the DesktopNotifier instance.
 
     Install handlers on the DesktopNotifier instance itself to respond to interactions
     with notification from your app while it was not running.
@@ -243,6 +275,9 @@ class Notification:
     """A unique identifier for this notification. Generated automatically if not
     passed by the client."""
 
+    progress: int | None = None
+    """Progress in percent, from 0 to 100, to show as a progress bar"""
+
     _buttons_dict: dict[str, Button] = field(default_factory=dict)
 
     def __post_init__(self) -> None:
@@ -256,6 +291,22 @@ class Notification:
         )
 
 
+@dataclass(frozen=True)
+class SendResult:
+    """The result of scheduling a single notification as part of a batch"""
+
+    identifier: str
+    """Identifier of the notification"""
+
+    error: Exception | None = None
+    """The exception raised when scheduling the notification failed, if any"""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the notification was scheduled successfully"""
+        return self.error is None
+
+
 class Capability(Enum):
     """Notification capabilities that can be supported by a platform"""
 
@@ -309,3 +360,6 @@ class Capability(Enum):
 
     TIMEOUT = auto()
     """Supports notification timeouts"""
+
+    PROGRESS = auto()
+    """Supports showing a progress bar"""
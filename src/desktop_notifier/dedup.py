@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+This module defines a deduplicator which suppresses repeated notifications with the
+same content.
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Hashable
+
+from .common import Notification
+
+__all__ = ["Deduplicator", "content_key"]
+
+ContentKey = tuple[Hashable, ...]
+
+
+def content_key(notification: Notification) -> ContentKey:
+    """
+    Returns the user-visible content of a notification: its title, message, urgency,
+    icon, button titles and thread. Keys are compared by content, not only by hash, so
+    that different notifications never collide.
+    """
+    return (
+        notification.title,
+        notification.message,
+        notification.urgency,
+        notification.icon,
+        tuple(button.title for button in notification.buttons),
+        notification.thread,
+    )
+
+
+class Deduplicator:
+    """
+    Suppresses notifications whose content repeats within a time window
+
+    Notifications are recorded with :meth:`record` once they were sent and checked for
+    repeats with :meth:`check`. Their content is stored in a ring of time buckets which
+    together span the time to live. Whole buckets expire at once, so a repeat is
+    suppressed for at least ``ttl * (1 - 1 / buckets)`` and at most ``ttl`` seconds
+    after the first notification. Each check takes constant time and memory is bounded
+    by the number of distinct notifications within the window. Repeats do not extend
+    the window, so a notification which keeps repeating is shown again once per window.
+
+    :param ttl: Time in seconds for which repeats of a notification are suppressed.
+    :param buckets: Number of time buckets. More buckets expire entries more precisely.
+    """
+
+    def __init__(self, ttl: float = 60.0, buckets: int = 6) -> None:
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if buckets < 1:
+            raise ValueError("buckets must be at least 1")
+
+        self.ttl = ttl
+        self.buckets = buckets
+        self.suppressed_count = 0
+        self._bucket_width = ttl / buckets
+        self._buckets: deque[tuple[int, dict[ContentKey, str]]] = deque()
+
+    def __len__(self) -> int:
+        self._expire(self._current_bucket())
+        return sum(len(entries) for _, entries in self._buckets)
+
+    def check(self, notification: Notification) -> str | None:
+        """
+        Checks whether a notification with the same content was recorded within the
+        time window.
+
+        :param notification: The notification to check.
+        :returns: The identifier of the earlier notification if this is a repeat,
+            ``None`` otherwise.
+        """
+        self._expire(self._current_bucket())
+
+        key = content_key(notification)
+
+        for _, entries in self._buckets:
+            identifier = entries.get(key)
+            if identifier is not None:
+                self.suppressed_count += 1
+                return identifier
+
+        return None
+
+    def record(self, notification: Notification) -> None:
+        """
+        Records a notification which was sent, so that repeats of it are suppressed
+        within the time window. Record notifications only once they were accepted for
+        delivery, so that a notification which failed can be sent again.
+
+        :param notification: The notification to record.
+        """
+        index = self._current_bucket()
+        self._expire(index)
+
+        if not self._buckets or self._buckets[-1][0] != index:
+            self._buckets.append((index, {}))
+
+        self._buckets[-1][1][content_key(notification)] = notification.identifier
+
+    def clear(self) -> None:
+        """Forgets all recorded notifications"""
+        self._buckets.clear()
+
+    def _current_bucket(self) -> int:
+        return int(time.monotonic() // self._bucket_width)
+
+    def _expire(self, index: int) -> None:
+        while self._buckets and self._buckets[0][0] <= index - self.buckets:
+            self._buckets.popleft()
@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+"""
+This module defines the dispatcher which runs callbacks for interactions with
+notifications.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Coroutine
+
+__all__ = ["CallbackDispatcher", "DispatchInfo", "LATENCY_BUCKETS"]
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0, float("inf"))
+"""Upper bounds in seconds of the buckets of the dispatch latency histogram"""
+
+
+@dataclass(frozen=True)
+class DispatchInfo:
+    """Statistics of a callback dispatcher"""
+
+    dispatched: int
+    """Number of callbacks which were started"""
+
+    failed: int
+    """Number of callbacks which raised an exception"""
+
+    timed_out: int
+    """Number of callbacks which exceeded the timeout"""
+
+    pending: int
+    """Number of callbacks which are waiting to run or running, including coroutine
+    callbacks"""
+
+    latency: dict[float, int]
+    """
+    Histogram of the time in seconds from the interaction being reported until its
+    callback started, as the number of callbacks by upper bound of the bucket. Plain
+    callbacks which run inline start right away and are not included.
+    """
+
+
+@dataclass
+class _Call:
+    callback: Callable[..., Any]
+    args: tuple[Any, ...]
+    reported: float
+    # Whether the call completed or timed out, so that it no longer holds up its queue.
+    done: bool = False
+    # Coroutine which an inline callback returned, to be run as a task.
+    coroutine: Coroutine[Any, Any, Any] | None = None
+
+
+class CallbackDispatcher:
+    """
+    Runs callbacks for interactions with notifications
+
+    By default, callbacks are run inline, in the thread and at the time at which the
+    platform reports the interaction. On Linux, this is the event loop which also
+    handles the connection to the notification server, so that a slow callback delays
+    all later interactions and notifications. Pass an executor or use
+    :meth:`thread_pool` to run callbacks in the background instead.
+
+    Callbacks which are coroutine functions are run as tasks in the event loop of the
+    notifier, regardless of the executor, with at most ``max_tasks`` of them running at
+    a time. They can await I/O without blocking the loop or occupying a thread.
+
+    Exceptions raised by callbacks are logged and do not affect other callbacks.
+    Callbacks for the same notification run one at a time in the order in which the
+    interactions were reported. A callback which runs for longer than ``timeout`` is
+    reported and no longer holds up later callbacks for its notification. It cannot be
+    interrupted and keeps running in the background. Coroutine callbacks which time out
+    are cancelled instead.
+
+    :param executor: Executor to run callbacks in, or ``None`` to run them inline.
+    :param timeout: Time in seconds after which a callback is reported as timed out,
+        or ``None`` for no timeout.
+    :param max_tasks: Maximum number of coroutine callbacks which run concurrently.
+        Further callbacks wait until one of them completed.
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        timeout: float | None = None,
+        max_tasks: int = 100,
+    ) -> None:
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive")
+        if max_tasks < 1:
+            raise ValueError("max_tasks must be at least 1")
+
+        self.executor = executor
+        self.timeout = timeout
+        self.max_tasks = max_tasks
+
+        # Event loop to run coroutine callbacks in when interactions are reported from
+        # another thread. Set by the backend.
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+        self.dispatched_count = 0
+        self.failed_count = 0
+        self.timed_out_count = 0
+
+        self._owns_executor = False
+        self._max_workers: int | None = None
+        self._latency_counts = [0] * len(LATENCY_BUCKETS)
+        # Callbacks by notification identifier. The first one of each queue is running.
+        self._queues: dict[str, deque[_Call]] = {}
+        self._lock = threading.Lock()
+
+        # Deadlines of running callbacks in the executor, watched by a single thread
+        # which is started on first use.
+        self._deadlines: list[tuple[float, int, str, _Call]] = []
+        self._deadline_sequence = itertools.count()
+        self._deadline_condition = threading.Condition()
+        self._watchdog: threading.Thread | None = None
+
+        # Tasks of coroutine callbacks, and the last one by notification identifier.
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._last_tasks: dict[str, asyncio.Task[None]] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+
+    @classmethod
+    def thread_pool(
+        cls,
+        max_workers: int | None = None,
+        timeout: float | None = None,
+        max_tasks: int = 100,
+    ) -> CallbackDispatcher:
+        """
+        Returns a dispatcher which runs callbacks in its own pool of threads. The pool
+        is shut down by :meth:`close` and replaced by a new one, which starts threads
+        when the dispatcher is used again.
+
+        :param max_workers: Maximum number of threads, see
+            :class:`concurrent.futures.ThreadPoolExecutor`.
+        :param timeout: Time in seconds after which a callback is reported as timed
+            out, or ``None`` for no timeout.
+        :param max_tasks: Maximum number of coroutine callbacks which run concurrently.
+        """
+        dispatcher = cls(_new_thread_pool(max_workers), timeout, max_tasks)
+        dispatcher._owns_executor = True
+        dispatcher._max_workers = max_workers
+        return dispatcher
+
+    def info(self) -> DispatchInfo:
+        """Returns statistics of the dispatcher"""
+        with self._lock:
+            pending = sum(len(queue) for queue in self._queues.values())
+            pending += len(self._tasks)
+            latency = dict(zip(LATENCY_BUCKETS, self._latency_counts))
+
+        return DispatchInfo(
+            dispatched=self.dispatched_count,
+            failed=self.failed_count,
+            timed_out=self.timed_out_count,
+            pending=pending,
+            latency=latency,
+        )
+
+    def dispatch(
+        self, identifier: str, callback: Callable[..., Any], *args: Any
+    ) -> None:
+        """
+        Runs a callback for an interaction with a notification, or schedules it to run
+        after earlier callbacks for the same notification.
+
+        :param identifier: Identifier of the notification.
+        :param callback: The callback to run.
+        :param args: Arguments to pass to the callback.
+        """
+        if self.executor is None:
+            # Inline callbacks start without delay. They run in the thread which
+            # reports interactions, so that the counters need no lock. Checking the
+            # result instead of the callback keeps this cheap for plain functions.
+            try:
+                if self.timeout is None:
+                    result = callback(*args)
+                else:
+                    result = self._call_timed(callback, args, self.timeout)
+            except Exception:
+                self.failed_count += 1
+                logger.exception("Notification callback %r failed", callback)
+                result = None
+
+            if result is not None and inspect.iscoroutine(result):
+                call = _Call(callback, args, time.monotonic(), coroutine=result)
+                self._dispatch_coroutine(identifier, call)
+            else:
+                # Not counted in the latency histogram, inline callbacks start as the
+                # interaction is reported.
+                self.dispatched_count += 1
+            return
+
+        if inspect.iscoroutinefunction(callback):
+            self._dispatch_coroutine(
+                identifier, _Call(callback, args, time.monotonic())
+            )
+            return
+
+        call = _Call(callback, args, time.monotonic())
+
+        with self._lock:
+            queue = self._queues.setdefault(identifier, deque())
+            queue.append(call)
+            if len(queue) > 1:
+                return
+
+        self._submit(identifier, call)
+
+    async def drain(self) -> None:
+        """Waits until the tasks of coroutine callbacks have completed"""
+        while self._tasks:
+            await asyncio.wait(list(self._tasks))
+
+    def close(self) -> None:
+        """
+        Drops callbacks which did not start yet, cancels running coroutine callbacks
+        and shuts down the pool of threads created by :meth:`thread_pool`. Executors
+        passed in are left running. The dispatcher can be used again after closing.
+        """
+        with self._lock:
+            self._queues.clear()
+
+        with self._deadline_condition:
+            # The watchdog thread stops once it is replaced, a new one is started by
+            # the next callback with a timeout.
+            self._watchdog = None
+            self._deadlines.clear()
+            self._deadline_condition.notify()
+
+        for task in list(self._tasks):
+            task.cancel()
+
+        if self._owns_executor and self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            # Threads are only started on use, the new pool is free until then.
+            self.executor = _new_thread_pool(self._max_workers)
+
+    def _submit(self, identifier: str, call: _Call) -> None:
+        assert self.executor is not None
+
+        if self.timeout is not None:
+            self._watch(identifier, call, self.timeout)
+
+        try:
+            future = self.executor.submit(self._run, identifier, call)
+        except RuntimeError:
+            # The executor was shut down.
+            logger.warning("Callback dropped, executor is shut down")
+            self._finish(identifier, call)
+        else:
+            future.add_done_callback(lambda _: self._finish(identifier, call))
+
+    def _call_timed(
+        self, callback: Callable[..., Any], args: tuple[Any, ...], timeout: float
+    ) -> Any:
+        started = time.monotonic()
+
+        try:
+            return callback(*args)
+        finally:
+            # Inline callbacks cannot be cut short, only reported.
+            if time.monotonic() - started > timeout:
+                self._report_timeout(callback)
+
+    def _dispatch_coroutine(self, identifier: str, call: _Call) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            loop = self.loop
+            if loop is None or loop.is_closed():
+                logger.warning("Callback %r dropped, no event loop", call.callback)
+                if call.coroutine:
+                    call.coroutine.close()
+                return
+            loop.call_soon_threadsafe(self._create_task, identifier, call)
+        else:
+            self._create_task(identifier, call)
+
+    def _create_task(self, identifier: str, call: _Call) -> None:
+        previous = self._last_tasks.get(identifier)
+        task = asyncio.ensure_future(self._run_coroutine(previous, call))
+
+        with self._lock:
+            self._tasks.add(task)
+        self._last_tasks[identifier] = task
+
+        task.add_done_callback(lambda _: self._task_done(identifier, task))
+
+    def _task_done(self, identifier: str, task: asyncio.Task[None]) -> None:
+        with self._lock:
+            self._tasks.discard(task)
+        if self._last_tasks.get(identifier) is task:
+            del self._last_tasks[identifier]
+
+    async def _run_coroutine(
+        self, previous: asyncio.Task[None] | None, call: _Call
+    ) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_tasks)
+
+        try:
+            # Keep the order of callbacks for the same notification.
+            if previous:
+                await asyncio.wait([previous])
+            await self._semaphore.acquire()
+        except asyncio.CancelledError:
+            if call.coroutine:
+                call.coroutine.close()
+            raise
+
+        try:
+            self._record_start(call)
+            coroutine = call.coroutine or call.callback(*call.args)
+            await asyncio.wait_for(coroutine, self.timeout)
+        except asyncio.TimeoutError:
+            self._report_timeout(call.callback)
+        except Exception:
+            with self._lock:
+                self.failed_count += 1
+            logger.exception("Notification callback %r failed", call.callback)
+        finally:
+            self._semaphore.release()
+
+    def _record_start(self, call: _Call, started: float | None = None) -> None:
+        if started is None:
+            started = time.monotonic()
+
+        latency = started - call.reported
+        index = bisect_left(LATENCY_BUCKETS, latency)
+
+        with self._lock:
+            self.dispatched_count += 1
+            self._latency_counts[index] += 1
+
+    def _run(self, identifier: str, call: _Call) -> None:
+        started = time.monotonic()
+
+        try:
+            result = call.callback(*call.args)
+        except Exception:
+            self._record_start(call, started)
+            with self._lock:
+                self.failed_count += 1
+            logger.exception("Notification callback %r failed", call.callback)
+            return
+
+        if result is not None and inspect.iscoroutine(result):
+            # A callback which returns a coroutine without being a coroutine function,
+            # such as a lambda. Run it as a task, as in inline mode.
+            self._dispatch_coroutine(
+                identifier,
+                _Call(call.callback, call.args, call.reported, coroutine=result),
+            )
+        else:
+            self._record_start(call, started)
+
+    def _watch(self, identifier: str, call: _Call, timeout: float) -> None:
+        """Reports the call as timed out unless it completed within the timeout"""
+        entry = (
+            time.monotonic() + timeout,
+            next(self._deadline_sequence),
+            identifier,
+            call,
+        )
+
+        with self._deadline_condition:
+            heapq.heappush(self._deadlines, entry)
+
+            if not self._watchdog:
+                self._watchdog = threading.Thread(
+                    target=self._watch_deadlines,
+                    name="desktop-notifier-callback-watchdog",
+                    daemon=True,
+                )
+                self._watchdog.start()
+            elif self._deadlines[0] is entry:
+                self._deadline_condition.notify()
+
+    def _watch_deadlines(self) -> None:
+        while True:
+            with self._deadline_condition:
+                while True:
+                    if self._watchdog is not threading.current_thread():
+                        return
+
+                    # Forget the deadlines of calls which completed in time.
+                    while self._deadlines and self._deadlines[0][3].done:
+                        heapq.heappop(self._deadlines)
+
+                    if not self._deadlines:
+                        self._deadline_condition.wait()
+                        continue
+
+                    delay = self._deadlines[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+
+                    self._deadline_condition.wait(delay)
+
+                _, _, identifier, call = heapq.heappop(self._deadlines)
+
+            self._on_timeout(identifier, call)
+
+    def _on_timeout(self, identifier: str, call: _Call) -> None:
+        if call.done:
+            return
+        self._report_timeout(call.callback)
+        self._finish(identifier, call)
+
+    def _report_timeout(self, callback: Callable[..., Any]) -> None:
+        with self._lock:
+            self.timed_out_count += 1
+        logger.warning(
+            "Notification callback %r took longer than %s s", callback, self.timeout
+        )
+
+    def _finish(self, identifier: str, call: _Call) -> None:
+        """Removes a call from its queue and submits the next one, if any"""
+        with self._lock:
+            call.done = True
+            queue = self._queues.get(identifier)
+
+            # The call may have been removed already when it timed out.
+            if not queue or queue[0] is not call:
+                return
+
+            queue.popleft()
+
+            if not queue:
+                del self._queues[identifier]
+                return
+
+            next_call = queue[0]
+
+        self._submit(identifier, next_call)
+
+
+def _new_thread_pool(max_workers: int | None) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers, thread_name_prefix="desktop-notifier-callback"
+    )
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+This module defines events for interactions with notifications and the streams which
+deliver them to subscribers.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import Any
+
+__all__ = [
+    "NotificationEvent",
+    "Clicked",
+    "Dismissed",
+    "ButtonPressed",
+    "Replied",
+    "Expired",
+    "Cleared",
+    "Evicted",
+    "EventOverflow",
+    "EventStream",
+]
+
+
+@dataclass(frozen=True)
+class NotificationEvent:
+    """
+    Base class of events for interactions with notifications and for notifications
+    which go away without an interaction
+    """
+
+    identifier: str
+    """Identifier of the notification"""
+
+    thread: str | None
+    """Thread of the notification, if known"""
+
+    timestamp: float
+    """Time at which the event was reported, in seconds since the epoch"""
+
+
+@dataclass(frozen=True)
+class Clicked(NotificationEvent):
+    """The notification was clicked"""
+
+
+@dataclass(frozen=True)
+class Dismissed(NotificationEvent):
+    """The notification was dismissed"""
+
+
+@dataclass(frozen=True)
+class ButtonPressed(NotificationEvent):
+    """A button of the notification was pressed"""
+
+    button_identifier: str
+    """Identifier of the button"""
+
+
+@dataclass(frozen=True)
+class Replied(NotificationEvent):
+    """The user replied through the reply field of the notification"""
+
+    reply_text: str
+    """The text of the reply"""
+
+
+@dataclass(frozen=True)
+class Expired(NotificationEvent):
+    """
+    The notification expired without an interaction, or no interaction happened within
+    the timeout of :meth:`desktop_notifier.DesktopNotifier.send_and_wait`
+    """
+
+
+@dataclass(frozen=True)
+class Cleared(NotificationEvent):
+    """
+    The notification was cleared by the app, or it disappeared because the notification
+    server was restarted
+    """
+
+
+@dataclass(frozen=True)
+class Evicted(NotificationEvent):
+    """
+    Interactions with the notification are no longer handled, because it was evicted
+    from the cache of sent notifications or the notifier was closed
+    """
+
+
+class EventOverflow(Enum):
+    """What to do with an event which arrives while the queue of a stream is full"""
+
+    DROP_OLDEST = auto()
+    """Drop the event which has been queued the longest"""
+
+    DROP_NEWEST = auto()
+    """Drop the event which arrived"""
+
+
+class EventStream:
+    """
+    An asynchronous iterator over events for interactions with notifications
+
+    Streams are created by :meth:`desktop_notifier.DesktopNotifier.events`. Events are
+    queued from the time the stream is created until it is closed. Interactions cannot
+    wait for a slow consumer, so when the queue is full, events are dropped according
+    to ``overflow`` and counted in :attr:`dropped_count`.
+
+    Closing the stream ends the iteration after the queued events have been consumed.
+    Streams are closed when used as an async context manager, and when the notifier is
+    closed.
+
+    :param thread: Only deliver events for notifications in this thread.
+    :param identifier: Only deliver events for the notification with this identifier.
+    :param max_size: Maximum number of events to queue.
+    :param overflow: What to do with events which arrive while the queue is full.
+    """
+
+    def __init__(
+        self,
+        thread: str | None = None,
+        identifier: str | None = None,
+        max_size: int = 100,
+        overflow: EventOverflow = EventOverflow.DROP_OLDEST,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.thread = thread
+        self.identifier = identifier
+        self.max_size = max_size
+        self.overflow = overflow
+        self.dropped_count = 0
+
+        self._loop = asyncio.get_running_loop()
+        self._queue: deque[NotificationEvent] = deque()
+        self._waiter: asyncio.Future[None] | None = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def closed(self) -> bool:
+        """Whether the stream was closed"""
+        return self._closed
+
+    def matches(self, event: NotificationEvent) -> bool:
+        """Returns whether an event passes the filters of the stream"""
+        if self.identifier is not None and event.identifier != self.identifier:
+            return False
+        if self.thread is not None and event.thread != self.thread:
+            return False
+        return True
+
+    def put(self, event: NotificationEvent) -> None:
+        """
+        Queues an event if it passes the filters of the stream. This may be called from
+        any thread.
+
+        :param event: The event to queue.
+        """
+        if self._closed or not self.matches(event):
+            return
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._put(event)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._put, event)
+
+    def close(self) -> None:
+        """Stops queueing events and ends the iteration once the queue is empty"""
+        self._closed = True
+        self._wake()
+
+    def __aiter__(self) -> EventStream:
+        return self
+
+    async def __anext__(self) -> NotificationEvent:
+        while not self._queue:
+            if self._closed:
+                raise StopAsyncIteration
+            self._waiter = self._loop.create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+        return self._queue.popleft()
+
+    async def __aenter__(self) -> EventStream:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.close()
+
+    def _put(self, event: NotificationEvent) -> None:
+        if self._closed:
+            return
+
+        if len(self._queue) >= self.max_size:
+            self.dropped_count += 1
+            if self.overflow is EventOverflow.DROP_NEWEST:
+                return
+            self._queue.popleft()
+
+        self._queue.append(event)
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._waiter and not self._waiter.done():
+            self._waiter.set_result(None)
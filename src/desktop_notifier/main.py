@@ -5,16 +5,19 @@ Asynchronous desktop notification API
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 import logging
 import platform
+import time
 import warnings
-from typing import Any, Callable, Sequence, Type, TypeVar
-
-from packaging.version import Version
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Sequence, Type, TypeVar
 
 from .backends.base import DesktopNotifierBackend
+from .breaker import BreakerInfo, BreakerState
+from .cache import CacheInfo
+from .coalescing import ThreadCoalescer
 from .common import (
-    DEFAULT_ICON,
+    DEFAULT_ICON_PLACEHOLDER,
     DEFAULT_SOUND,
     Attachment,
     Button,
@@ -22,9 +25,30 @@ from .common import (
     Icon,
     Notification,
     ReplyField,
+    SendResult,
     Sound,
     Urgency,
+    get_default_icon,
+)
+from .dedup import Deduplicator
+from .dispatch import CallbackDispatcher, DispatchInfo
+from .events import (
+    ButtonPressed,
+    Cleared,
+    Clicked,
+    Dismissed,
+    EventOverflow,
+    EventStream,
+    Evicted,
+    Expired,
+    NotificationEvent,
+    Replied,
 )
+from .scheduler import DispatchScheduler, OverflowPolicy, SchedulerInfo
+
+if TYPE_CHECKING:
+    from .common import DEFAULT_ICON
+    from .outbox import Outbox
 
 __all__ = [
     "Notification",
@@ -34,6 +58,27 @@ __all__ = [
     "Sound",
     "Attachment",
     "Urgency",
+    "SendResult",
+    "CacheInfo",
+    "BreakerInfo",
+    "BreakerState",
+    "DispatchScheduler",
+    "OverflowPolicy",
+    "SchedulerInfo",
+    "ThreadCoalescer",
+    "Deduplicator",
+    "CallbackDispatcher",
+    "DispatchInfo",
+    "NotificationEvent",
+    "Clicked",
+    "Dismissed",
+    "ButtonPressed",
+    "Replied",
+    "Expired",
+    "Cleared",
+    "Evicted",
+    "EventOverflow",
+    "EventStream",
     "DesktopNotifier",
     "Capability",
     "DEFAULT_SOUND",
@@ -48,6 +93,26 @@ T = TypeVar("T")
 default_event_loop_policy = asyncio.DefaultEventLoopPolicy()
 
 
+def __getattr__(name: str) -> Any:
+    # Resolve DEFAULT_ICON lazily, see PEP 562.
+    if name == "DEFAULT_ICON":
+        return get_default_icon()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_windows_version() -> tuple[int, ...]:
+    """
+    Returns the Windows version, for instance (10, 0, 19045). Parsing stops at the first
+    component of the version string which is not a number.
+    """
+    parts = []
+    for part in platform.version().split("."):
+        if not part.isdigit():
+            break
+        parts.append(int(part))
+    return tuple(parts)
+
+
 def get_backend_class() -> Type[DesktopNotifierBackend]:
     """
     Return the backend class depending on the platform and version.
@@ -56,6 +121,8 @@ def get_backend_class() -> Type[DesktopNotifierBackend]:
     :raises RuntimeError: when passing ``macos_legacy = True`` on macOS 12.0 and later.
     """
     if platform.system() == "Darwin":
+        from packaging.version import Version
+
         from .backends.macos_support import is_bundle, is_signed_bundle, macos_version
 
         has_unusernotificationcenter = macos_version >= Version("10.14")
@@ -85,9 +152,7 @@ def get_backend_class() -> Type[DesktopNotifierBackend]:
 
         return DBusDesktopNotifier
 
-    elif platform.system() == "Windows" and Version(platform.version()) >= Version(
-        "10.0.10240"
-    ):
+    elif platform.system() == "Windows" and get_windows_version() >= (10, 0, 10240):
         from .backends.winrt import WinRTDesktopNotifier
 
         return WinRTDesktopNotifier
@@ -110,7 +175,9 @@ class DesktopNotifier:
 
     Callbacks to handle user interactions with a notification can be specified either at
     the class level, where they take the notification identifier as input, or directly
-    on the notification itself. The latter will take precedence if set.
+    on the notification itself. The latter will take precedence if set. Callbacks may be
+    coroutine functions, which are run as tasks in the event loop, see
+    :class:`desktop_notifier.dispatch.CallbackDispatcher`.
 
     Note that handlers that are directly set on the notification are tied to Python
     notification instance and therefore the app's lifecycle. Handlers that are set on
@@ -125,6 +192,37 @@ class DesktopNotifier:
         :class:`desktop_notifier.base.Icon` instance referencing either a file or a
         named system icon. :class:`str` or :class:`pathlib.Path` are also accepted but
         deprecated.
+    :param cache_size: Maximum number of sent notifications to keep track of for
+        callbacks. When exceeded, the oldest notifications are evicted, regardless of
+        interactions with them, and later interactions with them are handled by the
+        class-level handlers only. ``None`` for no limit.
+    :param cache_ttl: Maximum time in seconds to keep track of a sent notification for
+        callbacks. This prevents notifications from accumulating with notification
+        servers which do not report when a notification was closed. ``None`` for no
+        limit.
+    :param progress_rate: Maximum number of progress updates per second to send for
+        each notification. Updates which are reported more frequently through
+        :meth:`progress` are coalesced.
+    :param scheduler: A scheduler to rate limit and prioritise notifications sent with
+        :meth:`send_notification` or :meth:`send`. When set, notifications are queued
+        and sent in the background. Batches sent with :meth:`send_many` are not
+        scheduled.
+    :param coalescer: A coalescer to merge bursts of notifications with the same
+        ``thread`` into digest notifications which are updated in place.
+    :param deduplicator: A deduplicator to suppress notifications whose content repeats
+        within a time window.
+    :param outbox: An outbox to store notifications which cannot be delivered because
+        the notification server is unavailable. They are delivered in order once the
+        server is available again, including after a restart of the app. This also
+        applies to batches sent with :meth:`send_many`.
+    :param interactive: Whether to handle interactions with notifications. If
+        ``False``, callbacks are never called and sent notifications are not kept track
+        of, so that they cannot be updated in place or cleared. On Linux, the backend
+        then neither listens for signals of the notification server nor waits for its
+        reply, which reduces the cost of sending to a single write to the bus.
+    :param dispatcher: A dispatcher to run callbacks for interactions with
+        notifications. By default, callbacks run inline in the event loop, see
+        :class:`desktop_notifier.dispatch.CallbackDispatcher`.
     """
 
     app_icon: Icon | None
@@ -132,8 +230,17 @@ class DesktopNotifier:
     def __init__(
         self,
         app_name: str = "Python",
-        app_icon: Icon | None = DEFAULT_ICON,
+        app_icon: Icon | None = DEFAULT_ICON_PLACEHOLDER,
         notification_limit: int | None = None,
+        cache_size: int | None = None,
+        cache_ttl: float | None = None,
+        progress_rate: float = 10.0,
+        scheduler: DispatchScheduler | None = None,
+        coalescer: ThreadCoalescer | None = None,
+        deduplicator: Deduplicator | None = None,
+        outbox: Outbox | None = None,
+        interactive: bool = True,
+        dispatcher: CallbackDispatcher | None = None,
     ) -> None:
         if notification_limit is not None:
             warnings.warn(
@@ -141,13 +248,35 @@ class DesktopNotifier:
                 category=DeprecationWarning,
             )
 
+        if app_icon is DEFAULT_ICON_PLACEHOLDER:
+            app_icon = get_default_icon()
+
         self.app_icon = app_icon
+        self.scheduler = scheduler
+        self.coalescer = coalescer
+        self.deduplicator = deduplicator
 
         backend = get_backend_class()
         self._backend = backend(app_name)
+        self._backend._notification_cache.max_size = cache_size
+        self._backend._notification_cache.ttl = cache_ttl
+        self._backend.outbox = outbox
+        self._backend.interactive = interactive
+        if dispatcher:
+            self._backend.dispatcher = dispatcher
         self._did_request_authorisation = False
+        self._authorisation_task: asyncio.Future[bool] | None = None
 
         self._capabilities: frozenset[Capability] | None = None
+        self._capabilities_generation = 0
+        self._capabilities_task: asyncio.Future[frozenset[Capability]] | None = None
+
+        if progress_rate <= 0:
+            raise ValueError("progress_rate must be positive")
+
+        self.progress_rate = progress_rate
+        self._pending_progress: dict[str, int] = {}
+        self._progress_tasks: dict[str, asyncio.Task[None]] = {}
 
     @property
     def app_name(self) -> str:
@@ -172,7 +301,20 @@ class DesktopNotifier:
         :returns: Whether authorisation has been granted.
         """
         self._did_request_authorisation = True
-        return await self._backend.request_authorisation()
+
+        # Concurrent callers share a single request so that the user is not prompted
+        # more than once.
+        if not self._authorisation_task:
+            self._authorisation_task = asyncio.ensure_future(
+                self._backend.request_authorisation()
+            )
+            self._authorisation_task.add_done_callback(self._on_authorisation_done)
+
+        return await asyncio.shield(self._authorisation_task)
+
+    def _on_authorisation_done(self, task: asyncio.Future[bool]) -> None:
+        if self._authorisation_task is task:
+            self._authorisation_task = None
 
     async def has_authorisation(self) -> bool:
         """Returns whether we have authorisation to send notifications."""
@@ -183,7 +325,12 @@ class DesktopNotifier:
         Sends a desktop notification.
 
         This method does not raise an exception when scheduling the notification fails
-        but logs warnings instead.
+        but logs warnings instead. If a :attr:`scheduler` is set, this method returns
+        once the notification has been queued or dropped. If a :attr:`coalescer` is set
+        and the notification is merged into a digest, the identifier of the digest is
+        returned instead. Likewise, if a :attr:`deduplicator` is set and the
+        notification repeats an earlier one, it is not sent and the identifier of the
+        earlier notification is returned.
 
         Note that even a successfully scheduled notification may not be displayed to the
         user, depending on their notification center settings (for instance if "do not
@@ -192,22 +339,151 @@ class DesktopNotifier:
         :param notification: The notification to send.
         :returns: An identifier for the scheduled notification.
         """
+        # Prepare first, the content which is checked for repeats includes the icon.
+        await self._prepare_send(notification)
+
+        if self.deduplicator is not None:
+            identifier = self.deduplicator.check(notification)
+            if identifier is not None:
+                logger.debug("Duplicate notification suppressed: %s", notification)
+                return identifier
+
+        if self.coalescer and notification.thread:
+            identifier = await self.coalescer.submit(
+                notification, self._backend, self._dispatch
+            )
+            if identifier != notification.identifier and self.deduplicator is not None:
+                # Merged into a digest which was already sent.
+                self.deduplicator.record(notification)
+            return identifier
+
+        await self._dispatch(notification)
+
+        return notification.identifier
+
+    async def send_and_wait(
+        self, notification: Notification, timeout: float | None = None
+    ) -> NotificationEvent:
+        """
+        Sends a desktop notification and waits for its outcome: the first interaction
+        with it, or the notification going away without one. For example, to ask for
+        approval:
+
+        .. code-block:: python
+
+            outcome = await notifier.send_and_wait(notification, timeout=300)
+            if isinstance(outcome, ButtonPressed) and outcome.button_identifier == "ok":
+                ...
+
+        Callbacks of the notification are called as usual. If the notification is
+        merged into a digest or suppressed as a duplicate, the outcome of the digest or
+        the earlier notification is returned.
+
+        :param notification: The notification to send.
+        :param timeout: Maximum time in seconds to wait. ``None`` to wait until the
+            outcome is known.
+        :returns: A :class:`desktop_notifier.events.Clicked`,
+            :class:`desktop_notifier.events.ButtonPressed`,
+            :class:`desktop_notifier.events.Replied` or
+            :class:`desktop_notifier.events.Dismissed` event for an interaction. A
+            :class:`desktop_notifier.events.Cleared` event if the notification was
+            cleared, a :class:`desktop_notifier.events.Evicted` event if it was evicted
+            from the cache or the notifier was closed, and a
+            :class:`desktop_notifier.events.Expired` event if it expired or the timeout
+            passed.
+        :raises RuntimeError: if the notifier is not interactive, or if the
+            notification was dropped by the :attr:`scheduler` or the outbox because they
+            were full or, for the outbox, because it exceeded the maximum age.
+        :raises Exception: the error raised by the platform if the notification could
+            not be sent, or could not be delivered from the outbox.
+        """
+        if not self._backend.interactive:
+            raise RuntimeError("Outcomes require an interactive notifier")
+
+        identifier = notification.identifier
+        # Expect the outcome before sending, interactions may be reported right away.
+        future = self._backend.expect_outcome(identifier)
+
+        try:
+            sent_identifier = await self.send_notification(notification)
+
+            if sent_identifier != identifier:
+                self._backend.forget_outcome(identifier, future)
+                identifier = sent_identifier
+                future = self._backend.expect_outcome(identifier)
+
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return Expired(identifier, notification.thread, time.time())
+        finally:
+            self._backend.forget_outcome(identifier, future)
+
+    async def _dispatch(self, notification: Notification) -> None:
+        # We attempt to send the notification regardless of authorization.
+        # The user may have changed settings in the meantime.
+        if self.scheduler:
+            accepted = await self.scheduler.submit(
+                notification, self._backend.send, self._on_dropped
+            )
+        else:
+            accepted = await self._backend.send(notification)
+
+        # Only suppress repeats of notifications which were sent or queued, so that a
+        # notification which failed can be sent again.
+        if accepted and self.deduplicator is not None:
+            self.deduplicator.record(notification)
+
+    def _on_dropped(self, notification: Notification) -> None:
+        # Do not leave send_and_wait() waiting for a notification which is gone.
+        error = RuntimeError(f"Notification was dropped: {notification}")
+        self._backend.fail_outcome(notification.identifier, error)
+
+    async def send_many(
+        self, notifications: Iterable[Notification], max_in_flight: int = 16
+    ) -> list[SendResult]:
+        """
+        Sends multiple desktop notifications.
+
+        Notifications are dispatched concurrently, with at most ``max_in_flight``
+        notifications being scheduled at the same time. Backends may use a native batch
+        API where available. Throughput for large batches therefore scales with the
+        number of notifications in flight rather than with the latency of an
+        individual request.
+
+        Like :meth:`send_notification`, this method does not raise an exception when
+        scheduling a notification fails but logs warnings instead. Failures are
+        reported for each notification in the returned results.
+
+        :param notifications: The notifications to send.
+        :param max_in_flight: The maximum number of notifications which are scheduled
+            concurrently.
+        :returns: A result for each notification, in input order, containing its
+            identifier and any error which occurred when scheduling it.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        notifications = list(notifications)
+
+        for notification in notifications:
+            await self._prepare_send(notification)
+
+        errors = await self._backend.send_many(notifications, max_in_flight)
+
+        return [SendResult(n.identifier, e) for n, e in zip(notifications, errors)]
+
+    async def _prepare_send(self, notification: Notification) -> None:
         if not notification.icon:
             object.__setattr__(notification, "icon", self.app_icon)
 
         # Ask for authorisation if not already done. On some platforms, this will
-        # trigger a system dialog to ask the user for permission.
-        if not self._did_request_authorisation:
+        # trigger a system dialog to ask the user for permission. If a request is still
+        # pending, wait for it before sending.
+        if not self._did_request_authorisation or self._authorisation_task:
             await self.request_authorisation()
         else:
             logger.debug("Notification center authorisation was already requested")
 
-        # We attempt to send the notification regardless of authorization.
-        # The user may have changed settings in the meantime.
-        await self._backend.send(notification)
-
-        return notification.identifier
-
     async def send(
         self,
         title: str,
@@ -222,6 +498,7 @@ class DesktopNotifier:
         sound: Sound | None = None,
         thread: str | None = None,
         timeout: int = -1,  # in seconds
+        progress: int | None = None,
     ) -> str:
         """
         Sends a desktop notification
@@ -245,9 +522,81 @@ class DesktopNotifier:
             sound=sound,
             thread=thread,
             timeout=timeout,
+            progress=progress,
         )
         return await self.send_notification(notification)
 
+    async def update(self, identifier: str, /, **changes: Any) -> None:
+        """
+        Updates a notification which was previously sent.
+
+        The notification is replaced in place where supported by the platform, for
+        instance on Linux and macOS. Otherwise, it is cleared and sent again. In both
+        cases, it keeps its identifier and callbacks which are not changed.
+
+        This method does not raise an exception when updating the notification fails
+        but logs warnings instead.
+
+        :param identifier: Identifier of the notification to update.
+        :param changes: Fields of :class:`desktop_notifier.base.Notification` to
+            change, for instance ``title`` or ``message``.
+        """
+        if "identifier" in changes:
+            raise ValueError("The identifier of a notification cannot be changed")
+
+        notification = self._backend._notification_cache.get(identifier)
+
+        if not notification:
+            logger.warning("Cannot update unknown notification '%s'", identifier)
+            return
+
+        # Buttons are indexed again from the new notification's buttons.
+        notification = dataclasses.replace(notification, **changes, _buttons_dict={})
+
+        await self._prepare_send(notification)
+        await self._backend.replace(notification)
+
+    async def progress(self, identifier: str, value: int) -> None:
+        """
+        Updates the progress bar of a notification which was previously sent.
+
+        This method can be called at a high rate. Updates are coalesced so that at most
+        :attr:`progress_rate` updates per second are sent for each notification, always
+        with the latest value. Intermediate values are sent in the background and this
+        method returns immediately. The final update to 100 percent is always sent and
+        this method waits until it has been delivered.
+
+        :param identifier: Identifier of the notification to update.
+        :param value: Progress in percent, from 0 to 100.
+        """
+        if not 0 <= value <= 100:
+            raise ValueError("Progress must be between 0 and 100")
+
+        self._pending_progress[identifier] = value
+
+        task = self._progress_tasks.get(identifier)
+
+        if not task:
+            task = asyncio.create_task(self._send_progress(identifier))
+            self._progress_tasks[identifier] = task
+
+        if value == 100:
+            await asyncio.shield(task)
+
+    async def _send_progress(self, identifier: str) -> None:
+        try:
+            while identifier in self._pending_progress:
+                value = self._pending_progress.pop(identifier)
+                await self.update(identifier, progress=value)
+
+                # Wait before sending the next update unless this was the final one.
+                # Values which are reported in the meantime replace each other.
+                if value < 100 or identifier in self._pending_progress:
+                    await asyncio.sleep(1 / self.progress_rate)
+        finally:
+            del self._progress_tasks[identifier]
+            self._pending_progress.pop(identifier, None)
+
     async def get_current_notifications(self) -> list[str]:
         """Returns identifiers of all currently displayed notifications for this app."""
         return await self._backend.get_current_notifications()
@@ -271,10 +620,184 @@ class DesktopNotifier:
         """
         Returns which functionality is supported by the implementation.
         """
-        if not self._capabilities:
-            self._capabilities = await self._backend.get_capabilities()
+        generation = self._backend._server_generation
+
+        if self._capabilities and self._capabilities_generation == generation:
+            return self._capabilities
+
+        # Concurrent callers share a single lookup. Failed lookups are retried on the
+        # next call.
+        if not self._capabilities_task:
+            self._capabilities_task = asyncio.ensure_future(
+                self._backend.get_capabilities()
+            )
+
+        task = self._capabilities_task
+
+        try:
+            self._capabilities = await asyncio.shield(task)
+            self._capabilities_generation = generation
+        finally:
+            if task.done() and self._capabilities_task is task:
+                self._capabilities_task = None
+
         return self._capabilities
 
+    def cache_info(self) -> CacheInfo:
+        """
+        Returns statistics of the cache of sent notifications, such as its size and the
+        number of evicted notifications.
+        """
+        return self._backend._notification_cache.info()
+
+    async def drain_outbox(self) -> None:
+        """
+        Delivers all notifications in the outbox, for instance those left over from a
+        previous run of the app. This waits until the notification server is
+        available. Notifications in the outbox are otherwise delivered when the next
+        notification is sent.
+        """
+        await self._backend.drain_outbox()
+
+    async def flush(self, timeout: float | None = None) -> bool:
+        """
+        Waits until notifications which were sent or queued have been delivered. This
+        includes notifications queued by the :attr:`scheduler`, pending updates of
+        digests and progress bars, notifications in the outbox and sends which are in
+        flight. If the scheduler is shared with other notifiers, their queued
+        notifications are waited for as well.
+
+        :param timeout: Maximum time in seconds to wait, or ``None`` to wait until
+            everything has been delivered.
+        :returns: Whether everything was delivered within the timeout.
+        """
+        try:
+            await asyncio.wait_for(self._flush(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def _flush(self) -> None:
+        while self._progress_tasks:
+            await asyncio.wait(list(self._progress_tasks.values()))
+
+        if self.coalescer:
+            await self.coalescer.flush(self._backend)
+
+        if self.scheduler:
+            await self.scheduler.join()
+
+        await self._backend.flush()
+
+    async def aclose(self) -> None:
+        """
+        Shuts down the notifier and releases its resources, such as the connection to
+        the notification server.
+
+        Background work is stopped: notifications which this notifier queued in the
+        :attr:`scheduler` are discarded, digests are closed without sending pending
+        updates and pending progress updates are dropped. Sends which are in flight are
+        waited for and the outbox is closed. Call :meth:`flush` first to deliver queued
+        notifications. Running coroutine callbacks are waited for, callbacks which did
+        not start yet are dropped and the threads of a thread pool of the
+        :attr:`dispatcher` are stopped, new ones are started when callbacks run again.
+        Event streams end once their queued events have been consumed.
+
+        Interactions with notifications which were sent before are no longer handled.
+        The notifier connects to the notification server again if it is used after
+        closing.
+        """
+        if self.scheduler:
+            self.scheduler.discard(self._backend.send)
+
+        if self.coalescer:
+            await self.coalescer.close(self._backend)
+
+        tasks = list(self._progress_tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
+
+        # Callbacks may still send notifications, let them complete first.
+        await self._backend.dispatcher.drain()
+        await self._backend.close()
+        self._backend.dispatcher.close()
+        self._backend.close_event_streams()
+
+    async def __aenter__(self) -> DesktopNotifier:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    def breaker_info(self) -> BreakerInfo:
+        """
+        Returns the state of the circuit breaker which stops sending notifications
+        while the notification server is unavailable, such as on headless machines.
+        After repeated failures, notifications are dropped without contacting the
+        server and a single notification is sent as a probe after an exponentially
+        increasing delay.
+        """
+        return self._backend.breaker_info()
+
+    def events(
+        self,
+        thread: str | None = None,
+        identifier: str | None = None,
+        max_size: int = 100,
+        overflow: EventOverflow = EventOverflow.DROP_OLDEST,
+    ) -> EventStream:
+        """
+        Returns a stream of events for interactions with notifications, as an
+        alternative to callbacks. Events are delivered to every stream in addition to
+        the callbacks, as :class:`desktop_notifier.events.Clicked`,
+        :class:`desktop_notifier.events.Dismissed`,
+        :class:`desktop_notifier.events.ButtonPressed` and
+        :class:`desktop_notifier.events.Replied` instances, and as
+        :class:`desktop_notifier.events.Expired`,
+        :class:`desktop_notifier.events.Cleared` or
+        :class:`desktop_notifier.events.Evicted` instances when a notification goes
+        away without an interaction. Must be called with a running event loop, for
+        example:
+
+        .. code-block:: python
+
+            async with notifier.events(thread="ops") as events:
+                async for event in events:
+                    ...
+
+        Events are queued from the time the stream is created until it is closed. When
+        the consumer falls behind by more than ``max_size`` events, events are dropped
+        according to ``overflow``.
+
+        :param thread: Only deliver events for notifications in this thread.
+        :param identifier: Only deliver events for the notification with this
+            identifier.
+        :param max_size: Maximum number of events to queue.
+        :param overflow: What to do with events which arrive while the queue is full.
+        """
+        stream = EventStream(thread, identifier, max_size, overflow)
+        self._backend.subscribe(stream)
+        return stream
+
+    @property
+    def dispatcher(self) -> CallbackDispatcher:
+        """The dispatcher which runs callbacks for interactions with notifications"""
+        return self._backend.dispatcher
+
+    @dispatcher.setter
+    def dispatcher(self, dispatcher: CallbackDispatcher) -> None:
+        self._backend.dispatcher = dispatcher
+
+    def dispatch_info(self) -> DispatchInfo:
+        """
+        Returns statistics of the callbacks for interactions with notifications, such
+        as the number of failed callbacks and a histogram of the latency until they
+        started
+        """
+        return self._backend.dispatcher.info()
+
     @property
     def on_clicked(self) -> Callable[[str], Any] | None:
         """
@@ -339,3 +862,19 @@ class DesktopNotifier:
     @on_replied.setter
     def on_replied(self, handler: Callable[[str, str], Any] | None) -> None:
         self._backend.on_replied = handler
+
+    @property
+    def on_evicted(self) -> Callable[[str], Any] | None:
+        """
+        A method to call when a notification is evicted from the cache of sent
+        notifications because of the ``cache_size`` or ``cache_ttl`` limits
+
+        The method must take the notification identifier as a single argument. Any
+        callbacks set on the notification itself will no longer be called after the
+        notification was evicted.
+        """
+        return self._backend.on_evicted
+
+    @on_evicted.setter
+    def on_evicted(self, handler: Callable[[str], Any] | None) -> None:
+        self._backend.on_evicted = handler
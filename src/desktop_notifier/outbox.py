@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+This module defines a durable outbox which keeps notifications that could not be
+delivered because the notification server was unavailable.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from .common import Attachment, Button, Icon, Notification, ReplyField, Sound, Urgency
+
+__all__ = ["Outbox", "OutboxInfo"]
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    identifier TEXT NOT NULL UNIQUE,
+    created REAL NOT NULL,
+    data TEXT NOT NULL
+)
+"""
+
+
+@dataclass(frozen=True)
+class OutboxInfo:
+    """Statistics of an outbox"""
+
+    size: int
+    """Number of notifications waiting to be delivered"""
+
+    max_size: int
+    """Maximum number of notifications to keep"""
+
+    max_age: float
+    """Maximum time in seconds to keep a notification"""
+
+    delivered: int
+    """Number of notifications delivered from the outbox"""
+
+    dropped: int
+    """Number of notifications dropped because the outbox was full"""
+
+    expired: int
+    """Number of notifications dropped because they exceeded the maximum age"""
+
+
+class Outbox:
+    """
+    A bounded store on disk for notifications which could not be delivered
+
+    Notifications are kept in a SQLite database in the order in which they were added.
+    Additions are buffered and written in a single transaction per iteration of the
+    event loop. When the outbox is full, the oldest notifications are dropped, and
+    notifications older than ``max_age`` are dropped instead of being delivered.
+
+    Callbacks cannot be stored on disk. Notifications which were added by the running
+    process keep their callbacks, those restored from a previous run are handled by
+    the handlers of the :class:`desktop_notifier.DesktopNotifier` only. Each notifier
+    needs its own outbox file.
+
+    :param path: Path of the database file. It is created if it does not exist.
+    :param max_size: Maximum number of notifications to keep.
+    :param max_age: Maximum time in seconds to keep a notification. This is measured
+        in wall clock time so that it applies across restarts.
+    :param on_drop: Called with the identifier of every notification which is dropped
+        because the outbox is full or because it exceeded the maximum age, and whether
+        it expired. Not called for notifications which are removed explicitly.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        max_size: int = 1000,
+        max_age: float = 3600.0,
+        on_drop: Callable[[str, bool], Any] | None = None,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if max_age <= 0:
+            raise ValueError("max_age must be positive")
+
+        self.path = Path(path)
+        self.max_size = max_size
+        self.max_age = max_age
+        self.on_drop = on_drop
+
+        self.delivered_count = 0
+        self.dropped_count = 0
+        self.expired_count = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(SCHEMA)
+        self._db.commit()
+
+        self._size = self._count()
+        self._buffer: list[tuple[str, float, str]] = []
+        self._flush_scheduled = False
+        self._notifications: dict[str, Notification] = {}
+
+    def __len__(self) -> int:
+        return self._size + len(self._buffer)
+
+    def info(self) -> OutboxInfo:
+        """Returns statistics of the outbox"""
+        return OutboxInfo(
+            size=len(self),
+            max_size=self.max_size,
+            max_age=self.max_age,
+            delivered=self.delivered_count,
+            dropped=self.dropped_count,
+            expired=self.expired_count,
+        )
+
+    def put(self, notification: Notification) -> None:
+        """
+        Adds a notification to the outbox. The notification is written to disk with
+        other notifications added in the same iteration of the event loop.
+
+        :param notification: Notification to deliver later.
+        """
+        data = json.dumps(to_dict(notification))
+        self._buffer.append((notification.identifier, time.time(), data))
+        self._notifications[notification.identifier] = notification
+
+        if self._flush_scheduled:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+        else:
+            self._flush_scheduled = True
+            loop.call_soon(self.flush)
+
+    def peek(self) -> Notification | None:
+        """
+        Returns the oldest notification in the outbox without removing it, after
+        dropping notifications which exceeded the maximum age.
+        """
+        self.flush()
+
+        row = self._db.execute(
+            "SELECT identifier, data FROM outbox ORDER BY seq LIMIT 1"
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        identifier, data = row
+        notification = self._notifications.get(identifier)
+
+        if notification is None:
+            notification = from_dict(json.loads(data))
+
+        return notification
+
+    def remove(self, identifier: str, delivered: bool = True) -> None:
+        """
+        Removes a notification from the outbox.
+
+        :param identifier: Identifier of the notification.
+        :param delivered: Whether the notification was delivered, for statistics.
+        """
+        self.flush()
+
+        with self._db:
+            cursor = self._db.execute(
+                "DELETE FROM outbox WHERE identifier = ?", (identifier,)
+            )
+
+        self._notifications.pop(identifier, None)
+        self._size -= cursor.rowcount
+
+        if delivered and cursor.rowcount:
+            self.delivered_count += 1
+
+    def flush(self) -> None:
+        """Writes buffered notifications to disk and enforces the size and age limits"""
+        self._flush_scheduled = False
+        buffer, self._buffer = self._buffer, []
+
+        expired: list[str] = []
+        overflowed: list[str] = []
+
+        with self._db:
+            if buffer:
+                # Replace an older entry for the same notification, its content may
+                # have changed.
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO outbox (identifier, created, data) "
+                    "VALUES (?, ?, ?)",
+                    buffer,
+                )
+                self._size = self._count()
+
+            deadline = time.time() - self.max_age
+            rows = self._db.execute(
+                "SELECT identifier FROM outbox WHERE created < ?", (deadline,)
+            )
+            expired = [identifier for identifier, in rows]
+            if expired:
+                self._db.execute("DELETE FROM outbox WHERE created < ?", (deadline,))
+                logger.debug("Expired %s notifications in outbox", len(expired))
+                self.expired_count += len(expired)
+
+            overflow = self._size - len(expired) - self.max_size
+            if overflow > 0:
+                rows = self._db.execute(
+                    "SELECT identifier FROM outbox ORDER BY seq LIMIT ?", (overflow,)
+                )
+                overflowed = [identifier for identifier, in rows]
+                self._db.execute(
+                    "DELETE FROM outbox WHERE seq IN "
+                    "(SELECT seq FROM outbox ORDER BY seq LIMIT ?)",
+                    (overflow,),
+                )
+                logger.warning("Outbox full, dropped %s notifications", overflow)
+                self.dropped_count += overflow
+
+        if expired or overflowed:
+            self._size -= len(expired) + len(overflowed)
+            # Forget the callbacks of dropped notifications.
+            rows = self._db.execute("SELECT identifier FROM outbox")
+            identifiers = {identifier for identifier, in rows}
+            self._notifications = {
+                i: n for i, n in self._notifications.items() if i in identifiers
+            }
+
+            if self.on_drop:
+                for identifier in expired:
+                    self.on_drop(identifier, True)
+                for identifier in overflowed:
+                    self.on_drop(identifier, False)
+
+    def close(self) -> None:
+        """Writes buffered notifications to disk and closes the database"""
+        self.flush()
+        self._db.close()
+
+    def _count(self) -> int:
+        count: int = self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+        return count
+
+
+def _resource_to_dict(resource: Any) -> dict[str, str] | None:
+    if resource is None:
+        return None
+    if resource.path is not None:
+        return {"path": str(resource.path)}
+    if resource.uri is not None:
+        return {"uri": resource.uri}
+    return {"name": resource.name}
+
+
+def _resource_from_dict(cls: Any, data: dict[str, str] | None) -> Any:
+    if data is None:
+        return None
+    if "path" in data:
+        return cls(path=Path(data["path"]))
+    return cls(**data)
+
+
+def to_dict(notification: Notification) -> dict[str, Any]:
+    """
+    Returns the content of a notification as a JSON serializable dictionary, without
+    callbacks
+    """
+    reply_field = notification.reply_field
+
+    return {
+        "identifier": notification.identifier,
+        "title": notification.title,
+        "message": notification.message,
+        "urgency": notification.urgency.value,
+        "icon": _resource_to_dict(notification.icon),
+        "buttons": [
+            {"title": button.title, "identifier": button.identifier}
+            for button in notification.buttons
+        ],
+        "reply_field": (
+            {"title": reply_field.title, "button_title": reply_field.button_title}
+            if reply_field
+            else None
+        ),
+        "attachment": _resource_to_dict(notification.attachment),
+        "sound": _resource_to_dict(notification.sound),
+        "thread": notification.thread,
+        "timeout": notification.timeout,
+        "progress": notification.progress,
+    }
+
+
+def from_dict(data: dict[str, Any]) -> Notification:
+    """Creates a notification without callbacks from the output of :func:`to_dict`"""
+    reply_field = data["reply_field"]
+
+    return Notification(
+        identifier=data["identifier"],
+        title=data["title"],
+        message=data["message"],
+        urgency=Urgency(data["urgency"]),
+        icon=_resource_from_dict(Icon, data["icon"]),
+        buttons=tuple(Button(**button) for button in data["buttons"]),
+        reply_field=ReplyField(**reply_field) if reply_field else None,
+        attachment=_resource_from_dict(Attachment, data["attachment"]),
+        sound=_resource_from_dict(Sound, data["sound"]),
+        thread=data["thread"],
+        timeout=data["timeout"],
+        progress=data["progress"],
+    )
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+This module defines a scheduler which rate limits and prioritises notifications before
+they are handed to a backend.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import Any, Awaitable, Callable, Optional
+
+from .common import Notification, Urgency
+
+__all__ = ["OverflowPolicy", "SchedulerInfo", "DispatchScheduler"]
+
+logger = logging.getLogger(__name__)
+
+SendFunction = Callable[[Notification], Awaitable[bool]]
+DropFunction = Callable[[Notification], Any]
+_Entry = tuple[int, Notification, SendFunction, Optional[DropFunction]]
+
+# Urgencies from highest to lowest priority.
+PRIORITIES = (Urgency.Critical, Urgency.Normal, Urgency.Low)
+
+
+class OverflowPolicy(Enum):
+    """What to do when a notification is submitted while the queue is full"""
+
+    DROP_OLDEST = auto()
+    """Drop the notification which has been queued the longest"""
+
+    DROP_LOWEST_URGENCY = auto()
+    """Drop the oldest queued notification with the lowest urgency, or the submitted
+    notification itself if its urgency is lower than that of all queued ones"""
+
+    BLOCK = auto()
+    """Wait until there is space in the queue"""
+
+
+@dataclass(frozen=True)
+class SchedulerInfo:
+    """Statistics of a dispatch scheduler"""
+
+    queued: int
+    """Number of notifications currently waiting to be sent"""
+
+    queued_by_urgency: dict[Urgency, int]
+    """Number of notifications currently waiting to be sent, by urgency"""
+
+    sent: int
+    """Number of notifications handed to the backend"""
+
+    bypassed: int
+    """Number of critical notifications which were sent without queuing"""
+
+    dropped: int
+    """Number of notifications dropped because the queue was full"""
+
+    dropped_by_urgency: dict[Urgency, int]
+    """Number of notifications dropped because the queue was full, by urgency"""
+
+
+class DispatchScheduler:
+    """
+    Rate limits notifications with a token bucket and sends queued notifications in
+    order of their urgency
+
+    Notifications are sent as long as tokens are available. Tokens are replenished at
+    ``rate`` per second, up to ``burst`` tokens. Notifications which exceed the rate
+    are queued, with one queue per urgency, and higher urgency queues are always sent
+    first. Critical notifications bypass the queues and the rate limit by default so
+    that their latency does not depend on other traffic. They still consume a token if
+    one is available.
+
+    A scheduler can be shared between several notifiers to apply a common rate limit.
+
+    :param rate: Number of notifications to send per second on average.
+    :param burst: Maximum number of notifications to send at once after a quiet period.
+    :param max_queue_size: Maximum number of queued notifications, across urgencies.
+    :param overflow: What to do when a notification is submitted while the queue is
+        full.
+    :param critical_bypass: Whether critical notifications are sent immediately
+        instead of being queued with priority.
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: int = 10,
+        max_queue_size: int = 100,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_LOWEST_URGENCY,
+        critical_bypass: bool = True,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self.max_queue_size = max_queue_size
+        self.overflow = overflow
+        self.critical_bypass = critical_bypass
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._queues: dict[Urgency, deque[_Entry]] = {
+            urgency: deque() for urgency in PRIORITIES
+        }
+        self._sequence = 0
+        self._worker: asyncio.Task[None] | None = None
+        self._space_waiters: deque[asyncio.Future[None]] = deque()
+        self._idle_waiters: list[asyncio.Future[None]] = []
+
+        self.sent_count = 0
+        self.bypassed_count = 0
+        self.dropped_count: dict[Urgency, int] = {urgency: 0 for urgency in PRIORITIES}
+
+    def info(self) -> SchedulerInfo:
+        """Returns statistics of the scheduler"""
+        return SchedulerInfo(
+            queued=self._queue_size(),
+            queued_by_urgency={u: len(q) for u, q in self._queues.items()},
+            sent=self.sent_count,
+            bypassed=self.bypassed_count,
+            dropped=sum(self.dropped_count.values()),
+            dropped_by_urgency=dict(self.dropped_count),
+        )
+
+    async def submit(
+        self,
+        notification: Notification,
+        send: SendFunction,
+        on_dropped: DropFunction | None = None,
+    ) -> bool:
+        """
+        Submits a notification to be sent. If the rate limit allows and no other
+        notifications are queued, the notification is sent immediately. Otherwise, this
+        returns once the notification has been queued.
+
+        :param notification: Notification to send.
+        :param send: Function to call to send the notification. It returns whether the
+            notification was sent.
+        :param on_dropped: Function to call with the notification if it is dropped
+            because the queue is full, also after it was queued.
+        :returns: Whether the notification was accepted. ``False`` if it was dropped
+            because the queue was full, or if it was sent immediately and sending
+            failed.
+        """
+        if self.critical_bypass and notification.urgency is Urgency.Critical:
+            self._take_token()
+            self.bypassed_count += 1
+            self.sent_count += 1
+            return await send(notification)
+
+        if self._queue_size() == 0 and self._take_token():
+            self.sent_count += 1
+            return await send(notification)
+
+        while self._queue_size() >= self.max_queue_size:
+            if self.overflow is OverflowPolicy.BLOCK:
+                waiter = asyncio.get_running_loop().create_future()
+                self._space_waiters.append(waiter)
+                await waiter
+            elif not self._drop_for(notification):
+                self._dropped(notification, on_dropped)
+                return False
+
+        self._sequence += 1
+        self._queues[notification.urgency].append(
+            (self._sequence, notification, send, on_dropped)
+        )
+
+        if not self._worker:
+            self._worker = asyncio.create_task(self._run())
+
+        return True
+
+    async def join(self) -> None:
+        """Waits until all queued notifications have been sent"""
+        if self._worker:
+            waiter = asyncio.get_running_loop().create_future()
+            self._idle_waiters.append(waiter)
+            await waiter
+
+    def discard(self, send: SendFunction) -> int:
+        """
+        Removes queued notifications which would be sent with the given function, for
+        instance when the notifier which submitted them is closed. Notifications of
+        other notifiers which share the scheduler stay queued.
+
+        :param send: Function which was passed to :meth:`submit`.
+        :returns: Number of discarded notifications.
+        """
+        discarded = 0
+
+        for urgency, queue in self._queues.items():
+            kept = deque(entry for entry in queue if entry[2] != send)
+            discarded += len(queue) - len(kept)
+            self._queues[urgency] = kept
+
+        # Wake up submitters which are blocked on a full queue.
+        while discarded and self._space_waiters:
+            waiter = self._space_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+        if discarded:
+            logger.debug("Discarded %s queued notifications", discarded)
+
+        return discarded
+
+    def _queue_size(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _drop_for(self, notification: Notification) -> bool:
+        """
+        Drops a queued notification to make space for the given one according to the
+        overflow policy. Returns ``False`` if the given notification should be dropped
+        instead.
+        """
+        queues = [self._queues[u] for u in PRIORITIES if self._queues[u]]
+
+        if self.overflow is OverflowPolicy.DROP_OLDEST:
+            queue = min(queues, key=lambda q: q[0][0])
+        else:
+            lowest = [u for u in PRIORITIES if self._queues[u]][-1]
+            if PRIORITIES.index(notification.urgency) > PRIORITIES.index(lowest):
+                return False
+            queue = self._queues[lowest]
+
+        _, dropped, _, on_dropped = queue.popleft()
+        self._dropped(dropped, on_dropped)
+        return True
+
+    def _dropped(
+        self, notification: Notification, on_dropped: DropFunction | None
+    ) -> None:
+        self.dropped_count[notification.urgency] += 1
+        logger.warning("Notification dropped, queue is full: %s", notification)
+
+        if on_dropped:
+            on_dropped(notification)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take_token(self) -> bool:
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def _run(self) -> None:
+        try:
+            while self._queue_size() > 0:
+                if not self._take_token():
+                    # Sleep until the next token is available. Critical notifications
+                    # which bypass the queue may take it in the meantime.
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    continue
+
+                # Pick the queue only now, a more urgent notification may have been
+                # submitted while waiting for a token.
+                queue = next(self._queues[u] for u in PRIORITIES if self._queues[u])
+                _, notification, send, _ = queue.popleft()
+
+                # Wake up the next submitter which is blocked on a full queue.
+                while self._space_waiters:
+                    waiter = self._space_waiters.popleft()
+                    if not waiter.done():
+                        waiter.set_result(None)
+                        break
+
+                self.sent_count += 1
+                await send(notification)
+        finally:
+            self._worker = None
+            for waiter in self._idle_waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+            self._idle_waiters.clear()
@@ -5,19 +5,25 @@ Synchronous desktop notification API
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Callable, Coroutine, Sequence, TypeVar
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine, Iterable, Sequence, TypeVar
 
+from .cache import CacheInfo
 from .common import (
-    DEFAULT_ICON,
+    DEFAULT_ICON_PLACEHOLDER,
     Attachment,
     Button,
     Capability,
     Icon,
     Notification,
     ReplyField,
+    SendResult,
     Sound,
     Urgency,
 )
+from .dispatch import CallbackDispatcher, DispatchInfo
+from .events import NotificationEvent
 from .main import DesktopNotifier
 
 __all__ = ["DesktopNotifierSync"]
@@ -30,23 +36,66 @@ class DesktopNotifierSync:
     """
     A synchronous counterpart to :class:`desktop_notifier.main.DesktopNotifier`
 
+    By default, the notifier runs its event loop only for the duration of each call.
+    With ``background=True``, the loop instead runs in a daemon thread which is owned by
+    the notifier. Calls are then handed to that thread and may be made from any number
+    of threads concurrently, :meth:`send_nowait` sends without waiting, and callbacks
+    are called in the loop thread as interactions happen. Blocking calls must not be
+    made from callbacks in this mode.
+
     .. warning::
         Callbacks on interaction with the notification will not work on macOS or Linux
-        without a running event loop.
+        without a running event loop. On macOS, callbacks also require the run loop of
+        the main thread and are therefore not called in the background mode either.
+
+    :param background: Whether to run the event loop in a background thread.
     """
 
     def __init__(
         self,
         app_name: str = "Python",
-        app_icon: Icon | None = DEFAULT_ICON,
+        app_icon: Icon | None = DEFAULT_ICON_PLACEHOLDER,
         notification_limit: int | None = None,
+        cache_size: int | None = None,
+        cache_ttl: float | None = None,
+        interactive: bool = True,
+        dispatcher: CallbackDispatcher | None = None,
+        background: bool = False,
     ) -> None:
-        self._async_api = DesktopNotifier(app_name, app_icon)
+        self._async_api = DesktopNotifier(
+            app_name,
+            app_icon,
+            cache_size=cache_size,
+            cache_ttl=cache_ttl,
+            interactive=interactive,
+            dispatcher=dispatcher,
+        )
         self._loop = asyncio.new_event_loop()
+        self._thread: threading.Thread | None = None
+
+        if background:
+            self._thread = threading.Thread(
+                target=self._run_loop, name="desktop-notifier-loop", daemon=True
+            )
+            self._thread.start()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
 
     def _run_coro_sync(self, coro: Coroutine[None, None, T]) -> T:
         # Make sure to always use the same loop because async queues, future, etc. are
         # always bound to a loop.
+        if self._thread:
+            if threading.current_thread() is self._thread:
+                coro.close()
+                raise RuntimeError(
+                    "Blocking calls cannot be made from the event loop thread of the "
+                    "notifier, use send_nowait() instead"
+                )
+            # The loop may not have started yet, the call is handed over regardless.
+            return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
         if self._loop.is_running():
             future = asyncio.run_coroutine_threadsafe(coro, self._loop)
             res = future.result()
@@ -55,6 +104,27 @@ class DesktopNotifierSync:
 
         return res
 
+    def _call_sync(self, func: Callable[[], T]) -> T:
+        # In the background mode, state is changed by the loop thread. Read it there
+        # instead of from a state which may be half updated.
+        if (
+            not self._thread
+            or threading.current_thread() is self._thread
+            or self._loop.is_closed()
+        ):
+            return func()
+
+        future: Future[T] = Future()
+
+        def call() -> None:
+            try:
+                future.set_result(func())
+            except Exception as exc:
+                future.set_exception(exc)
+
+        self._loop.call_soon_threadsafe(call)
+        return future.result()
+
     @property
     def app_name(self) -> str:
         """The application name"""
@@ -80,6 +150,30 @@ class DesktopNotifierSync:
         coro = self._async_api.send_notification(notification)
         return self._run_coro_sync(coro)
 
+    def send_nowait(self, notification: Notification) -> Future[str]:
+        """
+        Hands a notification to the event loop thread to be sent, see
+        :meth:`desktop_notifier.main.DesktopNotifier.send_notification`. This may be
+        called from any thread, including from callbacks.
+
+        :param notification: The notification to send.
+        :returns: A future which resolves to the identifier of the notification once it
+            has been sent.
+        :raises RuntimeError: if the notifier was not created with ``background=True``.
+        """
+        if self._thread is None:
+            raise RuntimeError("send_nowait() requires a notifier with background=True")
+
+        coro = self._async_api.send_notification(notification)
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def send_and_wait(
+        self, notification: Notification, timeout: float | None = None
+    ) -> NotificationEvent:
+        """See :meth:`desktop_notifier.main.DesktopNotifier.send_and_wait`"""
+        coro = self._async_api.send_and_wait(notification, timeout)
+        return self._run_coro_sync(coro)
+
     def send(
         self,
         title: str,
@@ -94,6 +188,7 @@ class DesktopNotifierSync:
         sound: Sound | None = None,
         thread: str | None = None,
         timeout: int = -1,  # in seconds
+        progress: int | None = None,
     ) -> str:
         """See :meth:`desktop_notifier.main.DesktopNotifier.send`"""
         notification = Notification(
@@ -109,10 +204,23 @@ class DesktopNotifierSync:
             sound=sound,
             thread=thread,
             timeout=timeout,
+            progress=progress,
         )
         coro = self._async_api.send_notification(notification)
         return self._run_coro_sync(coro)
 
+    def send_many(
+        self, notifications: Iterable[Notification], max_in_flight: int = 16
+    ) -> list[SendResult]:
+        """See :meth:`desktop_notifier.main.DesktopNotifier.send_many`"""
+        coro = self._async_api.send_many(notifications, max_in_flight)
+        return self._run_coro_sync(coro)
+
+    def update(self, identifier: str, /, **changes: Any) -> None:
+        """See :meth:`desktop_notifier.main.DesktopNotifier.update`"""
+        coro = self._async_api.update(identifier, **changes)
+        return self._run_coro_sync(coro)
+
     def get_current_notifications(self) -> list[str]:
         """See :meth:`desktop_notifier.main.DesktopNotifier.get_current_notifications`"""
         coro = self._async_api.get_current_notifications()
@@ -128,7 +236,45 @@ class DesktopNotifierSync:
         coro = self._async_api.clear_all()
         return self._run_coro_sync(coro)
 
+    def cache_info(self) -> CacheInfo:
+        """See :meth:`desktop_notifier.main.DesktopNotifier.cache_info`"""
+        return self._call_sync(self._async_api.cache_info)
+
+    def dispatch_info(self) -> DispatchInfo:
+        """See :meth:`desktop_notifier.main.DesktopNotifier.dispatch_info`"""
+        return self._call_sync(self._async_api.dispatch_info)
+
     def get_capabilities(self) -> frozenset[Capability]:
         """See :meth:`desktop_notifier.main.DesktopNotifier.get_capabilities`"""
         coro = self._async_api.get_capabilities()
         return self._run_coro_sync(coro)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """See :meth:`desktop_notifier.main.DesktopNotifier.flush`"""
+        coro = self._async_api.flush(timeout)
+        return self._run_coro_sync(coro)
+
+    def close(self) -> None:
+        """
+        Shuts down the notifier as described in
+        :meth:`desktop_notifier.main.DesktopNotifier.aclose` and closes its event loop.
+        In the background mode, the loop thread is stopped. The notifier cannot be used
+        after closing.
+        """
+        if self._loop.is_closed():
+            return
+
+        self._run_coro_sync(self._async_api.aclose())
+        self._run_coro_sync(self._loop.shutdown_asyncgens())
+
+        if self._thread:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+        self._loop.close()
+
+    def __enter__(self) -> DesktopNotifierSync:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
@@ -0,0 +1,341 @@
+"""
+A stand-in org.freedesktop.Notifications server for tests and benchmarks
+
+The server runs on a private ``dbus-daemon --session`` and exports the notification
+interface with dbus_fast. It allows exercising the Linux backend against a real bus
+connection without a desktop session.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+from dbus_fast.aio.message_bus import MessageBus
+from dbus_fast.service import ServiceInterface, method, signal
+
+__all__ = [
+    "DEFAULT_CAPABILITIES",
+    "ReceivedNotification",
+    "NotificationsInterface",
+    "LegacyNotificationsInterface",
+    "NotificationServer",
+    "dbus_daemon_available",
+]
+
+DEFAULT_CAPABILITIES = ("actions", "body", "body-markup", "icon-static", "sound")
+
+NOTIFICATION_CLOSED_PROGRAMMATICALLY = 3
+
+
+def dbus_daemon_available() -> bool:
+    """Returns whether a private session bus can be started"""
+    return shutil.which("dbus-daemon") is not None
+
+
+@dataclass(frozen=True)
+class ReceivedNotification:
+    """A notification as received by the stand-in server"""
+
+    platform_id: int
+    app_name: str
+    replaces_id: int
+    app_icon: str
+    summary: str
+    body: str
+    actions: list[str]
+    hints: dict[str, Any]
+    expire_timeout: int
+
+
+class NotificationsInterface(ServiceInterface):
+    """
+    Implementation of the org.freedesktop.Notifications interface
+
+    :param capabilities: Capabilities returned by GetCapabilities.
+    :param latency: Time in seconds to wait before replying to Notify calls.
+    """
+
+    def __init__(
+        self, capabilities: Sequence[str] = DEFAULT_CAPABILITIES, latency: float = 0.0
+    ) -> None:
+        super().__init__("org.freedesktop.Notifications")
+        self.capabilities = list(capabilities)
+        self.latency = latency
+        self.server_information = ["desktop-notifier", "test", "1.0", "1.2"]
+        self.notifications: dict[int, ReceivedNotification] = {}
+        self.notify_count = 0
+        self._last_id = 0
+
+    def _notify(
+        self,
+        app_name: str,
+        replaces_id: int,
+        app_icon: str,
+        summary: str,
+        body: str,
+        actions: list[str],
+        hints: dict[str, Any],
+        expire_timeout: int,
+    ) -> int:
+        self.notify_count += 1
+
+        if replaces_id in self.notifications:
+            platform_id = replaces_id
+        else:
+            self._last_id += 1
+            platform_id = self._last_id
+
+        self.notifications[platform_id] = ReceivedNotification(
+            platform_id,
+            app_name,
+            replaces_id,
+            app_icon,
+            summary,
+            body,
+            actions,
+            hints,
+            expire_timeout,
+        )
+        return platform_id
+
+    @method()
+    async def Notify(
+        self,
+        app_name: "s",
+        replaces_id: "u",
+        app_icon: "s",
+        summary: "s",
+        body: "s",
+        actions: "as",
+        hints: "a{sv}",
+        expire_timeout: "i",
+    ) -> "u":
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+        return self._notify(
+            app_name,
+            replaces_id,
+            app_icon,
+            summary,
+            body,
+            actions,
+            {k: v.value for k, v in hints.items()},
+            expire_timeout,
+        )
+
+    @method()
+    def CloseNotification(self, id: "u") -> "":
+        self.close(id, NOTIFICATION_CLOSED_PROGRAMMATICALLY)
+
+    @method()
+    def GetCapabilities(self) -> "as":
+        return self.capabilities
+
+    @method()
+    def GetServerInformation(self) -> "ssss":
+        return self.server_information
+
+    @signal()
+    def NotificationClosed(self, id: int, reason: int) -> "uu":
+        return [id, reason]
+
+    @signal()
+    def ActionInvoked(self, id: int, action_key: str) -> "us":
+        return [id, action_key]
+
+    def close(self, platform_id: int, reason: int) -> None:
+        """Closes a notification and emits the NotificationClosed signal"""
+        if self.notifications.pop(platform_id, None):
+            self.NotificationClosed(platform_id, reason)
+
+    def invoke_action(self, platform_id: int, action_key: str) -> None:
+        """Emits the ActionInvoked signal for a notification"""
+        self.ActionInvoked(platform_id, action_key)
+
+
+class LegacyNotificationsInterface(NotificationsInterface):
+    """
+    Notification server which expects hints as 'a{ss}' instead of 'a{sv}'
+
+    This mimics older servers such as the one shipped with Ubuntu 20.04.
+    """
+
+    def __init__(
+        self, capabilities: Sequence[str] = DEFAULT_CAPABILITIES, latency: float = 0.0
+    ) -> None:
+        super().__init__(capabilities, latency)
+        self.server_information = ["desktop-notifier-legacy", "test", "1.0", "1.2"]
+
+    @method()
+    async def Notify(
+        self,
+        app_name: "s",
+        replaces_id: "u",
+        app_icon: "s",
+        summary: "s",
+        body: "s",
+        actions: "as",
+        hints: "a{ss}",
+        expire_timeout: "i",
+    ) -> "u":
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+        return self._notify(
+            app_name,
+            replaces_id,
+            app_icon,
+            summary,
+            body,
+            actions,
+            hints,
+            expire_timeout,
+        )
+
+
+class NotificationServer:
+    """
+    Runs a stand-in notification server on a private session bus
+
+    The bus daemon is started as a subprocess and the server is exported from a
+    background thread with its own event loop. Clients connect to it through
+    :attr:`address`, for instance by setting ``DBUS_SESSION_BUS_ADDRESS``.
+
+    :param capabilities: Capabilities returned by GetCapabilities.
+    :param latency: Time in seconds to wait before replying to Notify calls.
+    :param legacy_hints: Whether to expect hints with the legacy 'a{ss}' signature.
+    """
+
+    def __init__(
+        self,
+        capabilities: Sequence[str] = DEFAULT_CAPABILITIES,
+        latency: float = 0.0,
+        legacy_hints: bool = False,
+    ) -> None:
+        interface_class = (
+            LegacyNotificationsInterface if legacy_hints else NotificationsInterface
+        )
+        self.interface = interface_class(capabilities, latency)
+        self.address = ""
+
+        self._daemon: subprocess.Popen[str] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._bus: MessageBus | None = None
+
+    def __enter__(self) -> NotificationServer:
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    @property
+    def notifications(self) -> dict[int, ReceivedNotification]:
+        """Notifications which are currently shown, by platform ID"""
+        return dict(self.interface.notifications)
+
+    def start(self) -> None:
+        """Starts the bus daemon and exports the notification server"""
+        self._daemon = subprocess.Popen(
+            ["dbus-daemon", "--session", "--nofork", "--nopidfile", "--print-address"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        assert self._daemon.stdout
+        self.address = self._daemon.stdout.readline().strip()
+
+        if not self.address:
+            self._daemon.wait()
+            raise RuntimeError("Could not start dbus-daemon")
+
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run, args=(ready,), name="NotificationServer", daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+
+        if not self._bus:
+            self.stop()
+            raise RuntimeError("Could not export notification server")
+
+    def stop(self) -> None:
+        """Stops the notification server and the bus daemon"""
+        if self._loop and self._thread:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+        if self._daemon:
+            self._daemon.terminate()
+            self._daemon.wait()
+            if self._daemon.stdout:
+                self._daemon.stdout.close()
+            self._daemon = None
+
+    def restart(self) -> None:
+        """
+        Replaces the notification server with a new instance on a new connection to the
+        same bus, as if it crashed and was started again
+        """
+        assert self._loop
+        asyncio.run_coroutine_threadsafe(self._restart(), self._loop).result()
+
+    def invoke_action(self, platform_id: int, action_key: str) -> None:
+        """Emits the ActionInvoked signal for a notification, thread-safe"""
+        self._call_soon(self.interface.invoke_action, platform_id, action_key)
+
+    def close(self, platform_id: int, reason: int) -> None:
+        """Closes a notification with the given reason, thread-safe"""
+        self._call_soon(self.interface.close, platform_id, reason)
+
+    def _call_soon(self, func: Any, *args: Any) -> None:
+        assert self._loop
+        self._loop.call_soon_threadsafe(func, *args)
+
+    def _run(self, ready: threading.Event) -> None:
+        assert self._loop
+        asyncio.set_event_loop(self._loop)
+
+        try:
+            self._loop.run_until_complete(self._export())
+        except Exception:
+            ready.set()
+            return
+
+        ready.set()
+        self._loop.run_forever()
+
+        if self._bus:
+            # Unexport first so that the interface does not emit signals on the closed
+            # connection when the server is started again.
+            self._bus.unexport("/org/freedesktop/Notifications", self.interface)
+            self._bus.disconnect()
+            self._bus = None
+
+    async def _restart(self) -> None:
+        if self._bus:
+            self._bus.unexport("/org/freedesktop/Notifications", self.interface)
+            self._bus.disconnect()
+            self._bus = None
+
+        interface = self.interface
+        self.interface = type(interface)(interface.capabilities, interface.latency)
+        await self._export()
+
+    async def _export(self) -> None:
+        bus = await MessageBus(bus_address=self.address).connect()
+        bus.export("/org/freedesktop/Notifications", self.interface)
+        await bus.request_name("org.freedesktop.Notifications")
+        self._bus = bus
@@ -1,20 +1,92 @@
 from __future__ import annotations
 
 import asyncio
+import os
 import platform
 import time
-from typing import AsyncGenerator, Generator
+from typing import Any, AsyncGenerator, Generator
 
 import pytest
 import pytest_asyncio
 
-from desktop_notifier import DesktopNotifier, DesktopNotifierSync
+from desktop_notifier import DesktopNotifier, DesktopNotifierSync, Notification
+from desktop_notifier.backends.dummy import DummyNotificationCenter
 
 if platform.system() == "Darwin":
     from rubicon.objc.eventloop import EventLoopPolicy
 
     asyncio.set_event_loop_policy(EventLoopPolicy())
 
+if platform.system() == "Linux":
+    from .backends.dbus_server import NotificationServer, dbus_daemon_available
+
+
+class Clock:
+    """A fake clock to patch time.monotonic with, advanced by setting :attr:`now`"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class UnavailableNotificationCenter(DummyNotificationCenter):
+    """A backend whose notification server is unavailable until :attr:`available`"""
+
+    def __init__(self, app_name: str) -> None:
+        super().__init__(app_name)
+        self.available = False
+        self.sent: list[Notification] = []
+
+    async def _send(self, notification: Notification) -> None:
+        await super()._send(notification)
+        if not self.available:
+            raise ConnectionRefusedError("No notification server")
+        self.sent.append(notification)
+
+
+def needs_notification_server() -> bool:
+    """
+    Whether tests must provide their own notification server because there is no
+    session bus to connect to, e.g., on a headless build machine.
+    """
+    return (
+        platform.system() == "Linux"
+        and "DBUS_SESSION_BUS_ADDRESS" not in os.environ
+        and "DISPLAY" not in os.environ
+        and dbus_daemon_available()
+    )
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keeps caches written by the tests, such as the introspection cache, per test"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def session_notification_server() -> Generator[Any]:
+    """Runs a stand-in notification server on a private bus if required"""
+    if not needs_notification_server():
+        yield None
+        return
+
+    with NotificationServer() as server:
+        os.environ["DBUS_SESSION_BUS_ADDRESS"] = server.address
+        try:
+            yield server
+        finally:
+            del os.environ["DBUS_SESSION_BUS_ADDRESS"]
+
+
+@pytest.fixture
+def notification_server(session_notification_server: Any) -> Any:
+    """The stand-in notification server, tests are skipped if it is not running"""
+    if session_notification_server is None:
+        pytest.skip("Requires the stand-in notification server")
+    return session_notification_server
+
 
 @pytest_asyncio.fixture
 async def notifier() -> AsyncGenerator[DesktopNotifier]:
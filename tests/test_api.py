@@ -9,12 +9,16 @@ from desktop_notifier import (
     DEFAULT_SOUND,
     Attachment,
     Button,
+    Capability,
     DesktopNotifier,
+    DispatchScheduler,
     Icon,
+    Notification,
     ReplyField,
     Sound,
     Urgency,
 )
+from desktop_notifier.backends.dummy import DummyNotificationCenter
 
 
 async def wait_for_notifications(
@@ -169,3 +173,196 @@ async def test_clear_all(notifier: DesktopNotifier) -> None:
 
     await notifier.clear_all()
     assert len(await notifier.get_current_notifications()) == 0
+
+
+@pytest.mark.asyncio
+async def test_send_many(notifier: DesktopNotifier) -> None:
+    notifications = [
+        Notification(title="Julius Caesar", message=f"Et tu, Brute? ({i})")
+        for i in range(5)
+    ]
+    results = await notifier.send_many(notifications, max_in_flight=2)
+
+    assert [r.identifier for r in results] == [n.identifier for n in notifications]
+    assert all(r.ok for r in results)
+
+    await wait_for_notifications(notifier, 5)
+
+
+class SlowNotificationCenter(DummyNotificationCenter):
+    def __init__(self, app_name: str) -> None:
+        super().__init__(app_name)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _send(self, notification: Notification) -> None:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if notification.message == "fail":
+            raise RuntimeError("Notification server unavailable")
+
+
+@pytest.mark.asyncio
+async def test_send_many_bounded(notifier: DesktopNotifier) -> None:
+    backend = SlowNotificationCenter(notifier.app_name)
+    notifier._backend = backend
+
+    notifications = [
+        Notification(title="Julius Caesar", message="fail" if i == 3 else "Et tu?")
+        for i in range(20)
+    ]
+    results = await notifier.send_many(notifications, max_in_flight=4)
+
+    assert backend.max_in_flight == 4
+    assert [r.identifier for r in results] == [n.identifier for n in notifications]
+    assert [r.ok for r in results] == [i != 3 for i in range(20)]
+    assert isinstance(results[3].error, RuntimeError)
+
+    current_notifications = await notifier.get_current_notifications()
+    assert notifications[3].identifier not in current_notifications
+    assert len(current_notifications) == 19
+
+
+def make_slow_notifier(scheduler: DispatchScheduler) -> DesktopNotifier:
+    notifier = DesktopNotifier(scheduler=scheduler)
+    notifier._did_request_authorisation = True
+    notifier._backend = SlowNotificationCenter(notifier.app_name)
+    return notifier
+
+
+@pytest.mark.asyncio
+async def test_flush() -> None:
+    notifier = make_slow_notifier(DispatchScheduler(rate=20, burst=1))
+
+    for i in range(5):
+        await notifier.send(title="Julius Caesar", message=str(i))
+
+    assert not await notifier.flush(timeout=0.001)
+    assert await notifier.flush(timeout=2)
+    assert len(await notifier.get_current_notifications()) == 5
+
+
+@pytest.mark.asyncio
+async def test_aclose() -> None:
+    scheduler = DispatchScheduler(rate=1, burst=1)
+    other = DesktopNotifier(scheduler=scheduler)
+    other._did_request_authorisation = True
+    other._backend = DummyNotificationCenter(other.app_name)
+
+    async with make_slow_notifier(scheduler) as notifier:
+        in_flight = asyncio.create_task(
+            notifier.send(title="Julius Caesar", message="Et tu, Brute?")
+        )
+        await asyncio.sleep(0)
+
+        for i in range(3):
+            await notifier.send(title="Julius Caesar", message=str(i))
+        await other.send(title="Brutus", message="")
+
+    # The send in flight completed, queued notifications of other notifiers are kept.
+    assert in_flight.done()
+    assert len(await notifier.get_current_notifications()) == 1
+    assert scheduler.info().queued == 1
+
+
+class CountingNotificationCenter(DummyNotificationCenter):
+    def __init__(self, app_name: str) -> None:
+        super().__init__(app_name)
+        self.authorisation_requests = 0
+        self.capability_requests = 0
+
+    async def request_authorisation(self) -> bool:
+        self.authorisation_requests += 1
+        await asyncio.sleep(0.01)
+        return True
+
+    async def get_capabilities(self) -> frozenset[Capability]:
+        self.capability_requests += 1
+        await asyncio.sleep(0.01)
+        return frozenset({Capability.TITLE, Capability.MESSAGE})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_shared() -> None:
+    notifier = DesktopNotifier()
+    backend = CountingNotificationCenter(notifier.app_name)
+    notifier._backend = backend
+
+    await asyncio.gather(
+        *(notifier.send(title="Julius Caesar", message=str(i)) for i in range(50))
+    )
+    capabilities = await asyncio.gather(
+        *(notifier.get_capabilities() for _ in range(50))
+    )
+
+    assert backend.authorisation_requests == 1
+    assert backend.capability_requests == 1
+    assert all(c == {Capability.TITLE, Capability.MESSAGE} for c in capabilities)
+    assert len(await notifier.get_current_notifications()) == 50
+
+
+@pytest.mark.asyncio
+async def test_update(notifier: DesktopNotifier) -> None:
+    identifier = await notifier.send(
+        title="Julius Caesar",
+        message="Et tu, Brute?",
+        buttons=[Button(title="Mark as read", identifier="read")],
+    )
+    await notifier.update(identifier, message="Et tu, Brute? (2)")
+
+    notification = notifier._backend._notification_cache[identifier]
+    assert notification.message == "Et tu, Brute? (2)"
+    assert notification.title == "Julius Caesar"
+    assert list(notification._buttons_dict) == ["read"]
+    assert await notifier.get_current_notifications() == [identifier]
+
+
+@pytest.mark.asyncio
+async def test_update_unknown(notifier: DesktopNotifier) -> None:
+    await notifier.update("unknown", message="Et tu, Brute?")
+    assert await notifier.get_current_notifications() == []
+
+    with pytest.raises(ValueError):
+        await notifier.update("unknown", identifier="other")
+
+
+@pytest.mark.asyncio
+async def test_progress_coalesced(notifier: DesktopNotifier) -> None:
+    backend = DummyNotificationCenter(notifier.app_name)
+    notifier._backend = backend
+    notifier.progress_rate = 20
+
+    identifier = await notifier.send(title="Download", message="", progress=0)
+
+    t0 = time.monotonic()
+    for i in range(1, 1001):
+        await notifier.progress(identifier, i // 10)
+        await asyncio.sleep(0.0002)
+    elapsed = time.monotonic() - t0
+
+    notification = backend._notification_cache[identifier]
+    assert notification.progress == 100
+    assert backend.call_counts["send"] == 1
+    assert 2 <= backend.call_counts["replace"] <= 2 + elapsed * notifier.progress_rate
+    assert notifier._progress_tasks == {}
+
+
+@pytest.mark.asyncio
+async def test_progress_sends_latest_value(notifier: DesktopNotifier) -> None:
+    backend = DummyNotificationCenter(notifier.app_name)
+    notifier._backend = backend
+
+    identifier = await notifier.send(title="Download", message="", progress=0)
+
+    for value in (10, 20, 30):
+        await notifier.progress(identifier, value)
+
+    await asyncio.sleep(0.2)
+
+    assert backend._notification_cache[identifier].progress == 30
+    assert backend.call_counts["replace"] == 1
+
+    with pytest.raises(ValueError):
+        await notifier.progress(identifier, 101)
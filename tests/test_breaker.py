@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from desktop_notifier import BreakerState, DesktopNotifier, Notification
+from desktop_notifier.backends.dummy import DummyNotificationCenter
+from desktop_notifier.breaker import CircuitBreaker, CircuitOpenError
+
+from .conftest import Clock, UnavailableNotificationCenter
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr("desktop_notifier.breaker.time.monotonic", clock)
+    return clock
+
+
+def test_backoff(clock: Clock) -> None:
+    breaker = CircuitBreaker(failure_threshold=2, base_delay=1, max_delay=3)
+
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+
+    assert breaker.state is BreakerState.Open
+    assert not breaker.allow()
+    assert breaker.info().retry_in == 1
+
+    for delay in (2, 3, 3):
+        clock.now += breaker.delay
+        # Read the state through info(), mypy narrowed the property to Open above.
+        assert breaker.info().state is BreakerState.HalfOpen
+        # Only a single probe is allowed through.
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.delay == delay
+
+    clock.now += breaker.delay
+    assert breaker.allow()
+    breaker.record_success()
+
+    info = breaker.info()
+    assert info.state is BreakerState.Closed
+    assert info.failures == 0
+    assert info.opened == 4
+    assert info.rejected == 4
+
+
+def test_release_allows_another_probe(clock: Clock) -> None:
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_failure()
+    clock.now += breaker.delay
+
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_fail_fast_when_unavailable(
+    clock: Clock, caplog: pytest.LogCaptureFixture
+) -> None:
+    notifier = DesktopNotifier()
+    notifier._did_request_authorisation = True
+    backend = UnavailableNotificationCenter(notifier.app_name)
+    notifier._backend = backend
+
+    with caplog.at_level(logging.WARNING):
+        for i in range(1000):
+            await notifier.send(title="Julius Caesar", message=str(i))
+
+    threshold = backend._breaker.failure_threshold
+    assert backend.call_counts["send"] == threshold
+    assert len(caplog.records) == threshold + 1
+    assert await notifier.get_current_notifications() == []
+
+    info = notifier.breaker_info()
+    assert info.state is BreakerState.Open
+    assert info.rejected == 1000 - threshold
+
+    results = await notifier.send_many(
+        [Notification(title="Julius Caesar", message="") for _ in range(10)]
+    )
+    assert all(isinstance(r.error, CircuitOpenError) for r in results)
+    assert backend.call_counts["send"] == threshold
+
+    # The server appears, the next send after the delay probes and closes the breaker.
+    backend.available = True
+    clock.now += info.retry_in
+
+    for i in range(3):
+        await notifier.send(title="Julius Caesar", message=str(i))
+
+    assert notifier.breaker_info().state is BreakerState.Closed
+    assert backend.call_counts["send"] == threshold + 3
+    assert len(await notifier.get_current_notifications()) == 3
+
+
+@pytest.mark.asyncio
+async def test_notification_errors_do_not_open() -> None:
+    class FailingNotificationCenter(DummyNotificationCenter):
+        async def _send(self, notification: Notification) -> None:
+            await super()._send(notification)
+            raise ValueError("Invalid notification")
+
+    notifier = DesktopNotifier()
+    notifier._did_request_authorisation = True
+    backend = FailingNotificationCenter(notifier.app_name)
+    notifier._backend = backend
+
+    for i in range(10):
+        await notifier.send(title="Julius Caesar", message=str(i))
+
+    assert backend.call_counts["send"] == 10
+    assert notifier.breaker_info().state is BreakerState.Closed
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import pytest
+
+from desktop_notifier import DesktopNotifier, Notification
+from desktop_notifier.cache import NotificationCache
+
+
+def make_notification() -> Notification:
+    return Notification(title="Julius Caesar", message="Et tu, Brute?")
+
+
+def test_max_size_evicts_least_recently_stored() -> None:
+    on_evict = Mock()
+    cache = NotificationCache(max_size=2, on_evict=on_evict)
+    n0, n1, n2 = make_notification(), make_notification(), make_notification()
+
+    cache[n0.identifier] = n0
+    cache[n1.identifier] = n1
+    # Storing an existing entry again makes it the most recent one.
+    cache[n0.identifier] = n0
+    cache[n2.identifier] = n2
+
+    assert cache.keys() == [n0.identifier, n2.identifier]
+    on_evict.assert_called_once_with(n1.identifier, n1)
+    assert cache.info().evicted == 1
+
+
+def test_ttl_expires_entries(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr("desktop_notifier.cache.time.monotonic", lambda: now)
+
+    on_evict = Mock()
+    cache = NotificationCache(ttl=10, on_evict=on_evict)
+    n0, n1 = make_notification(), make_notification()
+
+    cache[n0.identifier] = n0
+    now += 5
+    cache[n1.identifier] = n1
+    now += 6
+
+    assert cache.get(n0.identifier) is None
+    assert cache.get(n1.identifier) is n1
+    on_evict.assert_called_once_with(n0.identifier, n0)
+
+    now += 5
+    assert len(cache) == 0
+    assert cache.info().expired == 2
+
+
+def test_pop_and_clear_do_not_evict() -> None:
+    on_evict = Mock()
+    cache = NotificationCache(max_size=10, on_evict=on_evict)
+    n0, n1 = make_notification(), make_notification()
+    cache[n0.identifier] = n0
+    cache[n1.identifier] = n1
+
+    assert cache.pop(n0.identifier) is n0
+    assert cache.pop(n0.identifier) is None
+    cache.clear()
+
+    assert len(cache) == 0
+    on_evict.assert_not_called()
+
+
+def test_lowering_max_size_evicts() -> None:
+    cache = NotificationCache()
+    notifications = [make_notification() for _ in range(5)]
+    for n in notifications:
+        cache[n.identifier] = n
+
+    cache.max_size = 2
+
+    assert cache.keys() == [n.identifier for n in notifications[3:]]
+
+
+@pytest.mark.asyncio
+async def test_notifier_cache_size(notifier: DesktopNotifier) -> None:
+    on_evicted = Mock()
+    notifier.on_evicted = on_evicted
+    notifier._backend._notification_cache.max_size = 3
+
+    identifiers = [
+        await notifier.send(title="Julius Caesar", message="Et tu, Brute?")
+        for _ in range(5)
+    ]
+
+    assert await notifier.get_current_notifications() == identifiers[2:]
+    assert [c.args[0] for c in on_evicted.call_args_list] == identifiers[:2]
+
+    info = notifier.cache_info()
+    assert info.size == 3
+    assert info.evicted == 2
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable
+from unittest.mock import Mock
+
+import pytest
+
+from desktop_notifier import DesktopNotifier, Notification, ThreadCoalescer
+from desktop_notifier.backends.dummy import DummyNotificationCenter
+
+
+def make_notifier(window: float) -> tuple[DesktopNotifier, DummyNotificationCenter]:
+    notifier = DesktopNotifier(coalescer=ThreadCoalescer(window=window))
+    notifier._did_request_authorisation = True
+    backend = DummyNotificationCenter(notifier.app_name)
+    notifier._backend = backend
+    return notifier, backend
+
+
+@pytest.mark.asyncio
+async def test_burst_is_coalesced() -> None:
+    notifier, backend = make_notifier(window=0.05)
+
+    identifiers = [
+        await notifier.send(title="Alert", message=str(i), thread="#ops")
+        for i in range(12)
+    ]
+    other = await notifier.send(title="Alert", message="", thread="#dev")
+
+    assert len(set(identifiers)) == 1
+    assert backend.call_counts["send"] == 2
+
+    await asyncio.sleep(0.2)
+
+    assert backend.call_counts["replace"] == 1
+    digest = backend._notification_cache[identifiers[0]]
+    assert digest.title == "12 new notifications in #ops"
+    assert digest.message == "Alert: 11"
+    assert set(await notifier.get_current_notifications()) == {identifiers[0], other}
+    assert notifier.coalescer and notifier.coalescer.coalesced_count == 11
+
+    # The digest was closed after a quiet window, a new burst starts a new digest.
+    identifier = await notifier.send(title="Alert", message="", thread="#ops")
+    assert identifier != identifiers[0]
+
+
+@pytest.mark.asyncio
+async def test_digest_callbacks() -> None:
+    notifier, backend = make_notifier(window=0.05)
+    on_clicked = [Mock() for _ in range(3)]
+    on_dismissed = [Mock() for _ in range(3)]
+
+    for i in range(3):
+        identifier = await notifier.send_notification(
+            Notification(
+                title="Alert",
+                message=str(i),
+                thread="#ops",
+                on_clicked=on_clicked[i],
+                on_dismissed=on_dismissed[i],
+            )
+        )
+
+    await asyncio.sleep(0.1)
+
+    digest = backend._notification_cache[identifier]
+    backend.handle_clicked(identifier, digest)
+    backend.handle_dismissed(identifier, digest)
+
+    assert [m.called for m in on_clicked] == [False, False, True]
+    assert [m.called for m in on_dismissed] == [True, True, True]
+
+
+@pytest.mark.asyncio
+async def test_digest_coroutine_callbacks() -> None:
+    notifier, backend = make_notifier(window=0.05)
+    dismissed: list[str] = []
+
+    def make_callback(i: int) -> Callable[[], Awaitable[None]]:
+        async def on_dismissed() -> None:
+            await asyncio.sleep(0)
+            dismissed.append(str(i))
+            if i == 0:
+                raise RuntimeError("Callback failed")
+
+        return on_dismissed
+
+    for i in range(3):
+        identifier = await notifier.send_notification(
+            Notification(
+                title="Alert",
+                message=str(i),
+                thread="#ops",
+                on_dismissed=make_callback(i),
+            )
+        )
+
+    await asyncio.sleep(0.1)
+
+    digest = backend._notification_cache[identifier]
+    backend.handle_dismissed(identifier, digest)
+    await backend.dispatcher.drain()
+
+    # Coroutine callbacks are awaited and a failing one does not skip the others.
+    assert dismissed == ["0", "1", "2"]
+    assert backend.dispatcher.failed_count == 1
+
+
+@pytest.mark.asyncio
+async def test_notifications_without_thread() -> None:
+    notifier, backend = make_notifier(window=0.05)
+
+    for i in range(3):
+        await notifier.send(title="Alert", message=str(i))
+
+    assert backend.call_counts["send"] == 3
+    assert len(await notifier.get_current_notifications()) == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_and_close() -> None:
+    notifier, backend = make_notifier(window=10)
+
+    for i in range(3):
+        await notifier.send(title="Alert", message=str(i), thread="#ops")
+
+    # Pending updates are sent right away instead of at the end of the window.
+    assert await notifier.flush(timeout=1)
+    assert backend.call_counts["replace"] == 1
+
+    await notifier.send(title="Alert", message="", thread="#ops")
+    await notifier.aclose()
+
+    assert backend.call_counts["replace"] == 1
+    assert notifier.coalescer and not notifier.coalescer._digests
+
+
+@pytest.mark.asyncio
+async def test_shared_coalescer() -> None:
+    coalescer = ThreadCoalescer(window=10)
+    backends = []
+
+    for app_name in ("Caesar", "Brutus"):
+        notifier = DesktopNotifier(app_name, coalescer=coalescer)
+        notifier._did_request_authorisation = True
+        backend = DummyNotificationCenter(notifier.app_name)
+        notifier._backend = backend
+        backends.append((notifier, backend))
+
+    (caesar, caesar_backend), (brutus, brutus_backend) = backends
+
+    first = await caesar.send(title="Alert", message="", thread="#ops")
+    second = await brutus.send(title="Alert", message="", thread="#ops")
+
+    # Notifications of another notifier are not merged into the digest.
+    assert first != second
+    assert caesar_backend.call_counts["send"] == 1
+    assert brutus_backend.call_counts["send"] == 1
+
+    await brutus.send(title="Alert", message="", thread="#ops")
+    await caesar.aclose()
+
+    # Closing one notifier leaves the digests of the other open.
+    assert list(coalescer._digests) == [(brutus_backend, "#ops")]
+    assert await brutus.flush(timeout=1)
+    assert brutus_backend.call_counts["replace"] == 1
+    await brutus.aclose()
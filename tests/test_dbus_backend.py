@@ -0,0 +1,688 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import json
+import os
+import platform
+import re
+import time
+from typing import Any, Callable, Generator
+from unittest.mock import Mock
+
+import pytest
+
+from desktop_notifier import (
+    BreakerState,
+    Button,
+    Capability,
+    DesktopNotifier,
+    Expired,
+    Notification,
+    Sound,
+    Urgency,
+)
+
+if platform.system() != "Linux":
+    pytest.skip("Requires the Linux backend", allow_module_level=True)
+
+from dbus_fast import Message
+from dbus_fast.aio.message_bus import MessageBus
+
+from desktop_notifier.backends.dbus import (
+    NOTIFICATION_CLOSED_DISMISSED,
+    NOTIFICATION_CLOSED_EXPIRED,
+    NOTIFICATIONS_INTROSPECTION,
+    DBusConnection,
+    DBusDesktopNotifier,
+    get_cache_path,
+    load_cached_introspection,
+)
+
+from .backends.dbus_server import NotificationServer, dbus_daemon_available
+
+
+async def wait_for(condition: Callable[[], Any], timeout_sec: float = 2.0) -> None:
+    t0 = time.monotonic()
+
+    while time.monotonic() - t0 < timeout_sec:
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+
+    raise TimeoutError("Timed out while waiting for condition")
+
+
+def platform_id(notifier: DesktopNotifier, identifier: str) -> int:
+    assert isinstance(notifier._backend, DBusDesktopNotifier)
+    return notifier._backend._platform_to_interface_notification_identifier.inverse[
+        identifier
+    ]
+
+
+def connection(notifier: DesktopNotifier) -> DBusConnection:
+    assert isinstance(notifier._backend, DBusDesktopNotifier)
+    assert notifier._backend._connection
+    return notifier._backend._connection
+
+
+@pytest.fixture
+def introspect_calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls: list[str] = []
+    introspect = MessageBus.introspect
+
+    async def counting_introspect(self: MessageBus, bus_name: str, path: str) -> Any:
+        calls.append(bus_name)
+        return await introspect(self, bus_name, path)
+
+    monkeypatch.setattr(MessageBus, "introspect", counting_introspect)
+    return calls
+
+
+@pytest.fixture
+def bus_connections(monkeypatch: pytest.MonkeyPatch) -> list[MessageBus]:
+    connections: list[MessageBus] = []
+
+    class CountingMessageBus(MessageBus):
+        async def connect(self) -> MessageBus:
+            connections.append(self)
+            return await super().connect()
+
+    monkeypatch.setattr("desktop_notifier.backends.dbus.MessageBus", CountingMessageBus)
+    return connections
+
+
+@pytest.fixture
+def legacy_notification_server(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Generator[NotificationServer]:
+    if not dbus_daemon_available():
+        pytest.skip("Requires dbus-daemon")
+
+    with NotificationServer(capabilities=["body"], legacy_hints=True) as server:
+        monkeypatch.setenv("DBUS_SESSION_BUS_ADDRESS", server.address)
+        yield server
+
+
+@pytest.fixture
+def private_notification_server(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Generator[NotificationServer]:
+    if not dbus_daemon_available():
+        pytest.skip("Requires dbus-daemon")
+
+    with NotificationServer(latency=0.01) as server:
+        monkeypatch.setenv("DBUS_SESSION_BUS_ADDRESS", server.address)
+        yield server
+
+
+@pytest.mark.asyncio
+async def test_notify_received(
+    notifier: DesktopNotifier, notification_server: NotificationServer
+) -> None:
+    identifier = await notifier.send(
+        title="Julius Caesar",
+        message="Et tu, Brute?",
+        urgency=Urgency.Critical,
+        buttons=[Button(title="Mark as read", identifier="read")],
+        timeout=5,
+    )
+    received = notification_server.notifications[platform_id(notifier, identifier)]
+
+    assert received.app_name == notifier.app_name
+    assert received.summary == "Julius Caesar"
+    assert received.body == "Et tu, Brute?"
+    assert received.actions == ["default", "", "read", "Mark as read"]
+    assert received.hints["urgency"] == 2
+    assert received.expire_timeout == 5000
+
+
+@pytest.mark.asyncio
+async def test_action_invoked_signal(
+    notifier: DesktopNotifier, notification_server: NotificationServer
+) -> None:
+    on_clicked = Mock()
+    identifier = await notifier.send(
+        title="Julius Caesar", message="Et tu, Brute?", on_clicked=on_clicked
+    )
+
+    notification_server.invoke_action(platform_id(notifier, identifier), "default")
+    await wait_for(lambda: on_clicked.called)
+
+    assert identifier not in await notifier.get_current_notifications()
+
+
+@pytest.mark.asyncio
+async def test_notification_closed_signal(
+    notifier: DesktopNotifier, notification_server: NotificationServer
+) -> None:
+    on_dismissed = Mock()
+    identifier = await notifier.send(
+        title="Julius Caesar", message="Et tu, Brute?", on_dismissed=on_dismissed
+    )
+
+    notification_server.close(
+        platform_id(notifier, identifier), NOTIFICATION_CLOSED_DISMISSED
+    )
+    await wait_for(lambda: on_dismissed.called)
+
+    assert identifier not in await notifier.get_current_notifications()
+
+
+@pytest.mark.asyncio
+async def test_expired_outcome(
+    notifier: DesktopNotifier, notification_server: NotificationServer
+) -> None:
+    notification = Notification(title="Julius Caesar", message="Et tu, Brute?")
+    task = asyncio.create_task(notifier.send_and_wait(notification, timeout=5))
+    await wait_for(
+        lambda: notification.identifier in notifier._backend._notification_cache
+    )
+
+    notification_server.close(
+        platform_id(notifier, notification.identifier), NOTIFICATION_CLOSED_EXPIRED
+    )
+
+    assert isinstance(await task, Expired)
+
+
+@pytest.mark.asyncio
+async def test_foreign_signals_are_ignored(
+    notifier: DesktopNotifier, notification_server: NotificationServer
+) -> None:
+    on_dismissed = [Mock(), Mock()]
+    identifiers = [
+        await notifier.send(title="Julius Caesar", message="", on_dismissed=callback)
+        for callback in on_dismissed
+    ]
+
+    other = await MessageBus().connect()
+    try:
+        # Signals for the notifications of other clients are broadcast to us.
+        reply = await other.call(
+            Message(
+                destination="org.freedesktop.Notifications",
+                path="/org/freedesktop/Notifications",
+                interface="org.freedesktop.Notifications",
+                member="Notify",
+                signature="susssasa{sv}i",
+                body=["Brutus", 0, "", "Et tu?", "", [], {}, -1],
+            )
+        )
+        notification_server.close(reply.body[0], NOTIFICATION_CLOSED_DISMISSED)
+
+        # Signals of connections which do not own the server name are not delivered.
+        await other.send(
+            Message.new_signal(
+                "/org/freedesktop/Notifications",
+                "org.freedesktop.Notifications",
+                "NotificationClosed",
+                "uu",
+                [platform_id(notifier, identifiers[0]), NOTIFICATION_CLOSED_DISMISSED],
+            )
+        )
+    finally:
+        other.disconnect()
+
+    notification_server.close(
+        platform_id(notifier, identifiers[1]), NOTIFICATION_CLOSED_DISMISSED
+    )
+    await wait_for(lambda: on_dismissed[1].called)
+
+    assert not on_dismissed[0].called
+    assert await notifier.get_current_notifications() == identifiers[:1]
+
+
+@pytest.mark.asyncio
+async def test_unrelated_signals_keep_routes(
+    notifier: DesktopNotifier, notification_server: NotificationServer
+) -> None:
+    on_dismissed = Mock()
+    identifier = await notifier.send(
+        title="Julius Caesar", message="", on_dismissed=on_dismissed
+    )
+    nid = platform_id(notifier, identifier)
+    shared = connection(notifier)
+
+    # Signals with the same member name and ID from another interface or with another
+    # signature are ignored.
+    for path, interface, signature in (
+        ("/org/example/Mail", "org.example.Mail", "uu"),
+        ("/org/freedesktop/Notifications", "org.example.Mail", "uu"),
+        ("/org/freedesktop/Notifications", "org.freedesktop.Notifications", "us"),
+    ):
+        body = [nid, "default"] if signature == "us" else [nid, 2]
+        shared._on_bus_message(
+            Message.new_signal(path, interface, "NotificationClosed", signature, body)
+        )
+
+    assert nid in shared.routes
+    assert not on_dismissed.called
+
+    notification_server.close(nid, NOTIFICATION_CLOSED_DISMISSED)
+    await wait_for(lambda: on_dismissed.called)
+
+
+@pytest.mark.asyncio
+async def test_legacy_hints_signature(
+    legacy_notification_server: NotificationServer,
+) -> None:
+    notifier = DesktopNotifier()
+    notifier._did_request_authorisation = True
+
+    identifier = await notifier.send(
+        title="Julius Caesar", message="Et tu, Brute?", sound=Sound(name="Tink")
+    )
+    nid = platform_id(notifier, identifier)
+    received = legacy_notification_server.notifications[nid]
+
+    assert received.hints == {"urgency": "1", "sound-name": "message-new-instant"}
+
+    capabilities = await notifier.get_capabilities()
+    assert Capability.MESSAGE in capabilities
+    assert Capability.BUTTONS not in capabilities
+
+
+@pytest.mark.asyncio
+async def test_cache_eviction_releases_platform_ids(
+    notification_server: NotificationServer,
+) -> None:
+    notifier = DesktopNotifier(cache_size=10)
+    notifier._did_request_authorisation = True
+    assert isinstance(notifier._backend, DBusDesktopNotifier)
+
+    for _ in range(50):
+        await notifier.send(title="Julius Caesar", message="Et tu, Brute?")
+
+    platform_ids = notifier._backend._platform_to_interface_notification_identifier
+    assert len(platform_ids) == 10
+    assert set(platform_ids.values()) == set(await notifier.get_current_notifications())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_sends_share_connection(
+    notification_server: NotificationServer, bus_connections: list[MessageBus]
+) -> None:
+
+    notifier = DesktopNotifier()
+    notifier._did_request_authorisation = True
+
+    identifiers = await asyncio.gather(
+        *(notifier.send(title="Julius Caesar", message=str(i)) for i in range(500))
+    )
+
+    assert len(bus_connections) == 1
+    assert len(set(identifiers)) == 500
+    assert len(await notifier.get_current_notifications()) == 500
+
+    await notifier.clear_all()
+
+
+@pytest.mark.asyncio
+async def test_notifiers_share_connection(
+    notification_server: NotificationServer, bus_connections: list[MessageBus]
+) -> None:
+
+    notifiers = [DesktopNotifier(app_name=f"Tenant {i}") for i in range(50)]
+    callbacks = [Mock() for _ in notifiers]
+    identifiers = []
+
+    for notifier, on_clicked in zip(notifiers, callbacks):
+        notifier._did_request_authorisation = True
+        identifiers.append(
+            await notifier.send(
+                title="Julius Caesar", message="", on_clicked=on_clicked
+            )
+        )
+
+    assert len(bus_connections) == 1
+    shared = connection(notifiers[0])
+    assert all(connection(notifier) is shared for notifier in notifiers)
+
+    nid = platform_id(notifiers[7], identifiers[7])
+    assert notification_server.notifications[nid].app_name == "Tenant 7"
+
+    # Signals are only routed to the notifier which sent the notification.
+    notification_server.invoke_action(nid, "default")
+    await wait_for(lambda: callbacks[7].called)
+    assert sum(on_clicked.called for on_clicked in callbacks) == 1
+
+    # The connection is closed when the last notifier is gone.
+    bus = shared.bus
+    del notifier, notifiers
+    gc.collect()
+
+    await wait_for(lambda: not bus.connected)
+    assert len(shared.routes) == 0
+
+
+@pytest.mark.asyncio
+async def test_send_many_batches(notification_server: NotificationServer) -> None:
+    notifier = DesktopNotifier()
+    notifier._did_request_authorisation = True
+
+    # Later batches on the same connection are not affected by earlier ones.
+    for batch in range(3):
+        results = await notifier.send_many(
+            [Notification(title="Julius Caesar", message=str(i)) for i in range(10)],
+            max_in_flight=4,
+        )
+        assert all(result.ok for result in results), batch
+
+        for result in results:
+            assert platform_id(notifier, result.identifier) in (
+                notification_server.notifications
+            )
+
+    assert connection(notifier).bus.connected
+    await notifier.aclose()
+
+
+@pytest.mark.asyncio
+async def test_non_interactive(notification_server: NotificationServer) -> None:
+    notifier = DesktopNotifier(app_name="Batch job", interactive=False)
+    notifier._did_request_authorisation = True
+
+    await notifier.send(title="Julius Caesar", message="", on_clicked=Mock())
+    results = await notifier.send_many(
+        [Notification(title="Julius Caesar", message=str(i)) for i in range(10)]
+    )
+    assert all(result.ok for result in results)
+
+    def received() -> int:
+        notifications = notification_server.notifications.values()
+        return sum(n.app_name == "Batch job" for n in notifications)
+
+    await wait_for(lambda: received() == 11)
+
+    # Nothing is kept track of and signals are not subscribed.
+    shared = connection(notifier)
+    assert await notifier.get_current_notifications() == []
+    assert isinstance(notifier._backend, DBusDesktopNotifier)
+    assert not notifier._backend._platform_to_interface_notification_identifier
+    assert not shared.routes
+    assert not shared._subscribed
+
+    # An interactive notifier subscribes to signals on the shared connection.
+    interactive = DesktopNotifier()
+    interactive._did_request_authorisation = True
+    on_clicked = Mock()
+    identifier = await interactive.send(
+        title="Julius Caesar", message="", on_clicked=on_clicked
+    )
+    assert connection(interactive) is shared
+
+    notification_server.invoke_action(platform_id(interactive, identifier), "default")
+    await wait_for(lambda: on_clicked.called)
+
+
+@pytest.mark.asyncio
+async def test_non_interactive_burst(notification_server: NotificationServer) -> None:
+    notifier = DesktopNotifier(app_name="Burst", interactive=False)
+    notifier._did_request_authorisation = True
+
+    results = await notifier.send_many(
+        [Notification(title="Julius Caesar", message=str(i)) for i in range(3000)]
+    )
+    assert all(result.ok for result in results)
+    assert connection(notifier).bus.connected
+
+    def received() -> int:
+        notifications = notification_server.notifications.values()
+        return sum(n.app_name == "Burst" for n in notifications)
+
+    await wait_for(lambda: received() == 3000, timeout_sec=10.0)
+    await notifier.aclose()
+
+
+@pytest.mark.asyncio
+async def test_aclose_releases_connection(
+    notification_server: NotificationServer,
+) -> None:
+    fds = len(os.listdir("/proc/self/fd"))
+
+    for i in range(20):
+        async with DesktopNotifier(app_name=f"Worker {i}") as notifier:
+            notifier._did_request_authorisation = True
+            await notifier.send(title="Julius Caesar", message="")
+            bus = connection(notifier).bus
+
+        assert not bus.connected
+        assert isinstance(notifier._backend, DBusDesktopNotifier)
+        assert notifier._backend._connection is None
+
+    assert len(os.listdir("/proc/self/fd")) <= fds
+
+
+@pytest.mark.asyncio
+async def test_unavailable_bus_fails_fast(
+    tmp_path: Any, monkeypatch: pytest.MonkeyPatch, bus_connections: list[MessageBus]
+) -> None:
+    monkeypatch.setenv("DBUS_SESSION_BUS_ADDRESS", f"unix:path={tmp_path}/missing")
+
+    notifier = DesktopNotifier()
+    notifier._did_request_authorisation = True
+
+    for i in range(100):
+        await notifier.send(title="Julius Caesar", message=str(i))
+
+    assert len(bus_connections) == notifier._backend._breaker.failure_threshold
+    assert notifier.breaker_info().state is BreakerState.Open
+
+
+@pytest.mark.asyncio
+async def test_invalid_notifications_do_not_open_breaker(
+    notifier: DesktopNotifier, notification_server: NotificationServer
+) -> None:
+    # The expiry timeout in milliseconds does not fit the signature of Notify.
+    for i in range(10):
+        await notifier.send(title="Julius Caesar", message=str(i), timeout=10**7)
+
+    assert notifier.breaker_info().state is BreakerState.Closed
+    assert await notifier.get_current_notifications() == []
+
+    identifier = await notifier.send(title="Julius Caesar", message="Et tu, Brute?")
+    assert platform_id(notifier, identifier) in notification_server.notifications
+
+
+@pytest.mark.asyncio
+async def test_cold_send_skips_introspection(
+    notifier: DesktopNotifier,
+    notification_server: NotificationServer,
+    introspect_calls: list[str],
+) -> None:
+    identifier = await notifier.send(title="Julius Caesar", message="Et tu, Brute?")
+
+    assert platform_id(notifier, identifier) in notification_server.notifications
+    assert introspect_calls == []
+
+    # Capabilities validate the interface against the running server.
+    capabilities = await notifier.get_capabilities()
+    assert Capability.ON_CLICKED in capabilities
+    assert len(introspect_calls) == 1
+
+    cached = load_cached_introspection()
+    assert cached
+    assert cached[0] == "desktop-notifier 1.0"
+
+
+@pytest.mark.asyncio
+async def test_introspection_mismatch_falls_back(
+    legacy_notification_server: NotificationServer,
+    introspect_calls: list[str],
+) -> None:
+    notifier = DesktopNotifier()
+    notifier._did_request_authorisation = True
+
+    await asyncio.gather(
+        *(notifier.send(title="Julius Caesar", message=str(i)) for i in range(10))
+    )
+
+    assert len(legacy_notification_server.notifications) == 10
+    assert len(introspect_calls) == 1
+
+    cached = load_cached_introspection()
+    assert cached
+    assert cached[0] == "desktop-notifier-legacy 1.0"
+
+    # A new notifier uses the cached introspection of the legacy server.
+    notifier = DesktopNotifier()
+    notifier._did_request_authorisation = True
+    await notifier.send(title="Julius Caesar", message="Et tu, Brute?")
+    await notifier.get_capabilities()
+
+    assert len(legacy_notification_server.notifications) == 11
+    assert len(introspect_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_cache_is_replaced(
+    notification_server: NotificationServer,
+    introspect_calls: list[str],
+) -> None:
+    # Cache an interface without signals for a different server.
+    xml = re.sub(r"<signal .*?</signal>", "", NOTIFICATIONS_INTROSPECTION, flags=re.S)
+    get_cache_path().parent.mkdir(parents=True)
+    get_cache_path().write_text(
+        json.dumps({"last": "other 1.0", "servers": {"other 1.0": xml}})
+    )
+
+    notifier = DesktopNotifier()
+    capabilities = await notifier.get_capabilities()
+
+    assert Capability.ON_CLICKED in capabilities
+    assert len(introspect_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_update_in_place(
+    notifier: DesktopNotifier, notification_server: NotificationServer
+) -> None:
+    on_clicked = Mock()
+    identifier = await notifier.send(
+        title="Build", message="Running", on_clicked=on_clicked
+    )
+    nid = platform_id(notifier, identifier)
+
+    for i in range(10):
+        await notifier.update(identifier, message=f"Step {i}")
+
+    received = notification_server.notifications[nid]
+    assert received.replaces_id == nid
+    assert received.body == "Step 9"
+    assert platform_id(notifier, identifier) == nid
+    assert await notifier.get_current_notifications() == [identifier]
+
+    notification_server.invoke_action(nid, "default")
+    await wait_for(lambda: on_clicked.called)
+
+
+@pytest.mark.asyncio
+async def test_update_expired_notification(
+    notifier: DesktopNotifier, notification_server: NotificationServer
+) -> None:
+    identifier = await notifier.send(title="Build", message="Running")
+    nid = platform_id(notifier, identifier)
+
+    # Servers assign a new ID if the replaced notification no longer exists.
+    notification_server.interface.notifications.pop(nid)
+    await notifier.update(identifier, message="Done")
+
+    new_nid = platform_id(notifier, identifier)
+    assert new_nid != nid
+    assert notification_server.notifications[new_nid].body == "Done"
+    assert await notifier.get_current_notifications() == [identifier]
+
+
+@pytest.mark.asyncio
+async def test_progress_hint(
+    notifier: DesktopNotifier, notification_server: NotificationServer
+) -> None:
+    identifier = await notifier.send(title="Download", message="", progress=0)
+    nid = platform_id(notifier, identifier)
+
+    await notifier.progress(identifier, 50)
+    await notifier.progress(identifier, 100)
+
+    assert notification_server.notifications[nid].hints["value"] == 100
+    assert Capability.PROGRESS in await notifier.get_capabilities()
+
+
+@pytest.mark.asyncio
+async def test_server_restart(private_notification_server: NotificationServer) -> None:
+    server = private_notification_server
+    notifier = DesktopNotifier()
+    notifier._did_request_authorisation = True
+    backend = notifier._backend
+    assert isinstance(backend, DBusDesktopNotifier)
+
+    await notifier.get_capabilities()
+    old = await notifier.send(title="Julius Caesar", message="Et tu, Brute?")
+    assert platform_id(notifier, old) == 1
+
+    generation = backend._server_generation
+    server.restart()
+    await wait_for(lambda: backend._server_generation > generation)
+
+    # Notifications of the previous server are forgotten, its IDs are reused.
+    assert await notifier.get_current_notifications() == []
+    assert notifier._capabilities_generation != backend._server_generation
+
+    on_clicked = Mock()
+    new = await notifier.send(title="Brutus", message="", on_clicked=on_clicked)
+    assert platform_id(notifier, new) == 1
+    assert server.notifications[1].summary == "Brutus"
+
+    server.invoke_action(1, "default")
+    await wait_for(lambda: on_clicked.called)
+
+
+@pytest.mark.asyncio
+async def test_bus_reconnect(
+    private_notification_server: NotificationServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    server = private_notification_server
+    notifier = DesktopNotifier()
+    notifier._did_request_authorisation = True
+
+    await notifier.send(title="Julius Caesar", message="Et tu, Brute?")
+    old_bus = connection(notifier).bus
+
+    server.stop()
+    await wait_for(lambda: not old_bus.connected)
+    server.start()
+    monkeypatch.setenv("DBUS_SESSION_BUS_ADDRESS", server.address)
+
+    on_clicked = Mock()
+    identifier = await notifier.send(title="Brutus", message="", on_clicked=on_clicked)
+
+    assert connection(notifier).bus is not old_bus
+    assert await notifier.get_current_notifications() == [identifier]
+
+    # Signals are subscribed on the new connection.
+    server.invoke_action(platform_id(notifier, identifier), "default")
+    await wait_for(lambda: on_clicked.called)
+
+
+@pytest.mark.asyncio
+async def test_in_flight_send_is_retried(
+    private_notification_server: NotificationServer,
+) -> None:
+    server = private_notification_server
+    notifier = DesktopNotifier()
+    notifier._did_request_authorisation = True
+    await notifier.get_capabilities()
+
+    server.interface.latency = 0.5
+    send = asyncio.ensure_future(notifier.send(title="Julius Caesar", message=""))
+    await asyncio.sleep(0.1)
+    assert not send.done()
+
+    # The server crashes before replying, the new server shows the notification.
+    server.restart()
+    server.interface.latency = 0
+    identifier = await send
+
+    assert await notifier.get_current_notifications() == [identifier]
+    assert platform_id(notifier, identifier) in server.notifications
+    assert server.interface.notify_count == 1
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import pytest
+
+from desktop_notifier import (
+    Button,
+    Deduplicator,
+    DesktopNotifier,
+    Notification,
+    ThreadCoalescer,
+    Urgency,
+)
+from desktop_notifier.backends.dummy import DummyNotificationCenter
+from desktop_notifier.dedup import content_key
+
+from .conftest import Clock
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr("desktop_notifier.dedup.time.monotonic", clock)
+    return clock
+
+
+def test_content_key() -> None:
+    notification = Notification(
+        title="Julius Caesar",
+        message="Et tu, Brute?",
+        buttons=(Button(title="Mark as read"),),
+    )
+    same = Notification(
+        title="Julius Caesar",
+        message="Et tu, Brute?",
+        buttons=(Button(title="Mark as read", on_pressed=lambda: None),),
+        on_clicked=lambda: None,
+    )
+    assert content_key(notification) == content_key(same)
+    assert notification.identifier != same.identifier
+
+    for changes in (
+        {"message": "Veni, vidi, vici"},
+        {"urgency": Urgency.Critical},
+        {"thread": "forum"},
+        {"buttons": ()},
+    ):
+        kwargs = {"title": "Julius Caesar", "message": "Et tu, Brute?", **changes}
+        other = Notification(**kwargs)  # type:ignore[arg-type]
+        assert content_key(other) != content_key(notification)
+
+
+def test_suppress_within_ttl(clock: Clock) -> None:
+    dedup = Deduplicator(ttl=60, buckets=6)
+    first = Notification(title="Julius Caesar", message="")
+
+    assert dedup.check(first) is None
+    dedup.record(first)
+    clock.now += 45
+    assert (
+        dedup.check(Notification(title="Julius Caesar", message="")) == first.identifier
+    )
+    assert dedup.check(Notification(title="Brutus", message="")) is None
+    assert dedup.suppressed_count == 1
+
+    # Repeats do not extend the window.
+    clock.now += 20
+    repeat = Notification(title="Julius Caesar", message="")
+    assert dedup.check(repeat) is None
+    dedup.record(repeat)
+    assert (
+        dedup.check(Notification(title="Julius Caesar", message=""))
+        == repeat.identifier
+    )
+
+
+def test_check_does_not_record() -> None:
+    dedup = Deduplicator(ttl=60)
+
+    assert dedup.check(Notification(title="Julius Caesar", message="")) is None
+    assert dedup.check(Notification(title="Julius Caesar", message="")) is None
+    assert len(dedup) == 0
+
+
+def test_expired_buckets_are_dropped(clock: Clock) -> None:
+    dedup = Deduplicator(ttl=10, buckets=5)
+
+    for i in range(100):
+        dedup.record(Notification(title=str(i), message=""))
+        clock.now += 1
+
+    assert len(dedup) <= 10
+    assert len(dedup._buckets) <= 5
+
+
+@pytest.mark.asyncio
+async def test_notifier_with_deduplicator(clock: Clock) -> None:
+    dedup = Deduplicator(ttl=60)
+    notifier = DesktopNotifier(deduplicator=dedup, coalescer=ThreadCoalescer())
+    notifier._did_request_authorisation = True
+    backend = DummyNotificationCenter(notifier.app_name)
+    notifier._backend = backend
+
+    identifiers = [
+        await notifier.send(title="Disk full", message="/dev/sda1", thread="alerts")
+        for _ in range(10)
+    ]
+
+    assert set(identifiers) == {identifiers[0]}
+    assert backend.call_counts["send"] == 1
+    assert dedup.suppressed_count == 9
+    # Duplicates are suppressed before they reach the coalescer.
+    assert notifier.coalescer and notifier.coalescer.coalesced_count == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_not_recorded() -> None:
+    class FailingNotificationCenter(DummyNotificationCenter):
+        fail = True
+
+        async def _send(self, notification: Notification) -> None:
+            await super()._send(notification)
+            if self.fail:
+                raise ValueError("Invalid notification")
+
+    dedup = Deduplicator(ttl=60)
+    notifier = DesktopNotifier(deduplicator=dedup)
+    notifier._did_request_authorisation = True
+    backend = FailingNotificationCenter(notifier.app_name)
+    notifier._backend = backend
+
+    first = await notifier.send(title="Disk full", message="/dev/sda1")
+    backend.fail = False
+    retry = await notifier.send(title="Disk full", message="/dev/sda1")
+    repeat = await notifier.send(title="Disk full", message="/dev/sda1")
+
+    # The failed notification did not suppress the retry, the retry suppressed the
+    # repeat.
+    assert retry != first
+    assert repeat == retry
+    assert backend.call_counts["send"] == 2
+    assert dedup.suppressed_count == 1
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from desktop_notifier import CallbackDispatcher, DesktopNotifier, Notification
+from desktop_notifier.dispatch import LATENCY_BUCKETS
+
+from .backends import simulate_clicked
+
+
+def wait_until_idle(dispatcher: CallbackDispatcher, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while dispatcher.info().pending > 0:
+        assert time.monotonic() < deadline, "callbacks did not complete"
+        time.sleep(0.001)
+
+
+def test_inline() -> None:
+    dispatcher = CallbackDispatcher()
+    callback = Mock()
+
+    dispatcher.dispatch("a", callback, 1, 2)
+
+    callback.assert_called_once_with(1, 2)
+    info = dispatcher.info()
+    assert info.dispatched == 1
+    assert info.pending == 0
+    # Inline callbacks have no latency to report.
+    assert list(info.latency) == list(LATENCY_BUCKETS)
+    assert sum(info.latency.values()) == 0
+
+
+def test_exceptions_are_isolated(caplog: pytest.LogCaptureFixture) -> None:
+    dispatcher = CallbackDispatcher.thread_pool(max_workers=2)
+    calls: list[int] = []
+
+    def failing() -> None:
+        raise RuntimeError("handler failed")
+
+    dispatcher.dispatch("a", failing)
+    dispatcher.dispatch("a", calls.append, 1)
+    dispatcher.dispatch("b", calls.append, 2)
+    wait_until_idle(dispatcher)
+    dispatcher.close()
+
+    assert sorted(calls) == [1, 2]
+    assert dispatcher.info().failed == 1
+    assert "handler failed" in caplog.text
+
+
+def test_order_per_notification() -> None:
+    dispatcher = CallbackDispatcher.thread_pool(max_workers=4)
+    calls: dict[str, list[int]] = {"a": [], "b": []}
+
+    def record(identifier: str, index: int) -> None:
+        # Give later callbacks the chance to overtake.
+        time.sleep(0.001 * (index % 3))
+        calls[identifier].append(index)
+
+    for index in range(20):
+        dispatcher.dispatch("a", record, "a", index)
+        dispatcher.dispatch("b", record, "b", index)
+
+    wait_until_idle(dispatcher)
+    dispatcher.close()
+
+    assert calls["a"] == list(range(20))
+    assert calls["b"] == list(range(20))
+    assert dispatcher.info().dispatched == 40
+
+
+def test_timeout(caplog: pytest.LogCaptureFixture) -> None:
+    dispatcher = CallbackDispatcher.thread_pool(max_workers=2, timeout=0.05)
+    release = threading.Event()
+    callback = Mock()
+
+    dispatcher.dispatch("a", release.wait)
+    dispatcher.dispatch("a", callback)
+    wait_until_idle(dispatcher, timeout=1.0)
+
+    # The next callback ran although the first one is still blocked.
+    callback.assert_called_once()
+    assert dispatcher.info().timed_out == 1
+    assert "took longer than" in caplog.text
+
+    release.set()
+    dispatcher.close()
+
+
+def test_timeouts_share_a_thread() -> None:
+    dispatcher = CallbackDispatcher.thread_pool(max_workers=2, timeout=10)
+    release = threading.Event()
+    threads = threading.active_count()
+
+    try:
+        for index in range(100):
+            dispatcher.dispatch(str(index), release.wait)
+
+        # Two workers and one thread which watches the timeouts of all callbacks.
+        assert threading.active_count() <= threads + 3
+    finally:
+        release.set()
+
+    wait_until_idle(dispatcher)
+    dispatcher.close()
+    assert dispatcher.info().timed_out == 0
+
+
+def test_executor_is_not_shut_down() -> None:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        dispatcher = CallbackDispatcher(executor)
+        dispatcher.close()
+        assert executor.submit(int, "1").result() == 1
+
+
+def test_close_drops_pending() -> None:
+    dispatcher = CallbackDispatcher.thread_pool(max_workers=1)
+    release = threading.Event()
+    callback = Mock()
+
+    dispatcher.dispatch("a", release.wait)
+    dispatcher.dispatch("a", callback)
+    dispatcher.close()
+    release.set()
+
+    assert dispatcher.info().pending == 0
+    callback.assert_not_called()
+
+
+def test_reuse_after_close(caplog: pytest.LogCaptureFixture) -> None:
+    dispatcher = CallbackDispatcher.thread_pool(max_workers=2, timeout=0.05)
+    release = threading.Event()
+    callback = Mock()
+
+    dispatcher.dispatch("a", callback)
+    wait_until_idle(dispatcher)
+    dispatcher.close()
+
+    # A new pool and watchdog are started for callbacks after closing.
+    dispatcher.dispatch("a", release.wait)
+    dispatcher.dispatch("a", callback)
+    wait_until_idle(dispatcher, timeout=1.0)
+    release.set()
+
+    assert callback.call_count == 2
+    assert dispatcher.info().timed_out == 1
+    assert "executor is shut down" not in caplog.text
+    dispatcher.close()
+
+
+def test_invalid_timeout() -> None:
+    with pytest.raises(ValueError):
+        CallbackDispatcher(timeout=0)
+
+
+@pytest.mark.asyncio
+async def test_coroutine_callbacks() -> None:
+    dispatcher = CallbackDispatcher()
+    callback = AsyncMock()
+
+    dispatcher.dispatch("a", callback, 1)
+    assert dispatcher.info().pending == 1
+
+    await dispatcher.drain()
+
+    callback.assert_awaited_once_with(1)
+    assert dispatcher.info().pending == 0
+    assert dispatcher.info().dispatched == 1
+
+
+@pytest.mark.asyncio
+async def test_coroutine_concurrency_and_order() -> None:
+    dispatcher = CallbackDispatcher(max_tasks=2)
+    running = 0
+    max_running = 0
+    calls: list[tuple[str, int]] = []
+
+    async def record(identifier: str, index: int) -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.001 * (index % 3))
+        calls.append((identifier, index))
+        running -= 1
+
+    for index in range(10):
+        for identifier in "abc":
+            dispatcher.dispatch(identifier, record, identifier, index)
+
+    await dispatcher.drain()
+
+    assert max_running == 2
+    for identifier in "abc":
+        assert [i for n, i in calls if n == identifier] == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_coroutine_errors_and_timeout(caplog: pytest.LogCaptureFixture) -> None:
+    dispatcher = CallbackDispatcher(timeout=0.05)
+    cancelled = asyncio.Event()
+
+    async def failing() -> None:
+        raise RuntimeError("handler failed")
+
+    async def hanging() -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    dispatcher.dispatch("a", failing)
+    dispatcher.dispatch("b", hanging)
+    await dispatcher.drain()
+
+    assert cancelled.is_set()
+    info = dispatcher.info()
+    assert info.failed == 1
+    assert info.timed_out == 1
+    assert "handler failed" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_coroutine_from_other_thread() -> None:
+    dispatcher = CallbackDispatcher()
+    dispatcher.loop = asyncio.get_running_loop()
+    callback = AsyncMock()
+
+    thread = threading.Thread(target=dispatcher.dispatch, args=("a", callback))
+    thread.start()
+    thread.join()
+
+    # The task is created in the next iteration of the loop.
+    await asyncio.sleep(0)
+    await dispatcher.drain()
+
+    callback.assert_awaited_once_with()
+
+
+@pytest.mark.asyncio
+async def test_coroutine_returned_in_executor() -> None:
+    dispatcher = CallbackDispatcher.thread_pool(max_workers=1)
+    dispatcher.loop = asyncio.get_running_loop()
+    awaited = asyncio.Event()
+
+    async def handler() -> None:
+        awaited.set()
+
+    # Not a coroutine function, but it returns a coroutine.
+    dispatcher.dispatch("a", lambda: handler())
+
+    await asyncio.wait_for(awaited.wait(), timeout=5)
+    await dispatcher.drain()
+
+    assert dispatcher.info().dispatched == 1
+    dispatcher.close()
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_coroutines() -> None:
+    dispatcher = CallbackDispatcher()
+    dispatcher.dispatch("a", asyncio.sleep, 10)
+    await asyncio.sleep(0)
+
+    dispatcher.close()
+    await dispatcher.drain()
+
+    assert dispatcher.info().pending == 0
+
+
+@pytest.mark.asyncio
+async def test_notifier_coroutine_callback(notifier: DesktopNotifier) -> None:
+    done = asyncio.Event()
+
+    async def on_clicked() -> None:
+        await asyncio.sleep(0.01)
+        done.set()
+
+    notification = Notification(
+        title="Julius Caesar", message="Et tu, Brute?", on_clicked=on_clicked
+    )
+    identifier = await notifier.send_notification(notification)
+    simulate_clicked(notifier, identifier)
+
+    # Closing the notifier waits for the callback.
+    await notifier.aclose()
+    assert done.is_set()
+
+
+@pytest.mark.asyncio
+async def test_notifier_callbacks_do_not_block(notifier: DesktopNotifier) -> None:
+    dispatcher = CallbackDispatcher.thread_pool()
+    notifier.dispatcher = dispatcher
+
+    release = threading.Event()
+    notification = Notification(
+        title="Julius Caesar", message="Et tu, Brute?", on_clicked=release.wait
+    )
+    identifier = await notifier.send_notification(notification)
+
+    # Returns although the callback blocks until released.
+    simulate_clicked(notifier, identifier)
+    assert notifier.dispatch_info().pending == 1
+
+    release.set()
+    wait_until_idle(dispatcher)
+    assert notifier.dispatch_info().dispatched == 1
+
+    await notifier.aclose()
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from desktop_notifier import (
+    Button,
+    ButtonPressed,
+    Capability,
+    Cleared,
+    Clicked,
+    DesktopNotifier,
+    Dismissed,
+    DispatchScheduler,
+    EventOverflow,
+    EventStream,
+    Evicted,
+    Expired,
+    Notification,
+    NotificationEvent,
+    OverflowPolicy,
+    Replied,
+    ReplyField,
+    Urgency,
+)
+from desktop_notifier.backends.dummy import DummyNotificationCenter
+
+from .backends import (
+    simulate_button_pressed,
+    simulate_clicked,
+    simulate_dismissed,
+    simulate_replied,
+)
+
+
+def make_event(identifier: str = "a", thread: str | None = None) -> Clicked:
+    return Clicked(identifier, thread, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_overflow_drop_oldest() -> None:
+    stream = EventStream(max_size=2)
+    for identifier in "abc":
+        stream.put(make_event(identifier))
+    stream.close()
+
+    assert [event.identifier async for event in stream] == ["b", "c"]
+    assert stream.dropped_count == 1
+
+
+@pytest.mark.asyncio
+async def test_overflow_drop_newest() -> None:
+    stream = EventStream(max_size=2, overflow=EventOverflow.DROP_NEWEST)
+    for identifier in "abc":
+        stream.put(make_event(identifier))
+    stream.close()
+
+    assert [event.identifier async for event in stream] == ["a", "b"]
+    assert stream.dropped_count == 1
+
+
+@pytest.mark.asyncio
+async def test_filters() -> None:
+    by_thread = EventStream(thread="ops")
+    by_identifier = EventStream(identifier="b")
+
+    for event in (make_event("a", "ops"), make_event("b"), make_event("c", "ops")):
+        by_thread.put(event)
+        by_identifier.put(event)
+
+    assert [event.identifier for event in by_thread._queue] == ["a", "c"]
+    assert [event.identifier for event in by_identifier._queue] == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_put_from_other_thread() -> None:
+    stream = EventStream()
+
+    thread = threading.Thread(target=stream.put, args=(make_event(),))
+    thread.start()
+    thread.join()
+
+    event = await asyncio.wait_for(stream.__anext__(), timeout=1.0)
+    assert event.identifier == "a"
+
+
+@pytest.mark.asyncio
+async def test_notifier_events(notifier: DesktopNotifier) -> None:
+    capabilities = await notifier.get_capabilities()
+    if not {Capability.ON_CLICKED, Capability.BUTTONS} <= capabilities:
+        pytest.skip("Not supported by backend")
+
+    button = Button(title="Mark as read")
+    clicked = Notification(title="Julius Caesar", message="Veni", thread="senate")
+    pressed = Notification(
+        title="Julius Caesar", message="Vidi", buttons=(button,), thread="forum"
+    )
+
+    all_events = notifier.events()
+    forum_events = notifier.events(thread="forum")
+
+    clicked_id = await notifier.send_notification(clicked)
+    pressed_id = await notifier.send_notification(pressed)
+    simulate_clicked(notifier, clicked_id)
+    simulate_button_pressed(notifier, pressed_id, button.identifier)
+
+    await notifier.aclose()
+
+    events = [event async for event in all_events]
+    assert [type(event) for event in events] == [Clicked, ButtonPressed]
+    assert events[0].identifier == clicked_id
+    assert events[0].thread == "senate"
+    assert events[1] == ButtonPressed(
+        pressed_id, "forum", events[1].timestamp, button.identifier
+    )
+
+    assert [event async for event in forum_events] == [events[1]]
+
+
+@pytest.mark.asyncio
+async def test_notifier_reply_and_dismiss_events(notifier: DesktopNotifier) -> None:
+    capabilities = await notifier.get_capabilities()
+    if not {Capability.ON_DISMISSED, Capability.REPLY_FIELD} <= capabilities:
+        pytest.skip("Not supported by backend")
+
+    notification = Notification(
+        title="Julius Caesar", message="Et tu, Brute?", reply_field=ReplyField()
+    )
+
+    async with notifier.events() as events:
+        identifier = await notifier.send_notification(notification)
+        simulate_replied(notifier, identifier, "Et tu?")
+        simulate_dismissed(notifier, identifier)
+
+    received = [event async for event in events]
+    assert received[0] == Replied(identifier, None, received[0].timestamp, "Et tu?")
+    assert isinstance(received[1], Dismissed)
+
+
+@pytest.mark.asyncio
+async def test_unreferenced_streams_are_dropped(notifier: DesktopNotifier) -> None:
+    kept = notifier.events()
+    notifier.events()
+    assert len(notifier._backend._event_streams) == 2
+
+    notifier._backend.publish_event(make_event())
+
+    assert len(notifier._backend._event_streams) == 1
+    assert len(kept) == 1
+
+
+async def send_and_wait_in_background(
+    notifier: DesktopNotifier, notification: Notification, timeout: float = 5.0
+) -> asyncio.Task[NotificationEvent]:
+    task = asyncio.create_task(notifier.send_and_wait(notification, timeout))
+    while notification.identifier not in notifier._backend._notification_cache:
+        assert not task.done()
+        await asyncio.sleep(0.001)
+    return task
+
+
+@pytest.mark.asyncio
+async def test_send_and_wait(notifier: DesktopNotifier) -> None:
+    capabilities = await notifier.get_capabilities()
+    if Capability.BUTTONS not in capabilities:
+        pytest.skip("Not supported by backend")
+
+    approve = Button(title="Approve")
+    notification = Notification(
+        title="Julius Caesar", message="Cross the Rubicon?", buttons=(approve,)
+    )
+
+    task = await send_and_wait_in_background(notifier, notification)
+    simulate_button_pressed(notifier, notification.identifier, approve.identifier)
+
+    outcome = await task
+    assert isinstance(outcome, ButtonPressed)
+    assert outcome.button_identifier == approve.identifier
+    assert notifier._backend._outcome_waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_send_and_wait_timeout(notifier: DesktopNotifier) -> None:
+    notification = Notification(title="Julius Caesar", message="Et tu, Brute?")
+
+    outcome = await notifier.send_and_wait(notification, timeout=0.01)
+
+    assert outcome == Expired(notification.identifier, None, outcome.timestamp)
+    assert notifier._backend._outcome_waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_send_and_wait_cleared(notifier: DesktopNotifier) -> None:
+    notifications = [
+        Notification(title="Julius Caesar", message=f"Et tu, Brute? {i}")
+        for i in range(200)
+    ]
+    tasks = [await send_and_wait_in_background(notifier, n) for n in notifications]
+
+    await notifier.clear(notifications[0].identifier)
+    assert isinstance(await tasks[0], Cleared)
+
+    await notifier.clear_all()
+    outcomes = await asyncio.gather(*tasks[1:])
+
+    assert all(isinstance(outcome, Cleared) for outcome in outcomes)
+    assert notifier._backend._outcome_waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_send_and_wait_evicted() -> None:
+    notifier = DesktopNotifier(cache_size=1)
+    notifier._did_request_authorisation = True
+    first = Notification(title="Julius Caesar", message="Veni")
+    second = Notification(title="Julius Caesar", message="Vidi")
+
+    first_task = await send_and_wait_in_background(notifier, first)
+    second_task = await send_and_wait_in_background(notifier, second)
+    assert isinstance(await first_task, Evicted)
+
+    await notifier.aclose()
+    assert isinstance(await second_task, Evicted)
+
+
+@pytest.mark.asyncio
+async def test_send_and_wait_failed() -> None:
+    class FailingNotificationCenter(DummyNotificationCenter):
+        async def _send(self, notification: Notification) -> None:
+            raise ValueError("Invalid notification")
+
+    scheduler = DispatchScheduler(
+        rate=1, burst=1, max_queue_size=1, overflow=OverflowPolicy.DROP_OLDEST
+    )
+    notifier = DesktopNotifier(scheduler=scheduler)
+    notifier._did_request_authorisation = True
+    notifier._backend = FailingNotificationCenter(notifier.app_name)
+
+    # A failed send is reported right away instead of once the timeout expires.
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(
+            notifier.send_and_wait(Notification(title="Julius Caesar", message="")),
+            timeout=5,
+        )
+
+    # So is a notification which the scheduler does not accept.
+    scheduler.overflow = OverflowPolicy.DROP_LOWEST_URGENCY
+    await notifier.send(title="Julius Caesar", message="Veni")
+
+    with pytest.raises(RuntimeError):
+        await asyncio.wait_for(
+            notifier.send_and_wait(
+                Notification(title="Julius Caesar", message="", urgency=Urgency.Low)
+            ),
+            timeout=5,
+        )
+
+    assert notifier._backend._outcome_waiters == {}
+    await notifier.aclose()
+
+
+@pytest.mark.asyncio
+async def test_send_and_wait_requires_interactive() -> None:
+    notifier = DesktopNotifier(interactive=False)
+    notification = Notification(title="Julius Caesar", message="Et tu, Brute?")
+
+    with pytest.raises(RuntimeError):
+        await notifier.send_and_wait(notification)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+# Budgets in microseconds. These are generous to avoid flaky failures on slow machines
+# but will catch eagerly importing heavy dependencies again.
+PACKAGE_IMPORT_BUDGET = 25_000
+OWN_MODULES_IMPORT_BUDGET = 100_000
+
+LAZY_MODULES = {
+    "bidict",
+    "dbus_fast",
+    "packaging",
+    "importlib.resources",
+    "sqlite3",
+    "desktop_notifier.sync",
+    "desktop_notifier.backends.dbus",
+}
+
+
+def import_times(statement: str) -> dict[str, tuple[int, int]]:
+    """
+    Runs the statement in a new interpreter and returns the self and cumulative import
+    time in microseconds by module, as reported by ``-X importtime``
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+
+    return times
+
+
+def test_package_import_is_lazy() -> None:
+    times = import_times("import desktop_notifier")
+
+    imported = [name for name in times if name.startswith("desktop_notifier.")]
+    assert imported == []
+    assert times["desktop_notifier"][1] < PACKAGE_IMPORT_BUDGET
+
+
+def test_notifier_import_skips_backends() -> None:
+    times = import_times(
+        "from desktop_notifier import DEFAULT_SOUND, DesktopNotifier, Notification"
+    )
+
+    for module in LAZY_MODULES:
+        assert module not in times, f"{module} imported eagerly"
+
+    own_modules_us = sum(
+        self_us
+        for name, (self_us, _) in times.items()
+        if name.split(".")[0] == "desktop_notifier"
+    )
+    assert own_modules_us < OWN_MODULES_IMPORT_BUDGET
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from desktop_notifier import (
+    Button,
+    DesktopNotifier,
+    Icon,
+    Notification,
+    Outbox,
+    ReplyField,
+    Urgency,
+)
+from desktop_notifier.breaker import CircuitBreaker
+
+from .conftest import UnavailableNotificationCenter
+
+
+def make_notification(message: str = "") -> Notification:
+    return Notification(title="Julius Caesar", message=message)
+
+
+def test_order_and_persistence(tmp_path: Path) -> None:
+    notification = Notification(
+        title="Julius Caesar",
+        message="Et tu, Brute?",
+        urgency=Urgency.Critical,
+        icon=Icon(name="call-start"),
+        buttons=(Button(title="Mark as read", on_pressed=lambda: None),),
+        reply_field=ReplyField(),
+        thread="forum",
+        progress=50,
+    )
+
+    outbox = Outbox(tmp_path / "outbox.sqlite")
+    outbox.put(notification)
+    outbox.put(make_notification("2"))
+    assert outbox.peek() is notification
+    outbox.close()
+
+    outbox = Outbox(tmp_path / "outbox.sqlite")
+    assert len(outbox) == 2
+
+    restored = outbox.peek()
+    assert restored is not None
+    assert restored.identifier == notification.identifier
+    assert restored.icon == notification.icon
+    assert restored.buttons[0].identifier == notification.buttons[0].identifier
+    assert restored.buttons[0].on_pressed is None
+    assert restored.reply_field == ReplyField()
+    assert restored.urgency is Urgency.Critical
+    assert restored.progress == 50
+
+    outbox.remove(restored.identifier)
+    peeked = outbox.peek()
+    assert peeked and peeked.message == "2"
+    assert outbox.info().delivered == 1
+
+
+def test_limits(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr("desktop_notifier.outbox.time.time", lambda: now)
+
+    outbox = Outbox(tmp_path / "outbox.sqlite", max_size=3, max_age=60)
+    notifications = [make_notification(str(i)) for i in range(5)]
+
+    for notification in notifications:
+        outbox.put(notification)
+
+    peeked = outbox.peek()
+    assert peeked is notifications[2]
+    assert outbox.info().dropped == 2
+
+    now += 61
+    assert outbox.peek() is None
+    assert len(outbox) == 0
+    assert outbox.info().expired == 3
+
+
+@pytest.mark.asyncio
+async def test_batched_writes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    outbox = Outbox(tmp_path / "outbox.sqlite")
+    flushes = 0
+    flush = outbox.flush
+
+    def counting_flush() -> None:
+        nonlocal flushes
+        flushes += 1
+        flush()
+
+    monkeypatch.setattr(outbox, "flush", counting_flush)
+
+    for i in range(100):
+        outbox.put(make_notification(str(i)))
+
+    await asyncio.sleep(0)
+    assert flushes == 1
+    assert len(outbox) == 100
+
+
+@pytest.mark.asyncio
+async def test_deliver_in_order(tmp_path: Path) -> None:
+    outbox = Outbox(tmp_path / "outbox.sqlite")
+    notifier = DesktopNotifier(outbox=outbox)
+    notifier._did_request_authorisation = True
+    backend = UnavailableNotificationCenter(notifier.app_name)
+    backend._breaker = CircuitBreaker(failure_threshold=2, base_delay=0.01)
+    backend.outbox = outbox
+    notifier._backend = backend
+
+    clicked: list[str] = []
+
+    def on_clicked(message: str) -> Any:
+        return lambda: clicked.append(message)
+
+    identifiers = [
+        await notifier.send(
+            title="Julius Caesar", message=str(i), on_clicked=on_clicked(str(i))
+        )
+        for i in range(10)
+    ]
+
+    assert len(outbox) == 10
+    assert backend.sent == []
+
+    backend.available = True
+    await notifier.drain_outbox()
+
+    assert [n.identifier for n in backend.sent] == identifiers
+    assert len(outbox) == 0
+    assert await notifier.get_current_notifications() == identifiers
+
+    # Notifications added by the running process keep their callbacks.
+    backend.handle_clicked(identifiers[3], backend.sent[3])
+    assert clicked == ["3"]
+
+
+@pytest.mark.asyncio
+async def test_undeliverable_notifications_are_dropped(tmp_path: Path) -> None:
+    class RejectingNotificationCenter(UnavailableNotificationCenter):
+        async def _send(self, notification: Notification) -> None:
+            if self.available and notification.message == "invalid":
+                raise ValueError("Invalid notification")
+            await super()._send(notification)
+
+    outbox = Outbox(tmp_path / "outbox.sqlite")
+    notifier = DesktopNotifier(outbox=outbox)
+    notifier._did_request_authorisation = True
+    backend = RejectingNotificationCenter(notifier.app_name)
+    backend._breaker = CircuitBreaker(failure_threshold=2, base_delay=0.01)
+    backend.outbox = outbox
+    notifier._backend = backend
+
+    for message in ("first", "invalid", "last"):
+        await notifier.send(title="Julius Caesar", message=message)
+
+    backend.available = True
+    await asyncio.wait_for(notifier.drain_outbox(), timeout=5.0)
+
+    assert [n.message for n in backend.sent] == ["first", "last"]
+    assert len(outbox) == 0
+    assert outbox.info().delivered == 2
+
+    # New notifications are no longer queued behind the rejected one.
+    await notifier.send(title="Julius Caesar", message="new")
+    assert backend.sent[-1].message == "new"
+
+
+@pytest.mark.asyncio
+async def test_dropped_notifications_fail_outcomes(tmp_path: Path) -> None:
+    outbox = Outbox(tmp_path / "outbox.sqlite", max_size=1, max_age=0.05)
+    notifier = DesktopNotifier(outbox=outbox)
+    notifier._did_request_authorisation = True
+    backend = UnavailableNotificationCenter(notifier.app_name)
+    backend._breaker = CircuitBreaker(failure_threshold=1, base_delay=10)
+    backend.outbox = outbox
+    notifier._backend = backend
+
+    # A notification which is dropped because the outbox is full.
+    first = asyncio.create_task(notifier.send_and_wait(make_notification("1")))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(notifier.send_and_wait(make_notification("2")))
+
+    with pytest.raises(RuntimeError, match="outbox is full"):
+        await asyncio.wait_for(first, timeout=5)
+
+    # A notification which exceeds the maximum age.
+    await asyncio.sleep(0.1)
+    outbox.flush()
+
+    with pytest.raises(RuntimeError, match="expired"):
+        await asyncio.wait_for(second, timeout=5)
+
+    assert outbox.info().dropped == 1
+    assert outbox.info().expired == 1
+    assert backend._outcome_waiters == {}
+    await notifier.aclose()
+
+
+@pytest.mark.asyncio
+async def test_batches_use_outbox(tmp_path: Path) -> None:
+    outbox = Outbox(tmp_path / "outbox.sqlite")
+    notifier = DesktopNotifier(outbox=outbox)
+    notifier._did_request_authorisation = True
+    backend = UnavailableNotificationCenter(notifier.app_name)
+    backend._breaker = CircuitBreaker(failure_threshold=2, base_delay=0.01)
+    backend.outbox = outbox
+    notifier._backend = backend
+
+    first = [make_notification(f"first {i}") for i in range(3)]
+    second = [make_notification(f"second {i}") for i in range(3)]
+
+    # Batches which fail because the server is unavailable are stored.
+    results = await notifier.send_many(first)
+    assert [r.error for r in results] == [None] * 3
+    assert len(outbox) == 3
+
+    # Later batches are stored behind them instead of jumping the queue.
+    backend.available = True
+    results = await notifier.send_many(second)
+    assert [r.error for r in results] == [None] * 3
+
+    await notifier.drain_outbox()
+    assert backend.sent == first + second
+    assert len(outbox) == 0
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from desktop_notifier import (
+    Deduplicator,
+    DesktopNotifier,
+    DispatchScheduler,
+    Notification,
+    OverflowPolicy,
+    Urgency,
+)
+from desktop_notifier.backends.dummy import DummyNotificationCenter
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.sent: list[Notification] = []
+        self.times: list[float] = []
+
+    async def send(self, notification: Notification) -> bool:
+        self.sent.append(notification)
+        self.times.append(time.monotonic())
+        return True
+
+
+def make_notification(
+    urgency: Urgency = Urgency.Normal, message: str = ""
+) -> Notification:
+    return Notification(title="Julius Caesar", message=message, urgency=urgency)
+
+
+@pytest.mark.asyncio
+async def test_rate_limit() -> None:
+    recorder = Recorder()
+    scheduler = DispatchScheduler(rate=50, burst=5, max_queue_size=100)
+
+    t0 = time.monotonic()
+    for _ in range(15):
+        assert await scheduler.submit(make_notification(), recorder.send)
+    await scheduler.join()
+
+    assert len(recorder.sent) == 15
+    # The burst is sent at once, the remaining 10 at 50 per second.
+    assert recorder.times[4] - t0 < 0.05
+    assert recorder.times[-1] - t0 >= 10 / 50 * 0.9
+    assert scheduler.info().sent == 15
+    assert scheduler.info().queued == 0
+
+
+@pytest.mark.asyncio
+async def test_priority_order() -> None:
+    recorder = Recorder()
+    scheduler = DispatchScheduler(rate=100, burst=1, critical_bypass=False)
+
+    for urgency in (Urgency.Low, Urgency.Normal, Urgency.Critical, Urgency.Low):
+        await scheduler.submit(make_notification(urgency), recorder.send)
+
+    # The first notification is sent immediately with the only token.
+    assert scheduler.info().queued_by_urgency == {
+        Urgency.Critical: 1,
+        Urgency.Normal: 1,
+        Urgency.Low: 1,
+    }
+    await scheduler.join()
+
+    assert [n.urgency for n in recorder.sent] == [
+        Urgency.Low,
+        Urgency.Critical,
+        Urgency.Normal,
+        Urgency.Low,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_critical_bypass() -> None:
+    recorder = Recorder()
+    scheduler = DispatchScheduler(rate=1, burst=1, max_queue_size=5)
+
+    for _ in range(5):
+        await scheduler.submit(make_notification(), recorder.send)
+
+    await scheduler.submit(make_notification(Urgency.Critical), recorder.send)
+
+    assert [n.urgency for n in recorder.sent] == [Urgency.Normal, Urgency.Critical]
+    assert scheduler.info().bypassed == 1
+    assert scheduler.info().queued == 4
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest() -> None:
+    recorder = Recorder()
+    scheduler = DispatchScheduler(
+        rate=1, burst=1, max_queue_size=2, overflow=OverflowPolicy.DROP_OLDEST
+    )
+    await scheduler.submit(make_notification(), recorder.send)
+
+    notifications = [make_notification(Urgency.Low, str(i)) for i in range(5)]
+    for notification in notifications:
+        assert await scheduler.submit(notification, recorder.send)
+
+    info = scheduler.info()
+    assert info.queued == 2
+    assert info.dropped == 3
+    assert info.dropped_by_urgency[Urgency.Low] == 3
+    assert [n for _, n, _, _ in scheduler._queues[Urgency.Low]] == notifications[3:]
+
+
+@pytest.mark.asyncio
+async def test_drop_lowest_urgency() -> None:
+    recorder = Recorder()
+    scheduler = DispatchScheduler(
+        rate=1, burst=1, max_queue_size=2, overflow=OverflowPolicy.DROP_LOWEST_URGENCY
+    )
+    await scheduler.submit(make_notification(), recorder.send)
+
+    low = make_notification(Urgency.Low)
+    normal = [make_notification(Urgency.Normal, str(i)) for i in range(2)]
+
+    assert await scheduler.submit(low, recorder.send)
+    assert await scheduler.submit(normal[0], recorder.send)
+    # The queue is full, the low urgency notification is dropped.
+    assert await scheduler.submit(normal[1], recorder.send)
+    # Lower urgency than anything queued, the submitted notification is dropped.
+    assert not await scheduler.submit(make_notification(Urgency.Low), recorder.send)
+
+    info = scheduler.info()
+    assert info.queued_by_urgency[Urgency.Normal] == 2
+    assert info.dropped_by_urgency == {
+        Urgency.Critical: 0,
+        Urgency.Normal: 0,
+        Urgency.Low: 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_block() -> None:
+    recorder = Recorder()
+    scheduler = DispatchScheduler(
+        rate=100, burst=1, max_queue_size=2, overflow=OverflowPolicy.BLOCK
+    )
+
+    await asyncio.gather(
+        *(scheduler.submit(make_notification(), recorder.send) for _ in range(10))
+    )
+    await scheduler.join()
+
+    assert len(recorder.sent) == 10
+    assert scheduler.info().dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_notifier_with_scheduler() -> None:
+    scheduler = DispatchScheduler(rate=100, burst=2)
+    notifier = DesktopNotifier(scheduler=scheduler)
+    notifier._did_request_authorisation = True
+    backend = DummyNotificationCenter(notifier.app_name)
+    notifier._backend = backend
+
+    identifiers = [
+        await notifier.send(title="Julius Caesar", message=str(i)) for i in range(5)
+    ]
+    assert backend.call_counts["send"] == 2
+
+    await scheduler.join()
+
+    assert backend.call_counts["send"] == 5
+    assert await notifier.get_current_notifications() == identifiers
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_not_accepted() -> None:
+    class FailingNotificationCenter(DummyNotificationCenter):
+        async def _send(self, notification: Notification) -> None:
+            raise ValueError("Invalid notification")
+
+    dedup = Deduplicator(ttl=60)
+    scheduler = DispatchScheduler(rate=100, burst=3)
+    notifier = DesktopNotifier(scheduler=scheduler, deduplicator=dedup)
+    notifier._did_request_authorisation = True
+    notifier._backend = FailingNotificationCenter(notifier.app_name)
+
+    # A failed send through the scheduler is not remembered as a duplicate.
+    await notifier.send(title="Julius Caesar", message="")
+    assert len(dedup) == 0
+
+    assert not await scheduler.submit(
+        make_notification(Urgency.Critical), notifier._backend.send
+    )
+    assert not await scheduler.submit(make_notification(), notifier._backend.send)
+
+
+@pytest.mark.asyncio
+async def test_dropped_notifications_fail_outcomes() -> None:
+    scheduler = DispatchScheduler(
+        rate=0.1, burst=1, max_queue_size=1, overflow=OverflowPolicy.DROP_OLDEST
+    )
+    notifier = DesktopNotifier(scheduler=scheduler)
+    notifier._did_request_authorisation = True
+    notifier._backend = DummyNotificationCenter(notifier.app_name)
+
+    await notifier.send(title="Julius Caesar", message="sent")
+    queued = asyncio.create_task(
+        notifier.send_and_wait(make_notification(message="queued"))
+    )
+    await asyncio.sleep(0.01)
+    await notifier.send(title="Julius Caesar", message="newer")
+
+    # The queued notification was evicted by the newer one.
+    with pytest.raises(RuntimeError, match="dropped"):
+        await asyncio.wait_for(queued, timeout=5)
+
+    assert scheduler.info().dropped == 1
+    assert notifier._backend._outcome_waiters == {}
+    await notifier.aclose()
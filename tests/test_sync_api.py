@@ -1,5 +1,9 @@
+import os
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 
 import pytest
 
@@ -7,9 +11,11 @@ from desktop_notifier import (
     DEFAULT_SOUND,
     Button,
     DesktopNotifierSync,
+    Notification,
     ReplyField,
     Urgency,
 )
+from desktop_notifier.backends.dummy import DummyNotificationCenter
 
 
 def wait_for_notifications(
@@ -51,6 +57,31 @@ def test_send(notifier_sync: DesktopNotifierSync) -> None:
     assert notification in notifier_sync.get_current_notifications()
 
 
+def test_send_many(notifier_sync: DesktopNotifierSync) -> None:
+    notifications = [
+        Notification(title="Julius Caesar", message="Et tu, Brute?") for _ in range(3)
+    ]
+    results = notifier_sync.send_many(notifications)
+
+    assert [r.identifier for r in results] == [n.identifier for n in notifications]
+    assert all(r.ok for r in results)
+
+    wait_for_notifications(notifier_sync, 3)
+
+
+def test_update(notifier_sync: DesktopNotifierSync) -> None:
+    identifier = notifier_sync.send(title="Julius Caesar", message="Et tu, Brute?")
+    notifier_sync.update(identifier, message="Et tu, Brute? (2)")
+
+    wait_for_notifications(notifier_sync, 1)
+
+    # The notification was replaced under the same identifier.
+    notification = notifier_sync._async_api._backend._notification_cache[identifier]
+    assert notification.message == "Et tu, Brute? (2)"
+    assert notification.title == "Julius Caesar"
+    assert notifier_sync.get_current_notifications() == [identifier]
+
+
 @pytest.mark.skipif(
     sys.platform.startswith("win"),
     reason="Clearing individual notifications is broken on Windows",
@@ -91,3 +122,113 @@ def test_clear_all(notifier_sync: DesktopNotifierSync) -> None:
 
     notifier_sync.clear_all()
     assert len(notifier_sync.get_current_notifications()) == 0
+
+
+@pytest.mark.skipif(
+    not os.path.isdir("/proc/self/fd"), reason="Requires /proc to count open files"
+)
+def test_close_releases_resources() -> None:
+    fds = len(os.listdir("/proc/self/fd"))
+
+    for i in range(10):
+        with DesktopNotifierSync(app_name=f"Worker {i}") as notifier:
+            notifier._async_api._did_request_authorisation = True
+            notifier.send(title="Julius Caesar", message="Et tu, Brute?")
+
+        assert notifier._loop.is_closed()
+
+    assert len(os.listdir("/proc/self/fd")) <= fds
+
+
+def test_background_loop() -> None:
+    with DesktopNotifierSync(background=True) as notifier:
+        notifier._async_api._did_request_authorisation = True
+        assert notifier._thread is not None
+        assert notifier._thread.is_alive()
+
+        backend = DummyNotificationCenter(notifier.app_name)
+        notifier._async_api._backend = backend
+
+        nowait = [
+            Notification(title="Julius Caesar", message=f"Et tu, Brute? {i}")
+            for i in range(40)
+        ]
+        blocking = [
+            Notification(title="Julius Caesar", message=f"Veni, vidi, vici {i}")
+            for i in range(40)
+        ]
+
+        # Sends are handed to the loop thread from many threads at once.
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = list(executor.map(notifier.send_nowait, nowait))
+            identifiers = list(executor.map(notifier.send_notification, blocking))
+
+        assert [future.result(timeout=5) for future in futures] == [
+            n.identifier for n in nowait
+        ]
+        assert identifiers == [n.identifier for n in blocking]
+
+        # Every notification reached the backend.
+        assert backend.call_counts["send"] == 80
+        assert set(notifier.get_current_notifications()) == {
+            n.identifier for n in nowait + blocking
+        }
+
+    assert not notifier._thread.is_alive()
+    assert notifier._loop.is_closed()
+
+
+def test_background_info(monkeypatch: pytest.MonkeyPatch) -> None:
+    threads = []
+
+    with DesktopNotifierSync(background=True) as notifier:
+        api = notifier._async_api
+
+        for name in ("cache_info", "dispatch_info"):
+
+            def wrapper(func: Any = getattr(api, name)) -> Any:
+                threads.append(threading.current_thread())
+                return func()
+
+            monkeypatch.setattr(api, name, wrapper)
+
+        # Statistics are read in the loop thread which updates them.
+        assert notifier.cache_info() == api._backend._notification_cache.info()
+        assert notifier.dispatch_info() == api._backend.dispatcher.info()
+        assert threads == [notifier._thread, notifier._thread]
+
+
+def test_background_callbacks(notification_server: Any) -> None:
+    clicked = threading.Event()
+    errors: list[Exception] = []
+
+    def on_clicked() -> None:
+        assert notifier._thread is threading.current_thread()
+        try:
+            notifier.get_current_notifications()
+        except RuntimeError as exc:
+            errors.append(exc)
+        clicked.set()
+
+    with DesktopNotifierSync(background=True) as notifier:
+        notifier._async_api._did_request_authorisation = True
+        identifier = notifier.send(
+            title="Julius Caesar", message="Et tu, Brute?", on_clicked=on_clicked
+        )
+
+        backend: Any = notifier._async_api._backend
+        nid = backend._platform_to_interface_notification_identifier.inverse[identifier]
+        notification_server.invoke_action(nid, "default")
+
+        # The loop runs between calls, so the callback is called without one.
+        assert clicked.wait(timeout=2)
+
+    # Blocking calls from the loop thread would deadlock and raise instead.
+    assert len(errors) == 1
+
+
+def test_send_nowait_requires_background(notifier_sync: DesktopNotifierSync) -> None:
+    notification = Notification(title="Julius Caesar", message="Et tu, Brute?")
+
+    with pytest.raises(RuntimeError):
+        notifier_sync.send_nowait(notification)